@@ -0,0 +1,243 @@
+#!/usr/bin/python3
+# Resident iperf3 agent.
+# One agent runs inside each Mininet host namespace for the duration of a network and
+# serves test commands from the orchestrator over a unix socket. Interpreter startup and
+# the iperf3 (libiperf) import are paid once per host rather than once per test.
+#
+# Protocol : one JSON object per line.
+#   request  -> { "op" : "ping" | "server" | "client" | "shutdown" , ...test parameters }
+#               (convergence mode adds "converge" , "min_time" , "max_time" , "omit" to client tests
+#                and "converge" to their servers, see client.run_client_until_converged... client
+#                tests may name their TCP "congestion" control algorithm, target "bandwidth",
+#                parallel "streams", the "zerocopy" send path and the "blksize" and
+#                "socket_buffer" settings)
+#   reply    -> { "status" : "ok" | "error" , "result" : iperf3 JSON result (tests) , "error" : ... }
+import argparse
+import json
+import os
+import select
+import signal
+import socket
+import threading
+from configure import SCRIPT_DIRECTORY
+
+
+# Agent side ##########################################################################
+
+def handle_test( connection , command : dict ) -> None:
+    """
+    Procedure runs a single iperf3 test in a forked child of the agent and replies with the
+    JSON result on the provided connection as soon as the test finishes. The fork isolates libiperf's
+    process wide stdout redirection, so a host may serve and run tests concurrently.<br>
+    
+    Parameters:<br>
+    - <strong>connection</strong>   : <code>socket</code> the orchestrator connection<br>
+    - <strong>command</strong>      : <code>dict</code> the decoded test command<br>
+    
+    Returns:<br>
+    - None
+    """
+    pid = os.fork()
+    if pid:
+        # The orchestrator hanging up on a pending test cancels it (e.g. a server whose client failed).
+        while not os.waitpid( pid , os.WNOHANG )[0]:
+            readable, _, _ = select.select( [connection] , [] , [] , 0.1 )
+            if readable and not connection.recv( 1 , socket.MSG_PEEK ):
+                os.kill( pid , signal.SIGTERM )
+                os.waitpid( pid , 0 )
+                return
+        return
+    
+    # child
+    try:
+        if command['op'] == 'server':
+            from server import run_server
+            result = run_server( server_ip = command['ip'] , service_port = command['port'] )
+        elif command.get('converge') is not None:
+            from client import run_client_until_converged
+            result = run_client_until_converged(
+                        client_ip       = command['ip'],
+                        service_port    = command['port'],
+                        server_ip       = command['server_ip'],
+                        tcp_udp         = command['test'],
+                        tolerance       = command['converge'],
+                        min_seconds     = command['min_time'],
+                        max_seconds     = command['max_time'],
+                        omit_seconds    = command['omit'],
+                        congestion      = command.get('congestion'),
+                        bandwidth       = command.get('bandwidth'),
+                        streams         = command.get('streams', 1),
+                        zerocopy        = command.get('zerocopy', False),
+                        blksize         = command.get('blksize'),
+                        socket_buffer   = command.get('socket_buffer')
+                    )
+        else:
+            from client import run_client
+            result = run_client(
+                        client_ip       = command['ip'],
+                        service_port    = command['port'],
+                        server_ip       = command['server_ip'],
+                        tcp_udp         = command['test'],
+                        time_seconds    = command['time'],
+                        congestion      = command.get('congestion'),
+                        bandwidth       = command.get('bandwidth'),
+                        streams         = command.get('streams', 1),
+                        zerocopy        = command.get('zerocopy', False),
+                        blksize         = command.get('blksize'),
+                        socket_buffer   = command.get('socket_buffer')
+                    )
+        
+        from client import is_client_interrupt
+        data = result if isinstance( result , dict ) else result.json
+        # a converged client ends the test early... its server still holds the full result
+        if data.get('error') and not ( command.get('converge') and is_client_interrupt( data ) ):
+            reply = { 'status' : 'error' , 'error' : data['error'] }
+        else:
+            # the result travels back over the connection... persistence is the orchestrator's concern
+            reply = { 'status' : 'ok' , 'result' : data }
+    except Exception as e:
+        reply = { 'status' : 'error' , 'error' : repr(e) }
+    
+    try:
+        connection.sendall( ( json.dumps(reply) + "\n" ).encode() )
+    finally:
+        os._exit(0)
+
+
+def handle_connection( connection , listener ) -> None:
+    """
+    Procedure reads one command from an orchestrator connection and dispatches it.<br>
+    
+    Parameters:<br>
+    - <strong>connection</strong>   : <code>socket</code> the orchestrator connection<br>
+    - <strong>listener</strong>     : <code>socket</code> the agent's listening socket (closed on shutdown)<br>
+    
+    Returns:<br>
+    - None
+    """
+    with connection:
+        line = connection.makefile('r').readline()
+        if not line:
+            return
+        command = json.loads(line)
+        
+        if command['op'] in ( 'server' , 'client' ):
+            handle_test( connection , command )
+        elif command['op'] == 'ping':
+            connection.sendall( ( json.dumps({ 'status' : 'ok' , 'pid' : os.getpid() }) + "\n" ).encode() )
+        elif command['op'] == 'shutdown':
+            connection.sendall( ( json.dumps({ 'status' : 'ok' }) + "\n" ).encode() )
+            # shutdown (rather than close alone) wakes the accept() blocked in serve
+            listener.shutdown( socket.SHUT_RDWR )
+            listener.close()
+        else:
+            connection.sendall( ( json.dumps({ 'status' : 'error' , 'error' : "unknown op {}".format(command['op']) }) + "\n" ).encode() )
+
+
+def serve( socket_path : str ) -> None:
+    """
+    Procedure binds the agent to a unix socket and serves commands until shutdown.<br>
+    
+    Parameters:<br>
+    - <strong>socket_path</strong>  : <code>string</code> file system path of the unix socket<br>
+    
+    Returns:<br>
+    - None
+    """
+    # Paid once for the lifetime of the agent... forked test children inherit the loaded modules.
+    import client
+    import server
+    
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    
+    listener = socket.socket( socket.AF_UNIX , socket.SOCK_STREAM )
+    listener.bind( socket_path )
+    listener.listen()
+    
+    try:
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                # listener closed by a shutdown command
+                break
+            threading.Thread( target=handle_connection , args=( connection , listener ) , daemon=True ).start()
+    finally:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+# Orchestrator side ###################################################################
+
+class AgentConnection() :
+    """
+    Orchestrator side connection to a resident agent. A connection carries a single
+    command and its reply, so a server command may be left pending while the client
+    command runs on another connection.
+    """
+
+    def __init__( self, socket_path : str , timeout : float = None ) -> None:
+        
+        self.__socket = socket.socket( socket.AF_UNIX , socket.SOCK_STREAM )
+        self.__socket.settimeout( timeout )
+        self.__socket.connect( socket_path )
+        self.__reader = self.__socket.makefile('r')
+    
+    def send( self, command : dict ) -> None:
+        
+        self.__socket.sendall( ( json.dumps(command) + "\n" ).encode() )
+    
+    def receive( self ) -> dict:
+        
+        line = self.__reader.readline()
+        if not line:
+            raise ConnectionError("agent closed the connection without a reply")
+        return json.loads(line)
+    
+    def close( self ) -> None:
+        
+        self.__reader.close()
+        self.__socket.close()
+
+
+def agent_request( socket_path : str , command : dict , timeout : float = None ) -> dict:
+    """
+    Function sends a command to an agent and blocks for its reply.<br>
+    
+    Parameters:<br>
+    - <strong>socket_path</strong>  : <code>string</code> file system path of the agent's unix socket<br>
+    - <strong>command</strong>      : <code>dict</code> the command to send<br>
+    - <strong>timeout</strong>      : <code>float</code> socket timeout in seconds (default blocking)<br>
+    
+    Returns:<br>
+    - <code>dict</code> the agent's reply
+    """
+    connection = AgentConnection( socket_path , timeout )
+    try:
+        connection.send( command )
+        return connection.receive()
+    finally:
+        connection.close()
+
+
+def generate_agent_cmd( socket_path : str ) -> str :
+    """
+    Function produces the command line which starts an agent on a host.<br>
+    
+    Parameters:<br>
+    - <strong>socket_path</strong>  : <code>string</code> file system path of the agent's unix socket<br>
+    
+    Returns:<br>
+    - <code>string</code> the formatted command
+    """
+    return "python3 {}/agent.py -socket {}".format(SCRIPT_DIRECTORY, socket_path)
+
+
+if __name__ == "__main__" :
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-socket", help="Unix socket path the agent listens on", type=str, required=True)
+    args = parser.parse_args()
+    
+    serve( args.socket )
@@ -2,17 +2,129 @@
 import subprocess
 import json
 from typing import List
-import matplotlib.pyplot as plt
 import os
 import argparse
+import hashlib
+import platform
 from configure import init_file_system
-from configure import PLOT_DIRECTORY , FINAL_RESULT_DIRECTORY
+from configure import PLOT_DIRECTORY , FINAL_RESULT_DIRECTORY , RESULT_DATABASE , SCRIPT_DIRECTORY , SERVICE_DIRECTORY
+from configure import TCP_BLKSIZE , UDP_BLKSIZE
+from result_store import ResultStore , generate_config_hash , extract_cpu_utilization
+from spans import SpanRecorder , SamplingProfiler , summarize_spans , format_span_summary
+from experiment_design import DESIGNS , EDGE_PREFIX , parse_parameter_ranges , generate_design , describe_point , calculate_main_effects
+from report import Report
+from time import strftime , localtime
+from uuid import uuid4
 # specify iperf3 testing duration
 TIME        : int
 CONSTRAINTS : List[int]
+# reuse one network for all constraints (see network_bottleneck.run_bandwidth_sweep)
+SWEEP       : bool = False
+# run the constraints as isolated parallel workers (see parallel_sweep.py), CPUs pinned to each
+PARALLEL        : bool = False
+CPUS_PER_WORKER : int = 2
+# summarize the per-second iperf intervals (see interval_analysis.py)
+INTERVALS       : bool = False
+# sample bottleneck telemetry during the tests and align it with the iperf intervals (see telemetry.py)
+TELEMETRY       : bool = False
+# adaptive mode... start from CONSTRAINTS and bisect around the throughput knee down to RESOLUTION Mbps
+ADAPTIVE                : bool = False
+RESOLUTION              : int = 2
+MAX_POINTS              : int = 16
+# knee criteria (see classify_point)
+RELIABILITY_THRESHOLD   : float = 0.99
+LOSS_THRESHOLD          : float = 0.01
+TRACKING_THRESHOLD      : float = 0.9
+# repeated measurements (see run_repetitions)... each constraint is measured up to REPEAT times, and stops
+# repeating after REPEAT_MIN rounds once its confidence intervals are within REPEAT_TOLERANCE of the mean
+REPEAT                  : int = 1
+REPEAT_MIN              : int = 3
+REPEAT_TOLERANCE        : float = None
+# link-parameter grid (see experiment_design.py)... GRID maps parameters to their levels, and DESIGN
+# picks the points measured: every combination, a Latin-hypercube sample of SAMPLES points (SEED) or a
+# two-level 2^(k-FRACTION) fractional factorial
+GRID                    : dict = None
+DESIGN                  : str = 'full'
+SAMPLES                 : int = None
+FRACTION                : int = None
+SEED                    : int = 0
+# queue discipline comparison (see network_bottleneck.run_qdisc_comparison)... the disciplines compared
+# under a saturating TCP workload, their queue limit (packets) and the interval (s) of the RTT pings
+QDISCS                  : List[str] = None
+QDISC_LIMIT             : int = 1000
+RTT_INTERVAL            : float = 0.05
+# congestion control matrix (see network_bottleneck.run_congestion_matrix)... the TCP congestion control
+# algorithms tested at every constraint, alone and (with -agents) pairwise on concurrent flows
+CONGESTION              : List[str] = None
+# UDP saturation search (see network_bottleneck.run_udp_saturation_search)... 'step' or 'binary' ramp of the
+# UDP target bitrate up to the highest offered load whose loss stays within UDP_LOSS (percent)
+UDP_SEARCH              : str = None
+UDP_LOSS                : float = 1.0
+# measure every constraint with the copying and the zero-copy TCP send path and compare their CPU cost
+# per gigabyte (see run_zerocopy_benchmark)
+ZEROCOPY_BENCHMARK      : bool = False
+# parallel streams of every iperf flow... their fairness is analyzed per constraint (see run_fairness_analysis)
+STREAMS                 : int = 1
+# client tuning (see network_bottleneck.run_client_tuning)... the block size and socket buffer of the clients
+# are searched for every constraint and bottleneck delay of TUNE_DELAYS (ms), and the sweeps run with the
+# tuned settings of their points' profile unless USE_TUNING is unset
+TUNE                    : bool = False
+TUNE_DELAYS             : List[float] = [ 0 ]
+USE_TUNING              : bool = True
+# metrics plotted per constraint (see calculate_point_metrics)
+POINT_METRICS = ( 'tcp_throughput' , 'tcp_reliability' , 'udp_throughput' )
+# results of this sweep are recorded and read back under RUN_ID (see result_store.py)
+RUN_ID          : str = "{}-{}".format( strftime("%Y%m%d-%H%M%S") , uuid4().hex[:6] )
+# additional flags forwarded to network_bottleneck.py (e.g. -agents, -concurrent)
+BOTTLENECK_FLAGS : List[str] = []
+# the subset of BOTTLENECK_FLAGS describing the measurement (part of the point configuration)
+MEASUREMENT_FLAGS : List[str] = []
+# memoized sweeps... points whose configuration was measured (less than MAX_AGE hours ago) are reused
+FORCE   : bool = False
+MAX_AGE : float = None
+# sources of the measuring code... their contents make up the code version of a point configuration
+MEASUREMENT_MODULES = ( "network_bottleneck.py" , "topology.py" , "agent.py" , "client.py" , "server.py" )
+# timing spans of the sweep and the measuring processes it launches, recorded with -trace (see spans.py)
+TRACE = SpanRecorder( context=lambda: { 'run_id' : RUN_ID } )
+# charts of this sweep, rendered at its end (see write_report)
+REPORT = Report( "Sweep {}".format( RUN_ID ) )
+# worker processes rendering the charts... one per CPU by default
+REPORT_WORKERS : int = None # redefined in main
+# seconds an interrupted measuring script is given to stop its test and clean up its network (see run_traced)
+INTERRUPT_GRACE = 30
 
 
-def run_bottleneck_test(bw_bottleneck : int , bw_other : int =100, time_seconds : int = 1) -> dict:
+def run_traced( command : List[str] , **span_args ) -> None:
+    """
+    Procedure runs a measuring script within a launch span. When tracing, the script records
+    its own spans to a trace file which is adopted into <code>TRACE</code> and removed. Upon a
+    <code>KeyboardInterrupt</code> the script is given <code>INTERRUPT_GRACE</code> seconds to clean up.<br>
+    
+    Parameters:<br>
+    - <strong>command</strong>      : <code>List</code> the script command line<br>
+    - <strong>span_args</strong>    : arguments of the launch span (e.g. bw_bottleneck)<br>
+    
+    Returns:<br>
+    - None
+    """
+    trace_file = os.path.abspath( "{}trace-{}.json".format( SERVICE_DIRECTORY , uuid4().hex[:8] ) )
+    with TRACE.span( command[1] , 'launch' , **span_args ) as launch:
+        process = subprocess.Popen( command + ( [ "-trace" , trace_file ] if TRACE.enabled else [] ) )
+        try:
+            process.wait()
+        except KeyboardInterrupt:
+            # the script is interrupted as well... it cancels its test and cleans up its network
+            try:
+                process.wait( timeout = INTERRUPT_GRACE )
+            except subprocess.TimeoutExpired:
+                process.kill()
+            raise
+    if TRACE.enabled and os.path.exists( trace_file ):
+        TRACE.adopt( trace_file , launch_id=launch.id )
+        os.remove( trace_file )
+
+
+def run_bottleneck_test(bw_bottleneck : int , bw_other : int =100, time_seconds : int = 1, run_id : str = None) -> dict:
     """
     Function to run network_bottleneck.py with the specified bottleneck bandwidth.<br>
     
@@ -21,75 +133,276 @@ def run_bottleneck_test(bw_bottleneck : int , bw_other : int =100, time_seconds
     - <strong>bw_other</strong>         : <code>int</code>  bandwidth of other (normal) links, (default 100 Mbps)<br>
     - <strong>time_seconds</strong>             : <code>int</code>  TO BE IMPLEMENTED... modulate the duration of iperf testig (default 1 second)<br>
     <emphasis>The time parameter currently modulates the duration of ping testing</emphasis><br>
+    - <strong>run_id</strong>           : <code>string</code> run the results are recorded under (default <code>RUN_ID</code>)<br>
     
     Returns:<br>
     - <code>dict</code> TCP and UDP iperf3 test results from the generated JSON file<br>
     """
-    subprocess.run( ["mn", "-c"] )
+    with TRACE.span( 'mn -c' , 'cleanup' , bw_bottleneck=bw_bottleneck ):
+        subprocess.run( ["mn", "-c"] )
     # Run the network_bottleneck.py script with the given bandwidths
-    subprocess.run( ["python3", "network_bottleneck.py", "-bw_bottleneck",str(bw_bottleneck), "-time", str(time_seconds)] )
+    run_traced( ["python3", "network_bottleneck.py", "-bw_bottleneck",str(bw_bottleneck), "-time", str(time_seconds),
+                 "-run_id", run_id or RUN_ID] + 
+                BOTTLENECK_FLAGS , bw_bottleneck=bw_bottleneck )
+
+    return load_bottleneck_results( bw_bottleneck=bw_bottleneck , bw_other=bw_other , run_id=run_id )
+
+
+def run_bottleneck_sweep( constraints : List[int] , bw_other : int = 100 , time_seconds : int = 1 , run_id : str = None ) -> dict:
+    """
+    Function runs network_bottleneck.py once in sweep mode... a single network is built and
+    the bottleneck link is reshaped in place for every constraint.<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>      : <code>List</code> bottleneck bandwidths in Mbps<br>
+    - <strong>bw_other</strong>         : <code>int</code>  bandwidth of other (normal) links, (default 100 Mbps)<br>
+    - <strong>time_seconds</strong>     : <code>int</code>  duration of iperf testing (default 1 second)<br>
+    - <strong>run_id</strong>           : <code>string</code> run the results are recorded under (default <code>RUN_ID</code>)<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to TCP and UDP iperf3 test results<br>
+    """
+    with TRACE.span( 'mn -c' , 'cleanup' ):
+        subprocess.run( ["mn", "-c"] )
+    run_traced( ["python3", "network_bottleneck.py", 
+                 "-sweep", " ".join( str(x) for x in constraints ), 
+                 "-bw_other", str(bw_other), 
+                 "-time", str(time_seconds),
+                 "-run_id", run_id or RUN_ID] + 
+                BOTTLENECK_FLAGS )
+    
+    return { bw : load_bottleneck_results( bw_bottleneck=bw , bw_other=bw_other , run_id=run_id ) for bw in constraints }
 
-    # Load the results from the generated JSON files for both TCP and UDP
-    tcp_file = f"{FINAL_RESULT_DIRECTORY}output-tcp-{bw_bottleneck}-{bw_other}.json"
-    udp_file = f"{FINAL_RESULT_DIRECTORY}output-udp-{bw_bottleneck}-{bw_other}.json"
 
+def run_parallel_bottleneck_sweep( constraints : List[int] , bw_other : int = 100 , time_seconds : int = 1 , run_id : str = None ) -> dict:
+    """
+    Function runs every constraint as an isolated network_bottleneck.py worker through
+    parallel_sweep.py, as many at once as the CPU budget allows.<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>      : <code>List</code> bottleneck bandwidths in Mbps<br>
+    - <strong>bw_other</strong>         : <code>int</code>  bandwidth of other (normal) links, (default 100 Mbps)<br>
+    - <strong>time_seconds</strong>     : <code>int</code>  duration of iperf testing (default 1 second)<br>
+    - <strong>run_id</strong>           : <code>string</code> run the results are recorded under (default <code>RUN_ID</code>)<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to TCP and UDP iperf3 test results<br>
+    """
+    run_traced( ["python3", "parallel_sweep.py", 
+                 "-constraints", " ".join( str(x) for x in constraints ), 
+                 "-bw_other", str(bw_other), 
+                 "-time", str(time_seconds),
+                 "-cpus_per_worker", str(CPUS_PER_WORKER),
+                 "-run_id", run_id or RUN_ID] + 
+                BOTTLENECK_FLAGS )
+    
+    return { bw : load_bottleneck_results( bw_bottleneck=bw , bw_other=bw_other , run_id=run_id ) for bw in constraints }
+
+
+def load_bottleneck_results( bw_bottleneck : int , bw_other : int = 100 , run_id : str = None ) -> dict:
+    """
+    Function loads the TCP and UDP results recorded by network_bottleneck.py in the result
+    store, for the specified bottleneck bandwidth of this run (<code>RUN_ID</code>).<br>
+    
+    Parameters:<br>
+    - <strong>bw_bottleneck</strong>    : <code>int</code>  bottleneck bandwidth in Mbps<br>
+    - <strong>bw_other</strong>         : <code>int</code>  bandwidth of other (normal) links, (default 100 Mbps)<br>
+    - <strong>run_id</strong>           : <code>string</code> the run which measured the point (default <code>RUN_ID</code>)<br>
+    
+    Returns:<br>
+    - <code>dict</code> TCP and UDP iperf3 test results from the result store<br>
+    """
     # Initialize results
     # MODULATE THE DESIRED RESULT DATA HERE
     # UTILIZE JSON PRETTY PRINTING TO EXPLORE AVAILABLE DATA IN THE GENERATED TEST FILES
     # RUN DEFAULT FIRST.. THEN USE THE GENERATED JSON TEST FILES TO EXPLORE THE KEYS.
+    # (the raw documents are also kept in the result store... see ResultStore.load_raw)
     results = {
         "TCP":
             {
                 'total_bytes_sent'        : int,
                 'total_bytes_received'    : int,
-                'reliability'             : float
+                'reliability'             : float,
+                'seconds'                 : float
             }
         , "UDP": 
             {
-                'total_bytes_sent'  : int
+                'total_bytes_sent'      : int,
+                'total_bytes_received'  : int,
+                'seconds'               : float
             }
         
     }
 
-    # Parse TCP results
-    if os.path.exists(tcp_file):
-        with open(tcp_file, 'r') as f:
-            
-            tcp_data = json.load(f)
-            
-            total_bytes_sent        = 0
-            total_bytes_received    = 0
-            
-            for test_case in tcp_data.keys():
-                total_bytes_sent       += tcp_data[test_case]['client']['end']['sum_sent']['bytes']
-                total_bytes_received   += tcp_data[test_case]['client']['end']['sum_received']['bytes']
-                
-                
-            results['TCP']['total_bytes_sent']      = total_bytes_sent
-            results['TCP']['total_bytes_received']  = total_bytes_received
-            results['TCP']['reliability']           = total_bytes_received / total_bytes_sent 
-
-    # Parse UDP results
-    if os.path.exists(udp_file):
-        with open(udp_file, 'r') as f:
-            
-            udp_data = json.load(f)
-            
-            for test_case in udp_data.keys():
-                
-                total_bytes_sent = udp_data[test_case]['client']['end']['sum']['bytes']
+    with TRACE.span( 'load results' , 'record' , bw_bottleneck=bw_bottleneck ):
+        store = ResultStore( RESULT_DATABASE )
+        try:
+            # latest record of every case of this run (a failed and retried sweep point records twice)
+            flows = {
+                protocol : { x['case_id'] : x for x in store.query_flows( run_id=run_id or RUN_ID , bw_bottleneck=bw_bottleneck , bw_other=bw_other , protocol=protocol ) }
+                for protocol in ('tcp', 'udp')
+            }
+        finally:
+            store.close()
+
+    # TCP results
+    if flows['tcp']:
+        total_bytes_sent        = sum( x['bytes_sent'] for x in flows['tcp'].values() )
+        total_bytes_received    = sum( x['bytes_received'] for x in flows['tcp'].values() )
+        
+        results['TCP']['total_bytes_sent']      = total_bytes_sent
+        results['TCP']['total_bytes_received']  = total_bytes_received
+        results['TCP']['reliability']           = total_bytes_received / total_bytes_sent 
+        # actual test duration (convergence mode stops tests early)... the mean over the cases
+        results['TCP']['seconds']               = sum( x['seconds'] for x in flows['tcp'].values() ) / len(flows['tcp'])
 
-            results['UDP']['total_bytes_sent'] = total_bytes_sent
+    # UDP results (as recorded for the last test case)
+    if flows['udp']:
+        results['UDP']['total_bytes_sent']      = flows['udp'][max(flows['udp'])]['bytes_sent']
+        results['UDP']['total_bytes_received']  = flows['udp'][max(flows['udp'])]['bytes_received']
+        results['UDP']['seconds']               = flows['udp'][max(flows['udp'])]['seconds']
 
     return results
 
 
-def plot_test_results( *, data_sets : List[dict] , title : str , xlabel: str , ylabel: str , labels : List[str] , plot_file_name : str ) -> None:
+def detect_iperf_version() -> str:
+    """
+    Function reports the version of the iperf library the tests run with.<br>
+    
+    Returns:<br>
+    - <code>string</code> the libiperf version, 'unknown' if it cannot be loaded
+    """
+    try:
+        import iperf3
+        return str( iperf3.Client().iperf_version )
+    except Exception:
+        return 'unknown'
+
+
+def generate_code_version() -> str:
+    """
+    Function hashes the sources of the measuring modules (<code>MEASUREMENT_MODULES</code>)...
+    uncommitted edits change the version as well.<br>
+    
+    Returns:<br>
+    - <code>string</code> hex sha256 digest
+    """
+    digest = hashlib.sha256()
+    for module in MEASUREMENT_MODULES:
+        with open( os.path.join( SCRIPT_DIRECTORY , module ) , 'rb' ) as f:
+            digest.update( f.read() )
+    return digest.hexdigest()
+
+
+def detect_environment() -> dict:
+    # the host side of a point configuration
+    return {
+        'kernel'        : platform.release(),
+        'iperf_version' : detect_iperf_version(),
+        'code_version'  : generate_code_version()
+    }
+
+
+def generate_point_config( *, bw_bottleneck : int , bw_other : int , time_seconds : int , environment : dict , repetition : int = None ,
+                           link : dict = None ) -> dict:
+    """
+    Function describes everything a sweep point measurement depends on. Points with equal
+    configurations (see result_store.generate_config_hash) are only measured once.<br>
+    
+    Parameters:<br>
+    - <strong>bw_bottleneck</strong>    : <code>int</code>  bottleneck bandwidth in Mbps<br>
+    - <strong>bw_other</strong>         : <code>int</code>  bandwidth of other (normal) links<br>
+    - <strong>time_seconds</strong>     : <code>int</code>  duration of iperf testing<br>
+    - <strong>environment</strong>      : <code>dict</code> { 'kernel' , 'iperf_version' , 'code_version' } of the host<br>
+    - <strong>repetition</strong>       : <code>int</code> repetition index (see run_repetitions), None for a single measurement<br>
+    - <strong>link</strong>             : <code>dict</code> further link parameters of a grid point (see run_grid), None for bandwidth points<br>
+    
+    Returns:<br>
+    - <code>dict</code> the point configuration
+    """
+    config = {
+        'bw_bottleneck' : bw_bottleneck,
+        'bw_other'      : bw_other,
+        'time'          : time_seconds,
+        'protocols'     : [ 'tcp' , 'udp' ],
+        'blksize'       : { 'tcp' : TCP_BLKSIZE , 'udp' : UDP_BLKSIZE },
+        'flags'         : list( MEASUREMENT_FLAGS ),
+        **environment
+    }
+    # tuned client settings of the point's profile, where tuned (see find_tuned_settings)
+    tuned = find_tuned_settings( bw_bottleneck , ( link or {} ).get( 'delay' , 0 ) ) if USE_TUNING else {}
+    if tuned:
+        config['blksize'].update({ x : y['blksize'] for x, y in tuned.items() })
+        config['socket_buffer'] = { x : y['socket_buffer'] for x, y in tuned.items() }
+    # every repetition is a point of its own
+    if repetition is not None:
+        config['repetition'] = repetition
+    if link:
+        config['link'] = link
+    return config
+
+
+def find_memoized_points( configs : dict ) -> dict:
+    """
+    Function looks up the sweep points already measured with the same configuration, honoring
+    <code>FORCE</code> (measure everything) and <code>MAX_AGE</code> (hours).<br>
+    
+    Parameters:<br>
+    - <strong>configs</strong>  : <code>dict</code> bottleneck bandwidth (or grid point description) to point configuration<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth (or grid point description) to the run which measured it
+    """
+    if FORCE:
+        return {}
+    
+    point_runs = {}
+    store = ResultStore( RESULT_DATABASE )
+    try:
+        for bw, config in configs.items():
+            point = store.find_point( generate_config_hash( config ) , 
+                                      max_age = MAX_AGE * 3600 if MAX_AGE is not None else None )
+            if point is not None:
+                point_runs[bw] = point['run_id']
+                print( "reusing {}... measured by run {} at {}".format( 
+                    "{} Mbps".format(bw) if isinstance( bw , int ) else bw , point['run_id'] , strftime( "%Y-%m-%d %H:%M:%S" , localtime( point['timestamp'] ) ) ) )
+    finally:
+        store.close()
+    return point_runs
+
+
+def record_measured_point( *, bw_bottleneck : int , config : dict , run_id : str ) -> bool:
+    """
+    Function marks a point measured by the provided run for later reuse...
+    only when both its TCP and UDP flows made it into the result store.<br>
+    
+    Parameters:<br>
+    - <strong>bw_bottleneck</strong>    : <code>int</code>  bottleneck bandwidth in Mbps<br>
+    - <strong>config</strong>           : <code>dict</code> the point configuration<br>
+    - <strong>run_id</strong>           : <code>string</code> the run which measured the point<br>
+    
+    Returns:<br>
+    - <code>bool</code> True if the point was recorded
+    """
+    store = ResultStore( RESULT_DATABASE )
+    try:
+        protocols = { x['protocol'] for x in store.query_flows( run_id=run_id , bw_bottleneck=bw_bottleneck , bw_other=config['bw_other'] ) }
+        if protocols != { 'tcp' , 'udp' }:
+            return False
+        store.record_point( config_hash=generate_config_hash( config ) , run_id=run_id , 
+                            bw_bottleneck=bw_bottleneck , bw_other=config['bw_other'] , config=config )
+        return True
+    finally:
+        store.close()
+
+
+def plot_test_results( *, data_sets : List[dict] , title : str , xlabel: str , ylabel: str , labels : List[str] , plot_file_name : str ,
+                       error_bars : List[dict] = None ) -> None:
     """
     Function plots variable inputted data via a key to value dictionary parsing. The dictionaries to be plotted
     should be provided in a list, with their corresponding data already sorted. The labels provided should
     coincide with the dictionary keys ordering (order in which items were added to the dictionary). 
-    Returns a line graph<br>
+    The line graph is queued in the sweep report and saved with it (see write_report)<br>
     
     Parameters:<br>
     - <strong>data_sets</strong>             : <code>List</code> list of dictionaries holding data to plot<br>
@@ -97,35 +410,14 @@ def plot_test_results( *, data_sets : List[dict] , title : str , xlabel: str , y
     - <strong>xlabel</strong>                : <code>str</code>  the desired x-axis label for the plot<br>
     - <strong>ylabel</strong>                : <code>str</code>  the desired y-axis label for the plot<br>
     - <strong>labels<strong>                 : <code>List</code> the list of assigned plot names ( name the 'line' )<br>
+    - <strong>error_bars</strong>            : <code>List</code> per data set, None or a dictionary of the same keys holding 
+                                                (below, above) error bar extents<br>
     
     Returns:<br>
     -None
     """
-    if not os.path.exists(PLOT_DIRECTORY):
-        subprocess.run([ "mkdir", PLOT_DIRECTORY ] )
-   
-    plot_file_name = "{}{}".format(PLOT_DIRECTORY, plot_file_name)
-    plt.figure(figsize=(9, 6))
-
-    label_index = 0
-    for data_set in data_sets:
-        
-        # Format data (x-axis keys , y-axis values)
-        __data_set = data_set.items()
-        x_axis, y_axis = zip(*__data_set)
-        
-        # Plot data
-        plt.plot(x_axis, y_axis,  label=labels[label_index], marker='s')
-        label_index += 1
-    
-    # Adding labels and title
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.title(title)
-    plt.legend()
-
-    # Save the plot as analysis.png
-    plt.savefig(plot_file_name)
+    REPORT.add_line_chart( data_sets=data_sets , title=title , xlabel=xlabel , ylabel=ylabel , labels=labels ,
+                           file_name=plot_file_name , error_bars=error_bars )
 
 
 def extract_plot_dataset( *, test_results : dict , subject : str ) -> dict:
@@ -146,39 +438,703 @@ def extract_plot_dataset( *, test_results : dict , subject : str ) -> dict:
     
     return dataset
 
-def calculate_throughput( *  , total_bytes_transmitted : int , time_seconds : int ) -> float :
+def calculate_throughput( *  , total_bytes_transmitted : int , time_seconds : float ) -> float :
+    # time_seconds... the elapsed test time recorded by iperf, not the nominal TIME
     return ( total_bytes_transmitted ) / time_seconds
 
+def measure_constraints( constraints : List[int] , repetition : int = None , variant : str = None ) -> tuple:
+    """
+    Function measures the provided constraints in the configured mode (single runs, sweep or parallel),
+    skipping those already measured with the same configuration (see find_memoized_points).<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>List</code> bottleneck bandwidths in Mbps<br>
+    - <strong>repetition</strong>   : <code>int</code> repetition index... recorded under its own run (see run_repetitions)<br>
+    - <strong>variant</strong>      : <code>string</code> name of a measurement variant... recorded under its own run (see run_zerocopy_benchmark)<br>
+    
+    Returns:<br>
+    - <code>tuple</code> ( bottleneck bandwidth to TCP and UDP iperf3 test results , bottleneck bandwidth to the run which measured it )
+    """
+    run_id = RUN_ID if repetition is None else "{}-r{}".format( RUN_ID , repetition )
+    if variant is not None:
+        run_id = "{}-{}".format( run_id , variant )
+    
+    # Only the points without a (fresh enough) measurement of the same configuration are run.
+    environment = detect_environment()
+    configs = { 
+        bw : generate_point_config( bw_bottleneck=bw , bw_other=100 , time_seconds=TIME , environment=environment , repetition=repetition ) 
+        for bw in constraints 
+    }
+    with TRACE.span( 'find memoized points' , 'record' ):
+        point_runs = find_memoized_points( configs )
+    missing = [ bw for bw in constraints if bw not in point_runs ]
+
+    # Sweep and parallel modes measure every missing constraint up front.
+    sweep_results = {}
+    if missing and PARALLEL:
+        sweep_results = run_parallel_bottleneck_sweep( constraints=missing , time_seconds=TIME , run_id=run_id )
+    elif missing and SWEEP:
+        sweep_results = run_bottleneck_sweep( constraints=missing , time_seconds=TIME , run_id=run_id )
+
+    measured = {}
+    for bw in constraints:
+        # new test (or the memoized one)
+        if bw in point_runs:
+            measured[bw] = load_bottleneck_results( bw_bottleneck=bw , run_id=point_runs[bw] )
+        elif SWEEP or PARALLEL:
+            measured[bw] = sweep_results[bw]
+        else:
+            measured[bw] = run_bottleneck_test(bw_bottleneck=bw, time_seconds=TIME, run_id=run_id)
+        
+        if bw not in point_runs:
+            with TRACE.span( 'record measured point' , 'record' , bw_bottleneck=bw ):
+                if record_measured_point( bw_bottleneck=bw , config=configs[bw] , run_id=run_id ):
+                    point_runs[bw] = run_id
+    
+    return measured, point_runs
+
+
+def is_point_measured( test_results : dict ) -> bool:
+    # unmeasured entries still hold their type placeholders (see load_bottleneck_results)
+    return isinstance( test_results['TCP']['reliability'] , float ) and isinstance( test_results['UDP']['total_bytes_sent'] , int )
+
+
+def calculate_point_metrics( test_results : dict ) -> dict:
+    """
+    Function derives the plotted metrics (<code>POINT_METRICS</code>) of a measured point.<br>
+    
+    Parameters:<br>
+    - <strong>test_results</strong>     : <code>dict</code> TCP and UDP iperf3 test results (see load_bottleneck_results)<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'tcp_throughput' , 'tcp_reliability' , 'udp_throughput' }, None if the point has no results
+    """
+    if not is_point_measured( test_results ):
+        return None
+    
+    # throughput calculation
+    tcp_throughput : float = calculate_throughput( 
+                                                  total_bytes_transmitted= (test_results['TCP']['total_bytes_sent'] + 
+                                                                            test_results['TCP']['total_bytes_received']),
+                                                  time_seconds=test_results['TCP']['seconds']
+                                                  )
+    udp_throughput : float = calculate_throughput( total_bytes_transmitted=test_results['UDP']['total_bytes_sent'],
+                                                  time_seconds=test_results['UDP']['seconds']
+                                                  )
+    return {
+        'tcp_throughput'   :  tcp_throughput,
+        'tcp_reliability'  :  test_results['TCP']['reliability'],
+        'udp_throughput'   :  udp_throughput
+    }
+
+
+def summarize_runs( runs : list ) -> dict:
+    """
+    Function summarizes repeated measurements of every bottleneck bandwidth and metric
+    (see repetition_stats.summarize_repetitions).<br>
+    
+    Parameters:<br>
+    - <strong>runs</strong>     : <code>list</code> of { 'bw_bottleneck' , 'repetition' , ...<code>POINT_METRICS</code> }<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to metric to { 'mean' , 'median' , 'ci_low' , 'ci_high' , 'n' , 'rejected' }
+    """
+    # numpy backed... only imported when repetitions are requested
+    from repetition_stats import summarize_repetitions
+    
+    bandwidths  = sorted({ x['bw_bottleneck'] for x in runs })
+    groups      = [ bandwidths.index( x['bw_bottleneck'] ) for x in runs ]
+    summary     = { bw : {} for bw in bandwidths }
+    for metric in POINT_METRICS:
+        stats = summarize_repetitions( groups , [ x[metric] for x in runs ] )
+        for index, bw in enumerate( bandwidths ):
+            summary[bw][metric] = { key : stats[key][index].item() for key in stats }
+    return summary
+
+
+def run_repetitions( constraints : List[int] ) -> tuple:
+    """
+    Function measures every constraint <code>REPEAT</code> times. Repetitions are interleaved... every
+    round visits all remaining constraints once, in an order rotated per round, so slow drift of the host
+    spreads over all constraints instead of biasing one. After <code>REPEAT_MIN</code> rounds a constraint
+    whose confidence intervals are all within <code>REPEAT_TOLERANCE</code> of their mean stops repeating.
+    The runs and their summary are written to 'repetitions.json' in the final result directory.<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>List</code> bottleneck bandwidths in Mbps<br>
+    
+    Returns:<br>
+    - <code>tuple</code> ( summary (see summarize_runs) , bottleneck bandwidth to the runs which measured it )
+    """
+    runs        = []
+    summary     = {}
+    point_runs  = { bw : [] for bw in constraints }
+    remaining   = list( constraints )
+    
+    for repetition in range( 1 , REPEAT + 1 ):
+        if not remaining:
+            break
+        shift = ( repetition - 1 ) % len( remaining )
+        order = remaining[shift:] + remaining[:shift]
+        
+        measured, round_runs = measure_constraints( order , repetition=repetition )
+        for bw in order:
+            metrics = calculate_point_metrics( measured[bw] )
+            if metrics is not None:
+                runs.append({ 'bw_bottleneck' : bw , 'repetition' : repetition , **metrics })
+            if bw in round_runs:
+                point_runs[bw].append( round_runs[bw] )
+        if not runs:
+            continue
+        
+        summary = summarize_runs( runs )
+        if REPEAT_TOLERANCE is not None and repetition >= REPEAT_MIN:
+            remaining = [ 
+                bw for bw in remaining 
+                if bw not in summary or not all( 
+                    ( x['ci_high'] - x['ci_low'] ) / 2 <= REPEAT_TOLERANCE * abs( x['mean'] ) for x in summary[bw].values() 
+                ) 
+            ]
+    
+    with open("{}repetitions.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump({ 'runs' : runs , 'summary' : summary }, f)
+    
+    return summary, point_runs
+
+
+def classify_point( *, bw_bottleneck : int , test_results : dict ) -> dict:
+    """
+    Function derives the knee criteria of a measured point: TCP reliability below 
+    <code>RELIABILITY_THRESHOLD</code>, UDP loss above <code>LOSS_THRESHOLD</code> and TCP
+    goodput below <code>TRACKING_THRESHOLD</code> of the configured bottleneck.<br>
+    
+    Parameters:<br>
+    - <strong>bw_bottleneck</strong>    : <code>int</code>  bottleneck bandwidth in Mbps<br>
+    - <strong>test_results</strong>     : <code>dict</code> TCP and UDP iperf3 test results (see load_bottleneck_results)<br>
+    
+    Returns:<br>
+    - <code>dict</code> the criteria and the tracking ratio, None if the point has no results
+    """
+    if not is_point_measured( test_results ):
+        return None
+    tcp, udp = test_results['TCP'], test_results['UDP']
+    
+    tracking = tcp['total_bytes_received'] * 8 / tcp['seconds'] / ( bw_bottleneck * 1e6 )
+    udp_loss = 1 - udp['total_bytes_received'] / udp['total_bytes_sent'] if udp['total_bytes_sent'] else 0.0
+    return {
+        'reliability_drop'  : tcp['reliability'] < RELIABILITY_THRESHOLD,
+        'udp_loss'          : udp_loss > LOSS_THRESHOLD,
+        'tracking_lost'     : tracking < TRACKING_THRESHOLD,
+        'tracking'          : tracking
+    }
+
+
+def is_knee_interval( low : dict , high : dict ) -> bool:
+    """
+    Function decides whether the interval between two neighbouring points is worth refining...
+    one of its criteria flips between them.<br>
+    
+    Parameters:<br>
+    - <strong>low</strong>  : <code>dict</code> criteria of the lower point (see classify_point)<br>
+    - <strong>high</strong> : <code>dict</code> criteria of the upper point<br>
+    
+    Returns:<br>
+    - <code>bool</code>
+    """
+    if low is None or high is None:
+        return False
+    return any( low[x] != high[x] for x in ('reliability_drop', 'udp_loss', 'tracking_lost') )
+
+
+def run_adaptive_sweep( coarse : List[int] ) -> tuple:
+    """
+    Function measures the coarse constraints, then bisects every knee interval (see is_knee_interval)
+    round by round until all of them are narrower than <code>RESOLUTION</code> Mbps or 
+    <code>MAX_POINTS</code> constraints have been measured. The sampled points and the located
+    knees are written to 'adaptive-sweep.json' in the final result directory.<br>
+    
+    Parameters:<br>
+    - <strong>coarse</strong>   : <code>List</code> initial bottleneck bandwidths in Mbps<br>
+    
+    Returns:<br>
+    - <code>tuple</code> ( bottleneck bandwidth to TCP and UDP iperf3 test results , bottleneck bandwidth to the run which measured it )
+    """
+    measured, point_runs = measure_constraints( sorted( set( coarse ) ) )
+    
+    rounds = 0
+    while True:
+        points = sorted( measured )
+        states = { bw : classify_point( bw_bottleneck=bw , test_results=measured[bw] ) for bw in points }
+        knees = [ ( low , high ) for low, high in zip( points , points[1:] ) if is_knee_interval( states[low] , states[high] ) ]
+        
+        # the midpoint of an interval wider than the resolution always lies strictly inside it
+        midpoints = [ ( low + high ) // 2 for low, high in knees if high - low > RESOLUTION ]
+        midpoints = midpoints[:max( MAX_POINTS - len( measured ) , 0 )]
+        if not midpoints:
+            break
+        
+        rounds += 1
+        print( "adaptive round {}... refining {}".format( rounds , midpoints ) )
+        round_results, round_runs = measure_constraints( midpoints )
+        measured.update( round_results )
+        point_runs.update( round_runs )
+    
+    with open("{}adaptive-sweep.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump({
+            'rounds'    : rounds,
+            'points'    : { bw : states[bw] for bw in points },
+            'knees'     : knees
+        }, f)
+    
+    return measured, point_runs
+
+
+def run_grid() -> dict:
+    """
+    Function measures the link-parameter grid: the points of <code>DESIGN</code> over <code>GRID</code>
+    (the bottleneck bandwidths default to <code>CONSTRAINTS</code>), ordered so consecutive points
+    reshape as few links as possible (see experiment_design.py). The points missing from the result
+    store (see find_memoized_points) are measured by one network_bottleneck.py sweep over a single
+    reconfigured network, each under its own run. The points, their metrics and the main effects of
+    every parameter are written to 'grid.json' in the final result directory.<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'design' , 'ranges' , 'points' , 'main_effects' }
+    """
+    ranges      = { 'bw' : GRID.get( 'bw' , CONSTRAINTS ) , **{ x : y for x, y in GRID.items() if x != 'bw' } }
+    points      = generate_design( ranges , DESIGN , samples=SAMPLES , fraction=FRACTION , seed=SEED )
+    labels      = [ describe_point( x ) for x in points ]
+    environment = detect_environment()
+    configs     = { 
+        label : generate_point_config( bw_bottleneck=point['bw'] , bw_other=point.get( 'edge_bw' , 100 ) , time_seconds=TIME , environment=environment ,
+                                       link={ x : y for x, y in point.items() if x not in ( 'bw' , 'edge_bw' ) } )
+        for label, point in zip( labels , points )
+    }
+    with TRACE.span( 'find memoized points' , 'record' ):
+        point_runs = find_memoized_points( configs )
+    
+    # every grid point is recorded under a run of its own... points may share a bottleneck bandwidth
+    run_ids = { label : point_runs.get( label , "{}-g{}".format( RUN_ID , index ) ) for index, label in enumerate( labels ) }
+    missing = [ dict( point , run_id=run_ids[label] ) for label, point in zip( labels , points ) if label not in point_runs ]
+    if missing:
+        grid_file = os.path.abspath( "{}grid-{}.json".format( SERVICE_DIRECTORY , RUN_ID ) )
+        with open( grid_file , 'w' ) as f:
+            json.dump( missing , f )
+        with TRACE.span( 'mn -c' , 'cleanup' ):
+            subprocess.run( ["mn", "-c"] )
+        run_traced( ["python3", "network_bottleneck.py", 
+                     "-grid_file", grid_file, 
+                     "-time", str(TIME),
+                     "-run_id", RUN_ID] + 
+                    BOTTLENECK_FLAGS )
+        os.remove( grid_file )
+    
+    results = []
+    for label, point in zip( labels , points ):
+        bw_other = point.get( 'edge_bw' , 100 )
+        metrics = calculate_point_metrics( load_bottleneck_results( bw_bottleneck=point['bw'] , bw_other=bw_other , run_id=run_ids[label] ) )
+        if label not in point_runs:
+            with TRACE.span( 'record measured point' , 'record' , bw_bottleneck=point['bw'] ):
+                record_measured_point( bw_bottleneck=point['bw'] , config=configs[label] , run_id=run_ids[label] )
+        results.append({ **point , 'run_id' : run_ids[label] , 'metrics' : metrics })
+    
+    report = {
+        'design'        : DESIGN,
+        'ranges'        : ranges,
+        'points'        : results,
+        'main_effects'  : { 
+            metric : calculate_main_effects( points , [ x['metrics'][metric] if x['metrics'] else None for x in results ] ) 
+            for metric in POINT_METRICS 
+        }
+    }
+    with open("{}grid.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(report, f)
+    plot_grid_heatmaps( results )
+    return report
+
+
+def calculate_grid_cells( results : list , x_parameter : str , y_parameter : str , metric : str ) -> tuple:
+    """
+    Function averages a metric of the grid points over two parameters... the other parameters'
+    levels are averaged out, points without the metric are left out.<br>
+    
+    Parameters:<br>
+    - <strong>results</strong>      : <code>list</code> the grid points, with their 'metrics' (see run_grid)<br>
+    - <strong>x_parameter</strong>  : <code>string</code> parameter of the columns<br>
+    - <strong>y_parameter</strong>  : <code>string</code> parameter of the rows<br>
+    - <strong>metric</strong>       : <code>string</code> one of <code>POINT_METRICS</code><br>
+    
+    Returns:<br>
+    - <code>tuple</code> x levels, y levels and the mean per cell (one row per y level, None for empty cells)
+    """
+    x_levels = sorted({ x[x_parameter] for x in results })
+    y_levels = sorted({ x[y_parameter] for x in results })
+    cells = {}
+    for point in results:
+        if point['metrics'] and point['metrics'][metric] is not None:
+            cells.setdefault( ( point[x_parameter] , point[y_parameter] ) , [] ).append( point['metrics'][metric] )
+    values = [ [ sum( cells[(x, y)] ) / len( cells[(x, y)] ) if (x, y) in cells else None for x in x_levels ] for y in y_levels ]
+    return x_levels , y_levels , values
+
+
+def plot_grid_heatmaps( results : list ) -> None:
+    """
+    Procedure queues a heatmap of every metric over every pair of grid parameters with more than
+    one level (see calculate_grid_cells) in the sweep report, as 'grid-{metric}-{x}-{y}.png'.<br>
+    
+    Parameters:<br>
+    - <strong>results</strong>  : <code>list</code> the grid points, with their 'metrics' (see run_grid)<br>
+    
+    Returns:<br>
+    - None
+    """
+    parameters = [ x for x in results[0] if x not in ( 'run_id' , 'metrics' ) and len({ y[x] for y in results }) > 1 ] if results else []
+    for index, x_parameter in enumerate( parameters ):
+        for y_parameter in parameters[index + 1:]:
+            for metric in POINT_METRICS:
+                x_levels, y_levels, values = calculate_grid_cells( results , x_parameter , y_parameter , metric )
+                REPORT.add_heatmap( x_levels=x_levels , y_levels=y_levels , values=values ,
+                                    title="Grid: {} by {} and {}".format( metric , x_parameter , y_parameter ) ,
+                                    xlabel=x_parameter , ylabel=y_parameter ,
+                                    value_label="{} (mean)".format( metric ) ,
+                                    file_name="grid-{}-{}-{}.png".format( metric , x_parameter , y_parameter ) )
+
+
+def run_qdisc_comparison() -> dict:
+    """
+    Function compares the queue disciplines <code>QDISCS</code> of the bottleneck under a saturating
+    TCP workload, for every constraint, in one network_bottleneck.py run (see
+    network_bottleneck.run_qdisc_comparison). The comparison is written to 'qdisc-comparison.json'
+    and, side by side per bandwidth, to 'qdisc-comparison.txt' in the final result directory, and
+    throughput versus p99 RTT is plotted per discipline. Comparisons are not memoized.<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to discipline to { 'throughput_bps' , 'retransmits' , 'rtt_p50' , 'rtt_p99' , ... }
+    """
+    with TRACE.span( 'mn -c' , 'cleanup' ):
+        subprocess.run( ["mn", "-c"] )
+    run_traced( ["python3", "network_bottleneck.py", 
+                 "-sweep", " ".join( str(x) for x in CONSTRAINTS ), 
+                 "-qdiscs", " ".join( QDISCS ),
+                 "-qdisc_limit", str(QDISC_LIMIT),
+                 "-rtt_interval", str(RTT_INTERVAL),
+                 "-time", str(TIME),
+                 "-run_id", RUN_ID] + 
+                BOTTLENECK_FLAGS )
+    
+    comparison = {}
+    for bw in CONSTRAINTS:
+        try:
+            with open("{}output-qdisc-{}-{}.json".format(FINAL_RESULT_DIRECTORY, bw, 100), 'r') as f:
+                comparison[bw] = json.load(f)
+        except OSError:
+            comparison[bw] = { x : None for x in QDISCS }
+    with open("{}qdisc-comparison.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(comparison, f)
+    
+    lines = [ "{:>10} {:>10} {:>16} {:>12} {:>12} {:>12}".format( 'bw (Mbps)' , 'qdisc' , 'throughput Mbps' , 'p50 RTT ms' , 'p99 RTT ms' , 'retransmits' ) ]
+    for bw, results in comparison.items():
+        for discipline in QDISCS:
+            result = results.get( discipline )
+            if result is None or result['rtt_p99'] is None:
+                lines.append( "{:>10} {:>10} {:>16}".format( bw , discipline , 'failed' ) )
+                continue
+            lines.append( "{:>10} {:>10} {:>16.2f} {:>12.2f} {:>12.2f} {:>12}".format( 
+                bw , discipline , result['throughput_bps'] / 1e6 , result['rtt_p50'] , result['rtt_p99'] , result['retransmits'] ) )
+    with open("{}qdisc-comparison.txt".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        f.write( "\n".join( lines ) + "\n" )
+    print( "\n".join( lines ) )
+    
+    # one line per discipline, through its bandwidths
+    measured = [ x for x in QDISCS if any( y.get(x) and y[x]['rtt_p99'] is not None for y in comparison.values() ) ]
+    if measured:
+        plot_test_results( 
+                     data_sets=[
+                        { y[x]['rtt_p99'] : y[x]['throughput_bps'] / 1e6 for y in comparison.values() if y.get(x) and y[x]['rtt_p99'] is not None }
+                        for x in measured
+                    ], 
+                     title="Throughput vs p99 RTT under Load per Queue Discipline",
+                     xlabel="p99 RTT (ms)",
+                     ylabel="Throughput (Mbps)",
+                     labels=measured,
+                     plot_file_name="qdisc-comparison.png"
+                )
+    return comparison
+
+
+def calculate_jain_index( values : list ) -> float:
+    # Jain's fairness index... 1 for equal shares, 1/n when one of n gets everything
+    return sum( values ) ** 2 / ( len( values ) * sum( x ** 2 for x in values ) ) if any( values ) else None
+
+
+def run_congestion_matrix() -> dict:
+    """
+    Function tests every constraint with every TCP congestion control algorithm of <code>CONGESTION</code>,
+    and every pair of algorithms on concurrent flows, in one network_bottleneck.py run (see
+    network_bottleneck.run_congestion_matrix). Per constraint it reports the TCP goodput, reliability and
+    retransmits of every algorithm (with the algorithm iperf reports the sender used), the best algorithm
+    by goodput, and the goodput share and Jain's fairness index of every pair. Written to
+    'congestion-matrix.json' in the final result directory, the goodputs are plotted per algorithm.
+    The matrix is not memoized.<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'algorithms' , 'mixed' , 'best' }... keyed by constraint
+    """
+    with TRACE.span( 'mn -c' , 'cleanup' ):
+        subprocess.run( ["mn", "-c"] )
+    run_traced( ["python3", "network_bottleneck.py", 
+                 "-sweep", " ".join( str(x) for x in CONSTRAINTS ), 
+                 "-congestion", " ".join( CONGESTION ),
+                 "-time", str(TIME),
+                 "-run_id", RUN_ID] + 
+                BOTTLENECK_FLAGS )
+    
+    report = { 'algorithms' : {} , 'mixed' : {} , 'best' : {} }
+    with TRACE.span( 'load results' , 'record' ):
+        store = ResultStore( RESULT_DATABASE )
+        try:
+            for bw in CONSTRAINTS:
+                report['algorithms'][bw] = {}
+                for algorithm in CONGESTION:
+                    # latest record of every case (a failed and retried point records twice)
+                    flows = list({ x['case_id'] : x for x in store.query_flows( run_id="{}-{}".format( RUN_ID , algorithm ) , bw_bottleneck=bw , protocol='tcp' ) }.values())
+                    if not flows:
+                        report['algorithms'][bw][algorithm] = None
+                        continue
+                    ends = [ store.load_raw( x['id'] )['client']['end'] for x in flows ]
+                    report['algorithms'][bw][algorithm] = {
+                        'goodput_bps'   : sum( x['bytes_received'] * 8 / x['seconds'] for x in flows ) / len( flows ),
+                        'reliability'   : sum( x['bytes_received'] for x in flows ) / sum( x['bytes_sent'] for x in flows ),
+                        'retransmits'   : sum( x['sum_sent'].get( 'retransmits' , 0 ) for x in ends ),
+                        # what the kernel actually used... an unavailable algorithm fails the test or falls back
+                        'sender_congestion' : sorted({ x.get( 'sender_tcp_congestion' ) for x in ends } - { None })
+                    }
+                measured = { x : y for x, y in report['algorithms'][bw].items() if y is not None }
+                report['best'][bw] = max( measured , key=lambda x: measured[x]['goodput_bps'] ) if measured else None
+                
+                report['mixed'][bw] = {}
+                for index, first in enumerate( CONGESTION ):
+                    for second in CONGESTION[index + 1:]:
+                        # latest record of both flows
+                        flows = { x['case_id'] : x for x in store.query_flows( run_id="{}-{}-vs-{}".format( RUN_ID , first , second ) , bw_bottleneck=bw , protocol='tcp' ) }
+                        if len( flows ) != 2:
+                            continue
+                        goodputs = [ flows[x]['bytes_received'] * 8 / flows[x]['seconds'] for x in ( 1 , 2 ) ]
+                        report['mixed'][bw]["{} vs {}".format( first , second )] = {
+                            'goodput_bps'   : { first : goodputs[0] , second : goodputs[1] },
+                            'share'         : { first : goodputs[0] / sum( goodputs ) , second : goodputs[1] / sum( goodputs ) } if sum( goodputs ) else None,
+                            'jain_index'    : calculate_jain_index( goodputs )
+                        }
+        finally:
+            store.close()
+    with open("{}congestion-matrix.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(report, f)
+    for bw, algorithm in report['best'].items():
+        print( "{} Mbps : best goodput with {}".format( bw , algorithm ) )
+    
+    measured = [ x for x in CONGESTION if any( y.get(x) for y in report['algorithms'].values() ) ]
+    if measured:
+        plot_test_results( 
+                     data_sets=[
+                        { bw : y[x]['goodput_bps'] / 1e6 for bw, y in report['algorithms'].items() if y.get(x) } for x in measured
+                    ], 
+                     title="TCP Goodput vs Bottleneck Bandwidth per Congestion Control Algorithm",
+                     xlabel="Bottleneck Bandwidth (Mbps)",
+                     ylabel="Goodput (Mbps)",
+                     labels=measured,
+                     plot_file_name="congestion.png"
+                )
+    return report
+
+
+def run_udp_saturation_search() -> dict:
+    """
+    Function searches the UDP capacity of every constraint (see saturation_search.py) in one
+    network_bottleneck.py run... the highest target bitrate whose loss stays within
+    <code>UDP_LOSS</code> percent. The searches, with the goodput, loss and jitter of every step, are
+    written to 'udp-saturation.json' in the final result directory (null for a failed search); capacity and goodput are plotted
+    against the bottleneck bandwidth, and goodput against offered load per constraint. Searches are
+    not memoized.<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to its search (see saturation_search.search_saturation), None if it failed or did not run
+    """
+    with TRACE.span( 'mn -c' , 'cleanup' ):
+        subprocess.run( ["mn", "-c"] )
+    run_traced( ["python3", "network_bottleneck.py", 
+                 "-sweep", " ".join( str(x) for x in CONSTRAINTS ), 
+                 "-udp_search", UDP_SEARCH,
+                 "-udp_loss", str(UDP_LOSS),
+                 "-time", str(TIME),
+                 "-run_id", RUN_ID] + 
+                BOTTLENECK_FLAGS )
+    
+    searches = {}
+    for bw in CONSTRAINTS:
+        try:
+            with open("{}output-udp-search-{}-{}.json".format(FINAL_RESULT_DIRECTORY, bw, 100), 'r') as f:
+                searches[bw] = json.load(f)
+        except OSError:
+            searches[bw] = None
+    with open("{}udp-saturation.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(searches, f)
+    
+    found = { bw : x for bw, x in searches.items() if x is not None and x['capacity_bps'] is not None }
+    if found:
+        plot_test_results( 
+                     data_sets=[
+                        { bw : x['capacity_bps'] / 1e6 for bw, x in found.items() },
+                        { bw : x['goodput_bps'] / 1e6 for bw, x in found.items() }
+                    ], 
+                     title="UDP Capacity within {}% Loss vs Bottleneck Bandwidth".format(UDP_LOSS),
+                     xlabel="Bottleneck Bandwidth (Mbps)",
+                     ylabel="Bitrate (Mbps)",
+                     labels=["Offered load" , "Goodput"],
+                     plot_file_name="udp-capacity.png"
+                )
+    ramps = { bw : [ y for y in sorted( x['steps'] , key=lambda y: y['target_bps'] ) if y['goodput_bps'] is not None ] 
+              for bw, x in searches.items() if x is not None }
+    ramps = { bw : x for bw, x in ramps.items() if x }
+    if ramps:
+        plot_test_results( 
+                     data_sets=[ { y['target_bps'] / 1e6 : y['goodput_bps'] / 1e6 for y in x } for x in ramps.values() ], 
+                     title="UDP Goodput vs Offered Load",
+                     xlabel="Offered load (Mbps)",
+                     ylabel="Goodput (Mbps)",
+                     labels=[ "{} Mbps bottleneck".format(bw) for bw in ramps ],
+                     plot_file_name="udp-ramp.png"
+                )
+    return searches
+
+
+def run_client_tuning() -> dict:
+    """
+    Function searches the best client block size and socket buffer of every constraint and bottleneck
+    delay of <code>TUNE_DELAYS</code> (see client_tuning.py) in one network_bottleneck.py run, which keeps
+    them in the result store... later sweeps run with them (see find_tuned_settings). The searches, with
+    the goodput of every trial, are written to 'tuning.json' in the final result directory, and the TCP
+    goodput of the default and the tuned settings is plotted per delay. Tuning is not memoized.<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to delay to protocol to its search (see client_tuning.search_client_settings),
+    None if it did not run... a failed profile (delay) is None
+    """
+    with TRACE.span( 'mn -c' , 'cleanup' ):
+        subprocess.run( ["mn", "-c"] )
+    run_traced( ["python3", "network_bottleneck.py", 
+                 "-sweep", " ".join( str(x) for x in CONSTRAINTS ), 
+                 "-tune",
+                 "-tune_delays", " ".join( str(x) for x in TUNE_DELAYS ),
+                 "-time", str(TIME),
+                 "-run_id", RUN_ID] + 
+                BOTTLENECK_FLAGS )
+    
+    searches = {}
+    for bw in CONSTRAINTS:
+        try:
+            with open("{}output-tuning-{}-{}.json".format(FINAL_RESULT_DIRECTORY, bw, 100), 'r') as f:
+                searches[bw] = json.load(f)
+        except OSError:
+            searches[bw] = None
+    with open("{}tuning.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(searches, f)
+    
+    # the first trial of a search runs iperf's default block size with the kernel's autotuning
+    data_sets, labels = [], []
+    for delay in sorted({ y for x in searches.values() if x is not None for y in x } , key=float):
+        tuned = { bw : x[delay]['tcp'] for bw, x in searches.items() if x is not None and x.get(delay) and x[delay]['tcp']['best'] }
+        if tuned:
+            data_sets += [ 
+                { bw : x['trials'][0]['goodput_bps'] / 1e6 for bw, x in tuned.items() if x['trials'][0]['goodput_bps'] is not None },
+                { bw : x['best']['goodput_bps'] / 1e6 for bw, x in tuned.items() }
+            ]
+            labels += [ "Default ({} ms)".format(delay) , "Tuned ({} ms)".format(delay) ]
+    if data_sets:
+        plot_test_results( 
+                     data_sets=data_sets, 
+                     title="TCP Goodput of Default and Tuned Client Settings",
+                     xlabel="Bottleneck Bandwidth (Mbps)",
+                     ylabel="Goodput (Mbps)",
+                     labels=labels,
+                     plot_file_name="tuning.png"
+                )
+    return searches
+
+
+def find_tuned_settings( bw_bottleneck : int , delay : float = 0 ) -> dict:
+    """
+    Function looks up the tuned client settings of a bottleneck profile (see run_client_tuning).<br>
+    
+    Parameters:<br>
+    - <strong>bw_bottleneck</strong>    : <code>int</code>  bottleneck bandwidth in Mbps<br>
+    - <strong>delay</strong>            : <code>float</code> bottleneck delay in ms<br>
+    
+    Returns:<br>
+    - <code>dict</code> protocol to { 'blksize' , 'socket_buffer' }... only the tuned protocols, empty if the profile was never tuned
+    """
+    store = ResultStore( RESULT_DATABASE )
+    try:
+        tunings = { x : store.find_tuning( bw_bottleneck , delay , x ) for x in ( 'tcp' , 'udp' ) }
+    finally:
+        store.close()
+    return { x : { 'blksize' : y['blksize'] , 'socket_buffer' : y['socket_buffer'] } for x, y in tunings.items() if y is not None }
+
+
 def main():
     # Define bottleneck bandwidths to test
     # !!! MODIFYING THIS STRUCTURE DICTATES THE DURATION AND CONTENTS OF THE TEST
     # !!! THIS IS THE ONLY STRUCTURE THAT NEEDS TO BE MODULATED TO MANIPULATE BANDWIDTHS TESTED
-    bottleneck_bandwidth_tests = { x:{} for x in CONSTRAINTS }
-
-    # Run tests for each bandwidth and collect test result data
+    # (adaptive mode refines the constraints around the throughput knee, see run_adaptive_sweep)
     # Collecting data on...
     #  - throughput
     #  - reliability
-    for bw in bottleneck_bandwidth_tests.keys():
-        # new test
-        test_results = run_bottleneck_test(bw_bottleneck=bw, time_seconds=TIME)
-
-        # throughput calculation
-        tcp_throughput : float = calculate_throughput( 
-                                                      total_bytes_transmitted= (test_results['TCP']['total_bytes_sent'] + 
-                                                                                test_results['TCP']['total_bytes_received']),
-                                                      time_seconds=TIME
-                                                      )
-        udp_throughput : float = calculate_throughput( total_bytes_transmitted=test_results['UDP']['total_bytes_sent'],
-                                                      time_seconds=TIME
-                                                      )
- 
-        # storage of results
-        bottleneck_bandwidth_tests[bw] = {
-            'tcp_throughput'   :  tcp_throughput,
-            'tcp_reliability'  :  test_results['TCP']['reliability'],
-             'udp_throughput'  :  udp_throughput
+    if TUNE:
+        # client settings per bottleneck profile... used by the sweeps that follow
+        run_client_tuning()
+        return
+    
+    if UDP_SEARCH:
+        # capacity per constraint rather than the default rate UDP test
+        run_udp_saturation_search()
+        return
+    
+    if CONGESTION:
+        # bandwidths x algorithms, and the algorithm pairs on concurrent flows
+        run_congestion_matrix()
+        return
+    
+    if QDISCS:
+        # one saturating workload per discipline and bandwidth... compared by throughput and RTT under load
+        run_qdisc_comparison()
+        return
+    
+    if ZEROCOPY_BENCHMARK:
+        # the constraints measured with both TCP send paths... compared by CPU cost per gigabyte
+        run_zerocopy_benchmark()
+        return
+    
+    if GRID is not None:
+        # multi-dimensional... reported in grid.json rather than plotted against the bandwidth
+        run_grid()
+        return
+    
+    error_bars = {}
+    if REPEAT > 1 and not ADAPTIVE:
+        # repeated measurements... the mean of every metric, with its bootstrap confidence interval
+        summary, point_runs = run_repetitions( CONSTRAINTS )
+        bottleneck_bandwidth_tests = { bw : { x : summary[bw][x]['mean'] for x in POINT_METRICS } for bw in sorted( summary ) }
+        error_bars = { 
+            x : { bw : ( summary[bw][x]['mean'] - summary[bw][x]['ci_low'] , summary[bw][x]['ci_high'] - summary[bw][x]['mean'] ) for bw in sorted( summary ) } 
+            for x in POINT_METRICS 
         }
+    else:
+        if ADAPTIVE:
+            measured, point_runs = run_adaptive_sweep( coarse=CONSTRAINTS )
+        else:
+            measured, point_runs = measure_constraints( CONSTRAINTS )
+        # Collect test result data for each (measured) bandwidth
+        metrics = { bw : calculate_point_metrics( measured[bw] ) for bw in sorted( measured ) }
+        bottleneck_bandwidth_tests = { bw : x for bw, x in metrics.items() if x is not None }
 
     # load segregated data for plotting
     tcp_throughput_data     = extract_plot_dataset( test_results=bottleneck_bandwidth_tests , subject='tcp_throughput')
@@ -196,7 +1152,8 @@ def main():
                  xlabel="Bottleneck Bandwidth (Mbps)",
                  ylabel="Throughput (Bytes/Second)",
                  labels=["TCP Throughput" , "UDP Throughput"],
-                 plot_file_name="analysis.png"
+                 plot_file_name="analysis.png",
+                 error_bars=[ error_bars.get('tcp_throughput') , error_bars.get('udp_throughput') ]
             )
     plot_test_results( 
                  data_sets=[
@@ -206,16 +1163,487 @@ def main():
                  xlabel="Bottleneck Bandwidth (Mbps)",
                  ylabel="Link reliability",
                  labels=["Reliability"],
-                 plot_file_name="reliability.png"
+                 plot_file_name="reliability.png",
+                 error_bars=[ error_bars.get('tcp_reliability') ]
+            )
+    
+    if INTERVALS:
+        run_interval_analysis( point_runs={ bw : point_runs.get( bw , RUN_ID ) for bw in bottleneck_bandwidth_tests } )
+    if TELEMETRY:
+        run_telemetry_analysis( point_runs={ bw : point_runs.get( bw , RUN_ID ) for bw in bottleneck_bandwidth_tests } )
+    run_cpu_efficiency_analysis( point_runs={ bw : point_runs.get( bw , RUN_ID ) for bw in bottleneck_bandwidth_tests } )
+    if STREAMS > 1 or "-concurrent" in MEASUREMENT_FLAGS:
+        run_fairness_analysis( point_runs={ bw : point_runs.get( bw , RUN_ID ) for bw in bottleneck_bandwidth_tests } )
+
+
+def run_interval_analysis( point_runs : dict ) -> None:
+    """
+    Procedure summarizes the per-second iperf intervals of every constraint (see interval_analysis.py),
+    writes the summary to 'interval-analysis.json' in the final result directory and plots
+    throughput stability and UDP jitter/loss percentiles.<br>
+    
+    Parameters:<br>
+    - <strong>point_runs</strong>   : <code>dict</code> bottleneck bandwidth to the run which measured it<br>
+    
+    Returns:<br>
+    - None
+    """
+    # numpy backed... only imported when interval analysis is requested
+    from interval_analysis import analyze_intervals
+    
+    with TRACE.span( 'analyze intervals' , 'analysis' ):
+        store = ResultStore( RESULT_DATABASE )
+        try:
+            analysis = analyze_intervals( constraints=list( point_runs ) , store=store , run_id=point_runs )
+        finally:
+            store.close()
+    with open("{}interval-analysis.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(analysis, f)
+    
+    plot_test_results( 
+                 data_sets=[
+                    extract_plot_dataset( test_results=analysis['tcp'] , subject='throughput_cov' ),
+                    extract_plot_dataset( test_results=analysis['udp'] , subject='throughput_cov' )
+                ], 
+                 title="Interval Throughput Variation vs Bottleneck Bandwidth",
+                 xlabel="Bottleneck Bandwidth (Mbps)",
+                 ylabel="Coefficient of variation",
+                 labels=["TCP" , "UDP"],
+                 plot_file_name="stability.png"
+            )
+    plot_test_results( 
+                 data_sets=[
+                    extract_plot_dataset( test_results=analysis['udp'] , subject='jitter_ms_p50' ),
+                    extract_plot_dataset( test_results=analysis['udp'] , subject='jitter_ms_p99' ),
+                    extract_plot_dataset( test_results=analysis['udp'] , subject='lost_percent_p99' )
+                ], 
+                 title="UDP Jitter and Loss Percentiles vs Bottleneck Bandwidth",
+                 xlabel="Bottleneck Bandwidth (Mbps)",
+                 ylabel="Jitter (ms) / Loss (%)",
+                 labels=["Jitter p50" , "Jitter p99" , "Loss p99"],
+                 plot_file_name="udp-intervals.png"
             )
 
 
+def run_telemetry_analysis( point_runs : dict ) -> None:
+    """
+    Procedure aligns the bottleneck telemetry sampled during every flow with the flow's iperf
+    intervals (see telemetry.align_telemetry) and writes it to 'telemetry.json' in the final
+    result directory, per bottleneck bandwidth, as a list of flows.<br>
+    
+    Parameters:<br>
+    - <strong>point_runs</strong>   : <code>dict</code> bottleneck bandwidth to the run (or runs) which measured it<br>
+    
+    Returns:<br>
+    - None
+    """
+    from telemetry import align_telemetry
+    
+    analysis = {}
+    with TRACE.span( 'align telemetry' , 'analysis' ):
+        store = ResultStore( RESULT_DATABASE )
+        try:
+            for bw, run_ids in point_runs.items():
+                analysis[bw] = []
+                for run_id in ( run_ids if isinstance( run_ids , list ) else [ run_ids ] ):
+                    # a retried test case is recorded again... the latest record wins
+                    flows = { ( x['protocol'] , x['case_id'] ) : x for x in store.query_flows( run_id=run_id , bw_bottleneck=bw ) }
+                    for flow in flows.values():
+                        telemetry = store.load_telemetry( flow['id'] )
+                        if telemetry is None:
+                            continue
+                        analysis[bw].append({
+                            'run_id'            : run_id,
+                            'protocol'          : flow['protocol'],
+                            'case_id'           : flow['case_id'],
+                            'link_interfaces'   : telemetry['link_interfaces'],
+                            'intervals'         : align_telemetry( telemetry , store.load_intervals( flow['id'] ) )
+                        })
+        finally:
+            store.close()
+    with open("{}telemetry.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(analysis, f)
+
+
+def calculate_spread( values : list ) -> float:
+    # max/min throughput ratio... 1 for equal shares, None when one got nothing
+    return max( values ) / min( values ) if values and min( values ) > 0 else None
+
+
+def summarize_fairness( values : list ) -> dict:
+    # Jain's index and spread of the throughputs (bits/s) sharing the bottleneck
+    return {
+        'count'         : len( values ),
+        'jain_index'    : calculate_jain_index( values ) if values else None,
+        'max_bps'       : max( values ) if values else None,
+        'min_bps'       : min( values ) if values else None,
+        'spread'        : calculate_spread( values )
+    }
+
+
+def aggregate_fairness( summaries : list , key : str ) -> dict:
+    # mean and lowest Jain index and widest spread of several summaries (see summarize_fairness)
+    indexes = [ x['jain_index'] for x in summaries if x['jain_index'] is not None ]
+    spreads = [ x['spread'] for x in summaries if x['spread'] is not None ]
+    return {
+        'jain_index_mean'   : sum( indexes ) / len( indexes ) if indexes else None,
+        'jain_index_min'    : min( indexes ) if indexes else None,
+        'spread_max'        : max( spreads ) if spreads else None,
+        key                 : summaries
+    }
+
+
+def run_fairness_analysis( point_runs : dict ) -> dict:
+    """
+    Function computes the fairness of every bottleneck bandwidth, per protocol: Jain's fairness index and
+    the max/min throughput spread across the parallel streams of every flow (from the per-stream iperf
+    results, see -streams), and across the flows of a run sharing the bottleneck (see -concurrent).
+    Both are summarized (over the flows, and over the runs of repeated measurements) as the mean and
+    lowest Jain index and the widest spread.
+    Written to 'fairness.json' in the final result directory, the indexes are plotted per bandwidth.<br>
+    
+    Parameters:<br>
+    - <strong>point_runs</strong>   : <code>dict</code> bottleneck bandwidth to the run (or runs) which measured it<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to protocol to { 'streams' , 'flows' }
+    """
+    analysis = {}
+    with TRACE.span( 'analyze fairness' , 'analysis' ):
+        store = ResultStore( RESULT_DATABASE )
+        try:
+            for bw, run_ids in point_runs.items():
+                analysis[bw] = {}
+                for protocol in ( 'tcp' , 'udp' ):
+                    per_stream, across_flows = [], []
+                    for run_id in ( run_ids if isinstance( run_ids , list ) else [ run_ids ] ):
+                        # a retried test case is recorded again... the latest record wins
+                        flows = { x['case_id'] : x for x in store.query_flows( run_id=run_id , bw_bottleneck=bw , protocol=protocol ) }
+                        # flows share the bottleneck only when run concurrently
+                        goodputs = [ x['bytes_received'] * 8 / x['seconds'] for x in flows.values() if x['seconds'] ]
+                        if len( goodputs ) > 1 and "-concurrent" in MEASUREMENT_FLAGS:
+                            across_flows.append( summarize_fairness( goodputs ) )
+                        for flow in flows.values():
+                            streams = [ x['bits_per_second'] for x in store.query_streams( flow['id'] ) if x['bits_per_second'] is not None ]
+                            if len( streams ) > 1:
+                                per_stream.append( summarize_fairness( streams ) )
+                    analysis[bw][protocol] = {
+                        'streams'   : aggregate_fairness( per_stream , 'per_flow' ),
+                        'flows'     : aggregate_fairness( across_flows , 'per_run' )
+                    }
+        finally:
+            store.close()
+    with open("{}fairness.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(analysis, f)
+    
+    # plotted where measured... a bandwidth without multiple streams or flows has no index
+    data_sets, labels = [], []
+    for protocol in ( 'tcp' , 'udp' ):
+        streams = { bw : analysis[bw][protocol]['streams']['jain_index_mean'] for bw in analysis
+                    if analysis[bw][protocol]['streams']['jain_index_mean'] is not None }
+        if streams:
+            data_sets.append( streams )
+            labels.append( "{} streams".format( protocol.upper() ) )
+    flows = { bw : analysis[bw]['tcp']['flows']['jain_index_mean'] for bw in analysis
+              if analysis[bw]['tcp']['flows']['jain_index_mean'] is not None }
+    if flows:
+        data_sets.append( flows )
+        labels.append( "TCP flows" )
+    if data_sets:
+        plot_test_results( 
+                     data_sets=data_sets, 
+                     title="Jain's Fairness Index vs Bottleneck Bandwidth",
+                     xlabel="Bottleneck Bandwidth (Mbps)",
+                     ylabel="Jain's fairness index",
+                     labels=labels,
+                     plot_file_name="fairness.png"
+                )
+    return analysis
+
+
+def calculate_cpu_efficiency( point_runs : dict ) -> dict:
+    """
+    Function computes the CPU cost of every bottleneck bandwidth, per protocol: the CPU seconds the
+    sender (client) and receiver (server) iperf processes spent per gigabyte they sent and received,
+    from the <code>cpu_utilization_percent</code> iperf reports (see result_store.extract_cpu_utilization).<br>
+    
+    Parameters:<br>
+    - <strong>point_runs</strong>   : <code>dict</code> bottleneck bandwidth to the run (or runs) which measured it<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to protocol to { 'flows' , 'goodput_bps' , 'sender_cpu_percent' , 'receiver_cpu_percent' ,
+    'sender_cpu_s_per_gb' , 'receiver_cpu_s_per_gb' }... None values without CPU reports
+    """
+    efficiency = {}
+    store = ResultStore( RESULT_DATABASE )
+    try:
+        for bw, run_ids in point_runs.items():
+            efficiency[bw] = {}
+            for protocol in ( 'tcp' , 'udp' ):
+                sent, received, seconds, sender_cpu, receiver_cpu = 0, 0, 0.0, 0.0, 0.0
+                flows = 0
+                for run_id in ( run_ids if isinstance( run_ids , list ) else [ run_ids ] ):
+                    # a retried test case is recorded again... the latest record wins
+                    for flow in { x['case_id'] : x for x in store.query_flows( run_id=run_id , bw_bottleneck=bw , protocol=protocol ) }.values():
+                        cpu = extract_cpu_utilization( store.load_raw( flow['id'] ) )
+                        if cpu['sender_percent'] is None or cpu['receiver_percent'] is None or not flow['seconds']:
+                            continue
+                        flows           += 1
+                        sent            += flow['bytes_sent']
+                        received        += flow['bytes_received']
+                        seconds         += flow['seconds']
+                        # CPU seconds of one CPU over the test
+                        sender_cpu      += cpu['sender_percent'] / 100 * flow['seconds']
+                        receiver_cpu    += cpu['receiver_percent'] / 100 * flow['seconds']
+                efficiency[bw][protocol] = {
+                    'flows'                 : flows,
+                    'goodput_bps'           : received * 8 / seconds if seconds else None,
+                    'sender_cpu_percent'    : 100 * sender_cpu / seconds if seconds else None,
+                    'receiver_cpu_percent'  : 100 * receiver_cpu / seconds if seconds else None,
+                    'sender_cpu_s_per_gb'   : sender_cpu / ( sent / 1e9 ) if sent else None,
+                    'receiver_cpu_s_per_gb' : receiver_cpu / ( received / 1e9 ) if received else None
+                }
+    finally:
+        store.close()
+    return efficiency
+
+
+def run_cpu_efficiency_analysis( point_runs : dict ) -> dict:
+    """
+    Function reports the CPU cost per transferred gigabyte of every bottleneck bandwidth (see
+    calculate_cpu_efficiency), written to 'cpu-efficiency.json' in the final result directory and
+    plotted per bandwidth for the senders and receivers.<br>
+    
+    Parameters:<br>
+    - <strong>point_runs</strong>   : <code>dict</code> bottleneck bandwidth to the run (or runs) which measured it<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to protocol to CPU cost (see calculate_cpu_efficiency)
+    """
+    with TRACE.span( 'analyze cpu efficiency' , 'analysis' ):
+        efficiency = calculate_cpu_efficiency( point_runs )
+    with open("{}cpu-efficiency.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(efficiency, f)
+    
+    data_sets, labels = [], []
+    for protocol in ( 'tcp' , 'udp' ):
+        for side in ( 'sender' , 'receiver' ):
+            subject = "{}_cpu_s_per_gb".format( side )
+            data_set = { bw : efficiency[bw][protocol][subject] for bw in efficiency if efficiency[bw][protocol][subject] is not None }
+            if data_set:
+                data_sets.append( data_set )
+                labels.append( "{} {}".format( protocol.upper() , side ) )
+    if data_sets:
+        plot_test_results( 
+                     data_sets=data_sets, 
+                     title="CPU Cost per Gigabyte vs Bottleneck Bandwidth",
+                     xlabel="Bottleneck Bandwidth (Mbps)",
+                     ylabel="CPU seconds per GB",
+                     labels=labels,
+                     plot_file_name="cpu-efficiency.png"
+                )
+    return efficiency
+
+
+def run_zerocopy_benchmark() -> dict:
+    """
+    Function measures every constraint twice, with the copying and the zero-copy (sendfile) TCP send path,
+    each under its own run ('{RUN_ID}-copy' and '{RUN_ID}-zerocopy') and point configuration (both are
+    memoized), and compares their TCP goodput and CPU cost per gigabyte (see calculate_cpu_efficiency).
+    Written to 'zerocopy-benchmark.json' in the final result directory, the sender and receiver CPU
+    costs of both paths are plotted per bandwidth.<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to { 'copy' , 'zerocopy' , 'sender_cpu_saving' }... the saving being the
+    fraction of the copying sender's CPU per gigabyte zero-copy avoids
+    """
+    global MEASUREMENT_FLAGS, BOTTLENECK_FLAGS
+    measurement_flags, bottleneck_flags = MEASUREMENT_FLAGS, BOTTLENECK_FLAGS
+    
+    modes = {}
+    try:
+        for mode in ( 'copy' , 'zerocopy' ):
+            extra = [ "-zerocopy" ] if mode == 'zerocopy' else []
+            MEASUREMENT_FLAGS   = [ x for x in measurement_flags if x != "-zerocopy" ] + extra
+            BOTTLENECK_FLAGS    = [ x for x in bottleneck_flags if x != "-zerocopy" ] + extra
+            _, point_runs = measure_constraints( CONSTRAINTS , variant=mode )
+            with TRACE.span( 'analyze cpu efficiency' , 'analysis' ):
+                modes[mode] = calculate_cpu_efficiency( point_runs )
+    finally:
+        MEASUREMENT_FLAGS, BOTTLENECK_FLAGS = measurement_flags, bottleneck_flags
+    
+    benchmark = {}
+    for bw in sorted( set( modes['copy'] ) & set( modes['zerocopy'] ) ):
+        copy, zerocopy = modes['copy'][bw]['tcp'] , modes['zerocopy'][bw]['tcp']
+        benchmark[bw] = {
+            'copy'              : copy,
+            'zerocopy'          : zerocopy,
+            'sender_cpu_saving' : 1 - zerocopy['sender_cpu_s_per_gb'] / copy['sender_cpu_s_per_gb']
+                                  if copy['sender_cpu_s_per_gb'] and zerocopy['sender_cpu_s_per_gb'] is not None else None
+        }
+    with open("{}zerocopy-benchmark.json".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        json.dump(benchmark, f)
+    
+    data_sets, labels = [], []
+    for mode in ( 'copy' , 'zerocopy' ):
+        for side in ( 'sender' , 'receiver' ):
+            subject = "{}_cpu_s_per_gb".format( side )
+            data_set = { bw : benchmark[bw][mode][subject] for bw in benchmark if benchmark[bw][mode][subject] is not None }
+            if data_set:
+                data_sets.append( data_set )
+                labels.append( "{} {}".format( mode , side ) )
+    if data_sets:
+        plot_test_results( 
+                     data_sets=data_sets, 
+                     title="TCP CPU Cost per Gigabyte, Copy vs Zero-Copy",
+                     xlabel="Bottleneck Bandwidth (Mbps)",
+                     ylabel="CPU seconds per GB",
+                     labels=labels,
+                     plot_file_name="zerocopy.png"
+                )
+    return benchmark
+
+
+def write_trace_report() -> None:
+    """
+    Procedure writes the recorded spans (see run_traced) to 'trace.json' in the final result directory,
+    as a Chrome trace-event file, and the overhead versus measurement time per sweep point
+    (see spans.summarize_spans) to 'timing-summary.txt'.<br>
+    
+    Returns:<br>
+    - None
+    """
+    TRACE.write( "{}trace.json".format(FINAL_RESULT_DIRECTORY) )
+    table = format_span_summary( summarize_spans( TRACE.events() ) )
+    with open("{}timing-summary.txt".format(FINAL_RESULT_DIRECTORY), 'w') as f:
+        f.write( table + "\n" )
+    print( table )
+
+
+def write_report() -> None:
+    """
+    Procedure renders the charts queued by this sweep (see plot_test_results), each saved to the
+    plot directory, into one self-contained HTML report, 'report-{RUN_ID}.html' in the final
+    result directory (see report.py).<br>
+    
+    Returns:<br>
+    - None
+    """
+    if not len( REPORT ):
+        return
+    report_file = "{}report-{}.html".format( FINAL_RESULT_DIRECTORY , RUN_ID )
+    with TRACE.span( 'render report' , 'analysis' , charts=len( REPORT ) ):
+        rendered = REPORT.render( PLOT_DIRECTORY , report_file , workers=REPORT_WORKERS )
+    print( "{} of {} charts rendered to {}".format( rendered , len( REPORT ) , report_file ) )
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-time", help="Specify duration of iperf tests... 5 seconds by default", type=int, default=5)
     parser.add_argument("-constraints", help="Specify bandwidth bottlenecks to test in network sumulation. Separate by spaces (ex. '# # #')", type=str, default="8 32 64")
+    parser.add_argument("-sweep", help="Build one network and reshape the bottleneck link in place for every constraint", action="store_true")
+    parser.add_argument("-agents", help="Run iperf tests through resident per-host agents instead of spawning server.py/client.py", action="store_true")
+    parser.add_argument("-concurrent", help="Run the TCP and UDP flows at the same time so they contend on the bottleneck", action="store_true")
+    parser.add_argument("-parallel", help="Run the constraints at once as isolated network instances, capped by a CPU budget", action="store_true")
+    parser.add_argument("-cpus_per_worker", help="CPUs pinned to each parallel worker (default 2)", type=int, default=2)
+    parser.add_argument("-streams", help="Parallel streams of every iperf flow... Jain's fairness index and max/min spread across streams (and -concurrent flows) are written to fairness.json", type=int, default=1)
+    parser.add_argument("-zerocopy", help="Send the TCP flows' data with iperf's zero-copy (sendfile) method", action="store_true")
+    parser.add_argument("-zerocopy_benchmark", help="Measure every constraint with the copying and the zero-copy TCP send path and compare their CPU cost per GB in zerocopy-benchmark.json", action="store_true")
+    parser.add_argument("-tune", help="Search the best client block size and socket buffer of every constraint (and -tune_delays delay) and keep them for later sweeps, reported in tuning.json", action="store_true")
+    parser.add_argument("-tune_delays", help="Client tuning: bottleneck delays (ms) to tune. Separate by spaces (default '0')", type=str, default="0")
+    parser.add_argument("-no_tuning", help="Run the clients with the default block size and socket buffer even where tuned settings exist", action="store_true")
+    parser.add_argument("-intervals", help="Summarize the per-second iperf intervals (stability, retransmits, cwnd/RTT traces, UDP jitter/loss percentiles)", action="store_true")
+    parser.add_argument("-parallel_probes", help="Send all ifconfig/ping probes at once and record structured ping summaries", action="store_true")
+    parser.add_argument("-repeat", help="Measure every constraint this many times (interleaved) and plot means with bootstrap confidence intervals", type=int, default=1)
+    parser.add_argument("-repeat_tolerance", help="Stop repeating a constraint (after 3 rounds) once its confidence intervals are within this fraction of the mean", type=float, default=None)
+    parser.add_argument("-force", help="Measure every constraint, even those already measured with the same configuration", action="store_true")
+    parser.add_argument("-max_age", help="Re-measure constraints whose matching measurement is older than this many hours", type=float, default=None)
+    parser.add_argument("-converge", help="Stop iperf tests once the throughput 95%% confidence interval is within this fraction of the mean (requires the iperf3 3.17+ binary)", type=float, default=None)
+    parser.add_argument("-min_time", help="Convergence mode: minimum test duration (s, default 2)", type=int, default=2)
+    parser.add_argument("-max_time", help="Convergence mode: maximum test duration (s), -time by default", type=int, default=None)
+    parser.add_argument("-omit", help="Convergence mode: warm-up (s) excluded from the convergence test (default 1)", type=int, default=1)
+    parser.add_argument("-adaptive", help="Start from the constraints and bisect around the throughput knee (reliability drop, UDP loss, throughput no longer tracking the bottleneck)", action="store_true")
+    parser.add_argument("-resolution", help="Adaptive mode: stop refining knee intervals narrower than this (Mbps, default 2)", type=int, default=2)
+    parser.add_argument("-max_points", help="Adaptive mode: maximum number of constraints measured (default 16)", type=int, default=16)
+    parser.add_argument("-loss_threshold", help="Adaptive mode: UDP loss (%%) marking the knee (default 1)", type=float, default=1.0)
+    parser.add_argument("-udp_search", help="Search the UDP capacity of every constraint by ramping the target bitrate ('step': 0.5x to 1.5x the bottleneck in 0.1x steps, 'binary': bisection up to 2x) while loss stays within -udp_loss", choices=["step", "binary"], default=None)
+    parser.add_argument("-udp_loss", help="UDP saturation search: highest acceptable loss (%%) (default 1)", type=float, default=1.0)
+    parser.add_argument("-grid", help="Bottleneck link parameter levels, 'parameter=levels' separated by spaces (ex. 'bw=8,32,64 delay=0:40:3 loss=0,1 max_queue_size=100,1000')... bw defaults to the constraints. Measured in one reconfigured network and reported in grid.json (replaces the bandwidth sweep modes)", type=str, default=None)
+    parser.add_argument("-edge_grid", help="Host link parameter levels, as -grid (bw, delay, jitter, loss, max_queue_size)", type=str, default=None)
+    parser.add_argument("-design", help="Grid points measured: 'full' (every combination), 'lhs' (Latin-hypercube sample) or 'fractional' (two-level fractional factorial)", choices=DESIGNS, default='full')
+    parser.add_argument("-samples", help="Latin-hypercube design: number of points (default the most levels of a parameter)", type=int, default=None)
+    parser.add_argument("-fraction", help="Fractional factorial design: p of the 2^(k-p) design (default the smallest resolution III design)", type=int, default=None)
+    parser.add_argument("-seed", help="Latin-hypercube design: random seed (default 0)", type=int, default=0)
+    parser.add_argument("-congestion", help="Test every constraint with each of these TCP congestion control algorithms, and (with -agents) every pair on concurrent flows for fairness. Separate by spaces (ex. 'cubic reno bbr')", type=str, default=None)
+    parser.add_argument("-qdiscs", help="Compare bottleneck queue disciplines (taildrop, red, codel, fq_codel, pie) under a saturating TCP workload with concurrent RTT pings, for every constraint. Separate by spaces (ex. 'taildrop red fq_codel')", type=str, default=None)
+    parser.add_argument("-qdisc_limit", help="Queue limit (packets) of the compared disciplines (default 1000)", type=int, default=1000)
+    parser.add_argument("-rtt_interval", help="Interval (s) of the pings sampling the RTT under load (default 0.05)", type=float, default=0.05)
+    parser.add_argument("-telemetry", help="Sample bottleneck qdisc drops/backlog, switch port counters and iperf/OVS CPU use during the tests, aligned with the iperf intervals in telemetry.json", action="store_true")
+    parser.add_argument("-telemetry_interval", help="Telemetry sampling interval (s, default 0.25)", type=float, default=0.25)
+    parser.add_argument("-trace", help="Time the orchestration phases of this sweep and its measuring processes (trace.json, timing-summary.txt)", action="store_true")
+    parser.add_argument("-report_workers", help="Processes rendering the charts of the sweep report (default one per CPU)", type=int, default=None)
+    parser.add_argument("-profile", help="Sample the stack of this process and write collapsed stacks to profile.folded", action="store_true")
     args = parser.parse_args()
     TIME = args.time
     CONSTRAINTS = [ int(x) for x in args.constraints.split()]
+    SWEEP = args.sweep
+    PARALLEL = args.parallel
+    CPUS_PER_WORKER = args.cpus_per_worker
+    INTERVALS = args.intervals
+    REPEAT = args.repeat
+    REPEAT_TOLERANCE = args.repeat_tolerance
+    ADAPTIVE = args.adaptive
+    RESOLUTION = max( args.resolution , 1 )
+    MAX_POINTS = args.max_points
+    LOSS_THRESHOLD = args.loss_threshold / 100
+    FORCE = args.force
+    if args.grid or args.edge_grid:
+        GRID = { **parse_parameter_ranges( args.grid ) , **parse_parameter_ranges( args.edge_grid , prefix=EDGE_PREFIX ) }
+    DESIGN = args.design
+    UDP_SEARCH = args.udp_search
+    UDP_LOSS = args.udp_loss
+    CONGESTION = args.congestion.split() if args.congestion else None
+    QDISCS = args.qdiscs.split() if args.qdiscs else None
+    QDISC_LIMIT = args.qdisc_limit
+    RTT_INTERVAL = args.rtt_interval
+    SAMPLES = args.samples
+    FRACTION = args.fraction
+    SEED = args.seed
+    MAX_AGE = args.max_age
+    ZEROCOPY_BENCHMARK = args.zerocopy_benchmark
+    REPORT_WORKERS = args.report_workers
+    TUNE = args.tune
+    TUNE_DELAYS = [ float(x) for x in args.tune_delays.split() ]
+    USE_TUNING = not args.no_tuning
+    MEASUREMENT_FLAGS = [ "-{}".format(x) for x in ("agents", "concurrent", "parallel_probes", "zerocopy") if getattr(args, x) ]
+    if args.converge is not None:
+        MEASUREMENT_FLAGS += [ "-converge", str(args.converge), "-min_time", str(args.min_time), "-omit", str(args.omit),
+                               "-max_time", str(args.max_time if args.max_time else args.time) ]
+    STREAMS = args.streams
+    if STREAMS > 1:
+        MEASUREMENT_FLAGS += [ "-streams", str(STREAMS) ]
+    BOTTLENECK_FLAGS = list( MEASUREMENT_FLAGS )
+    # the tuned settings themselves are part of the point configuration (see generate_point_config)
+    if USE_TUNING:
+        BOTTLENECK_FLAGS += [ "-tuned" ]
+    # telemetry only observes the tests... not part of the point configuration (use -force to sample memoized points)
+    TELEMETRY = args.telemetry
+    if TELEMETRY:
+        BOTTLENECK_FLAGS += [ "-telemetry", "-telemetry_interval", str(args.telemetry_interval) ]
+    # absolute... parallel workers run from their own directories
+    BOTTLENECK_FLAGS += [ "-database", os.path.abspath(RESULT_DATABASE) ]
     init_file_system()
-    main()
+    if args.trace:
+        TRACE.enable()
+    if args.profile:
+        SamplingProfiler( "{}profile.folded".format(FINAL_RESULT_DIRECTORY) ).start()
+    try:
+        with TRACE.span( 'analyze-perf.py' , 'process' ):
+            main()
+    except KeyboardInterrupt:
+        # no further points... those measured so far are recorded (and memoized) in the result store
+        print("interrupted by the user")
+        raise SystemExit(130)
+    write_report()
+    if args.trace:
+        write_trace_report()
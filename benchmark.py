@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+# Harness benchmarks... measure the orchestration overhead of the testing modules
+# rather than the network under test. Must be run with the privileges mininet requires.
+import argparse
+import resource
+from time import perf_counter
+from mininet.net import Mininet
+import network_bottleneck
+from topology import TieredBottleneckTopo
+
+
+def time_back_to_back_tests( network , runs : int ) -> list:
+    """
+    Function runs the h1 -> h3 tcp iperf test back to back and times every test.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance<br>
+    - <strong>runs</strong>     : <code>int</code> number of tests to run<br>
+    
+    Returns:<br>
+    - <code>list</code> wall time (seconds) of each test
+    """
+    timings = []
+    for _ in range(runs):
+        started = perf_counter()
+        network_bottleneck.run_iperf_client_server_test(
+                                    client_name     =   'h1',
+                                    server_name     =   'h3',
+                                    network         =   network,
+                                    service_port    =   5000,
+                                    tcp_udp         =   'tcp'
+                                )
+        timings.append( perf_counter() - started )
+    return timings
+
+
+def benchmark_agent_overhead( runs : int , time_seconds : int ) -> dict:
+    """
+    Function compares the per-test overhead of spawning server.py/client.py against
+    the resident per-host agents. Overhead is the wall time of a test beyond its
+    nominal iperf duration.<br>
+    
+    Parameters:<br>
+    - <strong>runs</strong>         : <code>int</code> number of tests per mode<br>
+    - <strong>time_seconds</strong> : <code>int</code> duration of each iperf test<br>
+    
+    Returns:<br>
+    - <code>dict</code> mode -> mean per-test overhead (seconds)
+    """
+    network_bottleneck.TIME = time_seconds
+    network = network_bottleneck.build_network()
+    try:
+        spawn_timings = time_back_to_back_tests( network , runs )
+        network_bottleneck.start_host_agents( network )
+        agent_timings = time_back_to_back_tests( network , runs )
+    finally:
+        network_bottleneck.stop_host_agents()
+        network.stop()
+    
+    return {
+        'spawn' : sum(spawn_timings) / runs - time_seconds,
+        'agent' : sum(agent_timings) / runs - time_seconds
+    }
+
+
+def read_available_memory() -> int:
+    """
+    Function reads the system wide available memory from <code>/proc/meminfo</code>.<br>
+    
+    Returns:<br>
+    - <code>int</code> available memory (kB)
+    """
+    with open('/proc/meminfo', 'r') as f:
+        for line in f:
+            if line.startswith('MemAvailable:'):
+                return int( line.split()[1] )
+    return 0
+
+
+def benchmark_topology_scaling( host_counts : list , bw_bottleneck : int = 10 ) -> list:
+    """
+    Function builds a <code>TieredBottleneckTopo</code> for every host count (half senders,
+    half receivers) and records construction, <code>start()</code> and <code>stop()</code> time along with
+    the memory consumed by the running network.<br>
+    
+    Parameters:<br>
+    - <strong>host_counts</strong>      : <code>list</code> total host counts to measure<br>
+    - <strong>bw_bottleneck</strong>    : <code>int</code> bandwidth of the bottleneck link (Mbps)<br>
+    
+    Returns:<br>
+    - <code>list</code> one dictionary per host count...
+        { 'hosts', 'build', 'start', 'stop', 'system_memory_kb', 'orchestrator_max_rss_kb' }
+    """
+    measurements = []
+    for hosts in host_counts:
+        senders     = hosts // 2
+        available   = read_available_memory()
+        
+        started = perf_counter()
+        network = Mininet( topo = TieredBottleneckTopo( senders = senders , receivers = hosts - senders , tier_bw = [ bw_bottleneck ] ) )
+        build   = perf_counter() - started
+        
+        started = perf_counter()
+        network.start()
+        start   = perf_counter() - started
+        
+        # memory held by namespaces, bridges, veths and node shells while the network runs
+        system_memory = available - read_available_memory()
+        
+        started = perf_counter()
+        network.stop()
+        stop    = perf_counter() - started
+        
+        measurements.append({
+            'hosts'                     : hosts,
+            'build'                     : build,
+            'start'                     : start,
+            'stop'                      : stop,
+            'system_memory_kb'          : system_memory,
+            'orchestrator_max_rss_kb'   : resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+        })
+    return measurements
+
+
+if __name__ == "__main__" :
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument("benchmark", help="Benchmark to run", choices=["agent", "scaling"])
+    parser.add_argument("-runs", help="Number of tests per measured mode", type=int, default=10)
+    parser.add_argument("-time", help="Duration of each iperf test (s)", type=int, default=1)
+    parser.add_argument("-hosts", help="Host counts to build for the scaling benchmark. Separate by spaces (ex. '# # #')", type=str, default="4 8 16 32 64")
+    args = parser.parse_args()
+    
+    if args.benchmark == "agent":
+        overhead = benchmark_agent_overhead( runs = args.runs , time_seconds = args.time )
+        print("per-test overhead (s) over {} runs of {}s".format(args.runs, args.time))
+        for mode, seconds in overhead.items():
+            print("  {:<8} {:.3f}".format(mode, seconds))
+    
+    elif args.benchmark == "scaling":
+        measurements = benchmark_topology_scaling( host_counts = [ int(x) for x in args.hosts.split() ] )
+        print("{:>6} {:>9} {:>9} {:>9} {:>12} {:>12}".format("hosts", "build(s)", "start(s)", "stop(s)", "sys mem(kB)", "max rss(kB)"))
+        for m in measurements:
+            print("{:>6} {:>9.3f} {:>9.3f} {:>9.3f} {:>12} {:>12}".format(
+                m['hosts'], m['build'], m['start'], m['stop'], m['system_memory_kb'], m['orchestrator_max_rss_kb']
+            ))
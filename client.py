@@ -2,49 +2,293 @@
 import argparse
 import iperf3
 import json
+import signal
+import statistics
 import subprocess
 import os
-from configure import  IPERF_DIRECTORY
+from ctypes import c_char_p, c_int, c_void_p
+from time import perf_counter
+from configure import  IPERF_DIRECTORY , TCP_BLKSIZE , UDP_BLKSIZE
 #Handles the client code for the Networking Homework 3 Assignment.
-if __name__ == "__main__" :
 
-    #Declare the parser and set arguments for the Client IP, Port, Server IP and what type of connection it is. 
-    parser = argparse.ArgumentParser()
-    parser.add_argument("-ip", help="Client IP address", type=str, default="127.0.0.2")
-    parser.add_argument("-port", help="Server service address", type=int, default=5000)
-    parser.add_argument("-server_ip", help="Server IP address", type=str, default="127.0.0.1")
-    parser.add_argument("-test", help="TCP or UDP iperf3 connection ('tcp' or 'udp')", type=str)
-    parser.add_argument("-time", help="Duration of iperf3 test (seconds)", type=int, default=60)
+# convergence mode... two sided 95% student t critical values by degrees of freedom (1 - 30)
+T_CRITICAL_95 = ( 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                  2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+                  2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042 )
+# error the server reports when a converged client ends the test early
+CLIENT_INTERRUPT_ERROR = "the client has terminated"
 
-    args = parser.parse_args()
+
+def run_client( client_ip : str , service_port : int , server_ip : str , tcp_udp : str , time_seconds : int , congestion : str = None ,
+                bandwidth : int = None , streams : int = 1 , zerocopy : bool = False , blksize : int = None , socket_buffer : int = None ):
+    """
+    Function configures and runs an <code>iperf3</code> client test against the provided server.<br>
+    
+    Parameters:<br>
+    - <strong>client_ip</strong>        : <code>string</code> the ipv4 address designated for the client<br>
+    - <strong>service_port</strong>     : <code>int</code> the service port designated for the server<br>
+    - <strong>server_ip</strong>        : <code>string</code> the ipv4 address designated for the server<br>
+    - <strong>tcp_udp</strong>          : <code>string</code> specify tcp or udp iperf test<br>
+    - <strong>time_seconds</strong>     : <code>int</code> duration of the iperf test<br>
+    - <strong>congestion</strong>       : <code>string</code> TCP congestion control algorithm (e.g. cubic, reno, bbr), the kernel default when None<br>
+    - <strong>bandwidth</strong>        : <code>int</code> target bitrate (bits/s), iperf's default (1 Mbit/s for UDP, unlimited for TCP) when None<br>
+    - <strong>streams</strong>          : <code>int</code> parallel streams (default 1)... iperf reports each in end.streams<br>
+    - <strong>zerocopy</strong>         : <code>bool</code> send TCP data with sendfile() instead of copying it from user space<br>
+    - <strong>blksize</strong>          : <code>int</code> bytes per write, <code>TCP_BLKSIZE</code> or <code>UDP_BLKSIZE</code> when None<br>
+    - <strong>socket_buffer</strong>    : <code>int</code> socket buffer (TCP window) size (bytes), the kernel's autotuning when None<br>
+    
+    Returns:<br>
+    - <code>iperf3.TestResult</code> the client side test result
+    """
     #Client details are listed below
     client                  = iperf3.Client()
-    client.duration         = int(args.time)
-    client.server_hostname  = str(args.server_ip)
-    client.bind_address     = str(args.ip)
-    client.port             = int(args.port)
-    client.protocol         = str(args.test)
-
-    if args.test == 'tcp':
-        client.blksize          = 22016
+    client.duration         = int(time_seconds)
+    client.server_hostname  = str(server_ip)
+    client.bind_address     = str(client_ip)
+    client.port             = int(service_port)
+    client.protocol         = str(tcp_udp)
+
+    if blksize is not None:
+        client.blksize          = int(blksize)
+    elif tcp_udp == 'tcp':
+        client.blksize          = TCP_BLKSIZE
     else :
-        client.blksize          = 1234
+        client.blksize          = UDP_BLKSIZE
+    
+    if socket_buffer is not None:
+        # not exposed by the bindings... set on the underlying libiperf test
+        client.lib.iperf_set_test_socket_bufsize.argtypes = ( c_void_p , c_int )
+        client.lib.iperf_set_test_socket_bufsize( client._test , int(socket_buffer) )
+    
+    if bandwidth is not None:
+        client.bandwidth        = int(bandwidth)
+    
+    client.num_streams      = int(streams)
+    
+    if zerocopy and tcp_udp == 'tcp':
+        client.zerocopy         = True
+    
+    if congestion is not None and tcp_udp == 'tcp':
+        # not exposed by the bindings... set on the underlying libiperf test (Linux only)
+        client.lib.iperf_set_test_congestion_control.argtypes = ( c_void_p , c_char_p )
+        client.lib.iperf_set_test_congestion_control( client._test , congestion.encode() )
     
     client.json_output      = True
     
-    result = client.run()
+    return client.run()
+
+
+def measure_convergence( values : list , tolerance : float ) -> dict:
+    """
+    Function computes the 95% confidence interval of the mean of the provided interval throughputs.<br>
+    
+    Parameters:<br>
+    - <strong>values</strong>       : <code>list</code> interval throughputs (bits/s), at least two<br>
+    - <strong>tolerance</strong>    : <code>float</code> converged when the interval half width is within this fraction of the mean<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'mean_bps' , 'ci_half_width_bps' , 'relative_ci' , 'converged' }
+    """
+    mean        = statistics.mean( values )
+    half_width  = T_CRITICAL_95[ min( len(values) - 1 , len(T_CRITICAL_95) ) - 1 ] * statistics.stdev( values ) / len(values) ** 0.5
+    relative    = half_width / mean if mean else float('inf')
+    return {
+        'mean_bps'          : mean,
+        'ci_half_width_bps' : half_width,
+        'relative_ci'       : relative,
+        'converged'         : relative <= tolerance
+    }
+
+
+def run_client_until_converged( client_ip : str , service_port : int , server_ip : str , tcp_udp : str , 
+                                tolerance : float , min_seconds : int , max_seconds : int , 
+                                omit_seconds : int = 1 , window : int = 5 , congestion : str = None , bandwidth : int = None ,
+                                streams : int = 1 , zerocopy : bool = False , blksize : int = None ,
+                                socket_buffer : int = None ) -> dict:
+    """
+    Function runs an <code>iperf3</code> client test which stops as soon as the throughput settles...
+    the intervals are streamed (<code>iperf3 --json-stream</code>, iperf 3.17+) and the test is interrupted
+    once the confidence interval over the last <code>window</code> intervals past the warm-up window is
+    within <code>tolerance</code> (see measure_convergence), or after <code>max_seconds</code>.<br>
+    The python bindings only report a test once it completes, hence the iperf3 binary.<br>
+    
+    Parameters:<br>
+    - <strong>client_ip</strong>        : <code>string</code> the ipv4 address designated for the client<br>
+    - <strong>service_port</strong>     : <code>int</code> the service port designated for the server<br>
+    - <strong>server_ip</strong>        : <code>string</code> the ipv4 address designated for the server<br>
+    - <strong>tcp_udp</strong>          : <code>string</code> specify tcp or udp iperf test<br>
+    - <strong>tolerance</strong>        : <code>float</code> relative confidence interval half width to stop at<br>
+    - <strong>min_seconds</strong>      : <code>int</code> the test runs at least this long<br>
+    - <strong>max_seconds</strong>      : <code>int</code> the test runs at most this long<br>
+    - <strong>omit_seconds</strong>     : <code>int</code> warm-up (slow start) excluded from the convergence test<br>
+    - <strong>window</strong>           : <code>int</code> number of most recent intervals tested<br>
+    - <strong>congestion</strong>       : <code>string</code> TCP congestion control algorithm, the kernel default when None<br>
+    - <strong>bandwidth</strong>        : <code>int</code> target bitrate (bits/s), iperf's default when None<br>
+    - <strong>streams</strong>          : <code>int</code> parallel streams (default 1)<br>
+    - <strong>zerocopy</strong>         : <code>bool</code> send TCP data with sendfile() instead of copying it from user space<br>
+    - <strong>blksize</strong>          : <code>int</code> bytes per write, <code>TCP_BLKSIZE</code> or <code>UDP_BLKSIZE</code> when None<br>
+    - <strong>socket_buffer</strong>    : <code>int</code> socket buffer (TCP window) size (bytes), the kernel's autotuning when None<br>
     
-    data = (result.json)
+    Returns:<br>
+    - <code>dict</code> the client side JSON result (as <code>iperf3.TestResult.json</code>) with a 'convergence' section
+    """
+    command = [ "iperf3", "-c", str(server_ip), "-B", str(client_ip), "-p", str(service_port), 
+                "-t", str(max_seconds), "-i", "1", "--json-stream", "-P", str(streams),
+                "-l", str(blksize if blksize is not None else TCP_BLKSIZE if tcp_udp == 'tcp' else UDP_BLKSIZE) ]
+    if tcp_udp == 'udp':
+        command.append( "-u" )
+    else:
+        if congestion is not None:
+            command += [ "-C", congestion ]
+        if zerocopy:
+            command.append( "-Z" )
+    if bandwidth is not None:
+        command += [ "-b", str(int(bandwidth)) ]
+    if socket_buffer is not None:
+        command += [ "-w", str(int(socket_buffer)) ]
     
+    start       = perf_counter()
+    result      = { 'intervals' : [] }
+    values      = []
+    convergence = { 'converged' : False }
+    interrupted = False
+    process = subprocess.Popen( command , stdout = subprocess.PIPE , text = True )
+    for line in process.stdout:
+        try:
+            event = json.loads( line )
+        except ValueError:
+            continue
+        
+        if event['event'] == 'interval':
+            result['intervals'].append( event['data'] )
+            interval = event['data']['sum']
+            if interval['start'] >= omit_seconds and not interval.get('omitted', False):
+                values.append( interval['bits_per_second'] )
+            
+            if not interrupted and interval['end'] >= min_seconds and len(values) >= max( window , 2 ):
+                convergence = measure_convergence( values[-window:] , tolerance )
+                if convergence['converged']:
+                    # the client still reports its end section when interrupted
+                    process.send_signal( signal.SIGINT )
+                    interrupted = True
+        elif event['event'] == 'error':
+            result['error'] = event['data']
+        else:
+            result[event['event']] = event['data']
+    process.wait()
+    
+    # our own interrupt is not a failure
+    if interrupted and 'end' in result:
+        result.pop( 'error' , None )
+    
+    convergence.update({
+        'tolerance'     : tolerance,
+        'window'        : window,
+        'omit_seconds'  : omit_seconds,
+        'intervals'     : len(values),
+        'seconds'       : perf_counter() - start
+    })
+    result['convergence'] = convergence
+    return result
+
+
+def is_client_interrupt( data : dict ) -> bool:
+    """
+    Function tells whether a server side result only failed because a converged client
+    ended the test early (see run_client_until_converged).<br>
+    
+    Parameters:<br>
+    - <strong>data</strong>     : <code>dict</code> the server side JSON result<br>
+    
+    Returns:<br>
+    - <code>bool</code>
+    """
+    return CLIENT_INTERRUPT_ERROR in str( data.get('error', '') ) and 'end' in data
+
+
+def dump_client_result( result ) -> str:
+    """
+    Procedure writes the client side test result to the iperf result directory.<br>
+    
+    Parameters:<br>
+    - <strong>result</strong>   : <code>iperf3.TestResult</code> the client side test result (or its JSON <code>dict</code>)<br>
+    
+    Returns:<br>
+    - <code>string</code> the name of the written file
+    """
+    data = result if isinstance( result , dict ) else (result.json)
+    connected = data['start']['connected'][0]
     
     file_name = "{}c-iperf-client-{}-to-server-{}-test-{}.json".format(
         IPERF_DIRECTORY,
-        result.local_host,
-        result.remote_host,
-        result.protocol
+        connected['local_host'],
+        connected['remote_host'],
+        data['start']['test_start']['protocol']
     )
     
     with open(file_name, 'w') as f:
         json.dump(data, f)
-  
     
+    return file_name
+
+
+if __name__ == "__main__" :
+
+    #Declare the parser and set arguments for the Client IP, Port, Server IP and what type of connection it is. 
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-ip", help="Client IP address", type=str, default="127.0.0.2")
+    parser.add_argument("-port", help="Server service address", type=int, default=5000)
+    parser.add_argument("-server_ip", help="Server IP address", type=str, default="127.0.0.1")
+    parser.add_argument("-test", help="TCP or UDP iperf3 connection ('tcp' or 'udp')", type=str)
+    parser.add_argument("-time", help="Duration of iperf3 test (seconds)", type=int, default=60)
+    parser.add_argument("-congestion", help="TCP congestion control algorithm (e.g. cubic, reno, bbr... see /proc/sys/net/ipv4/tcp_available_congestion_control), the kernel default by default", type=str, default=None)
+    parser.add_argument("-bandwidth", help="Target bitrate (bits/s), iperf3's default (1 Mbit/s for UDP, unlimited for TCP) by default", type=int, default=None)
+    parser.add_argument("-streams", help="Parallel streams of the test", type=int, default=1)
+    parser.add_argument("-zerocopy", help="Send TCP data with the zero-copy (sendfile) method", action="store_true")
+    parser.add_argument("-blksize", help="Bytes per write, {} for TCP and {} for UDP by default".format(TCP_BLKSIZE, UDP_BLKSIZE), type=int, default=None)
+    parser.add_argument("-socket_buffer", help="Socket buffer (TCP window) size (bytes), the kernel's autotuning by default", type=int, default=None)
+    parser.add_argument("-converge", help="Stop once the throughput 95%% confidence interval is within this fraction of the mean (requires the iperf3 3.17+ binary)", type=float, default=None)
+    parser.add_argument("-min_time", help="Convergence mode: minimum test duration (seconds)", type=int, default=2)
+    parser.add_argument("-max_time", help="Convergence mode: maximum test duration (seconds), -time by default", type=int, default=None)
+    parser.add_argument("-omit", help="Convergence mode: warm-up (seconds) excluded from the convergence test", type=int, default=1)
+
+    parser.add_argument("-stdout", help="Print the JSON result to stdout instead of writing it to the iperf result directory", action="store_true")
+    args = parser.parse_args()
+    
+    if args.converge is not None:
+        result = run_client_until_converged(
+                    client_ip       = args.ip,
+                    service_port    = args.port,
+                    server_ip       = args.server_ip,
+                    tcp_udp         = args.test,
+                    tolerance       = args.converge,
+                    min_seconds     = args.min_time,
+                    max_seconds     = args.max_time if args.max_time else args.time,
+                    omit_seconds    = args.omit,
+                    congestion      = args.congestion,
+                    bandwidth       = args.bandwidth,
+                    streams         = args.streams,
+                    zerocopy        = args.zerocopy,
+                    blksize         = args.blksize,
+                    socket_buffer   = args.socket_buffer
+                )
+    else:
+        result = run_client(
+                    client_ip       = args.ip,
+                    service_port    = args.port,
+                    server_ip       = args.server_ip,
+                    tcp_udp         = args.test,
+                    time_seconds    = args.time,
+                    congestion      = args.congestion,
+                    bandwidth       = args.bandwidth,
+                    streams         = args.streams,
+                    zerocopy        = args.zerocopy,
+                    blksize         = args.blksize,
+                    socket_buffer   = args.socket_buffer
+                )
+    
+    if args.stdout:
+        # single line... the orchestrator reads the result straight from the process output
+        print( json.dumps( result if isinstance( result , dict ) else result.json ) )
+    else:
+        dump_client_result( result )
@@ -0,0 +1,90 @@
+# Client block-size and socket-buffer tuning.
+# A window (socket buffer) smaller than the bandwidth-delay product of the path caps a TCP flow
+# below the link rate, and the write size (iperf blksize) sets the per-write overhead. For a
+# bottleneck profile (bandwidth, delay) the socket buffer is searched first, among the kernel's
+# autotuning and multiples of the bandwidth-delay product, then the block size at the best buffer.
+# Every trial is measured by a caller supplied function.
+from configure import TCP_BLKSIZE , UDP_BLKSIZE
+
+# bytes... UDP datagrams stay within a 1500 byte MTU (1472 bytes of payload)
+TCP_BLKSIZE_CANDIDATES  = ( 8192 , TCP_BLKSIZE , 65536 , 131072 )
+UDP_BLKSIZE_CANDIDATES  = ( 512 , UDP_BLKSIZE , 1460 )
+# socket buffers tried, as multiples of the bandwidth-delay product
+BUFFER_MULTIPLES        = ( 1 , 2 , 4 )
+# bytes... the smallest socket buffer tried
+MIN_BUFFER              = 65536
+# ms... switching and shaping latency of a path without emulated delay
+MIN_RTT                 = 1.0
+
+
+def calculate_bdp( bw : float , rtt_ms : float ) -> int:
+    """
+    Function computes the bandwidth-delay product of a path.<br>
+
+    Parameters:<br>
+    - <strong>bw</strong>       : <code>float</code> bottleneck bandwidth (Mbps)<br>
+    - <strong>rtt_ms</strong>   : <code>float</code> round trip time (ms)<br>
+
+    Returns:<br>
+    - <code>int</code> bytes in flight at the link rate
+    """
+    return int( bw * 1e6 / 8 * max( rtt_ms , MIN_RTT ) / 1000 )
+
+
+def generate_buffer_candidates( bw : float , rtt_ms : float ) -> list:
+    """
+    Function produces the socket buffer sizes tried for a profile: the kernel's autotuning (None),
+    then multiples of the bandwidth-delay product, no smaller than <code>MIN_BUFFER</code>.<br>
+
+    Parameters:<br>
+    - <strong>bw</strong>       : <code>float</code> bottleneck bandwidth (Mbps)<br>
+    - <strong>rtt_ms</strong>   : <code>float</code> round trip time (ms)<br>
+
+    Returns:<br>
+    - <code>list</code> socket buffer sizes (bytes), ascending after None
+    """
+    sizes = sorted({ max( int( calculate_bdp( bw , rtt_ms ) * x ) , MIN_BUFFER ) for x in BUFFER_MULTIPLES })
+    return [ None ] + sizes
+
+
+def search_client_settings( measure , protocol : str , bw : float , rtt_ms : float ) -> dict:
+    """
+    Function searches the client settings with the highest goodput for a profile (see the module
+    header)... one coordinate at a time, so a profile costs as many trials as there are candidates.<br>
+
+    Parameters:<br>
+    - <strong>measure</strong>  : <code>function</code> { 'blksize' , 'socket_buffer' } to goodput (bits/s), None for a failed trial<br>
+    - <strong>protocol</strong> : <code>string</code> 'tcp' or 'udp'<br>
+    - <strong>bw</strong>       : <code>float</code> bottleneck bandwidth (Mbps)<br>
+    - <strong>rtt_ms</strong>   : <code>float</code> round trip time (ms)<br>
+
+    Returns:<br>
+    - <code>dict</code> { 'protocol' , 'bdp_bytes' , 'trials' , 'best' }... best is { 'blksize' , 'socket_buffer' , 'goodput_bps' },
+    None when every trial failed
+    """
+    trials = []
+
+    def run_trial( blksize : int , socket_buffer : int ) -> None:
+        # measured once... the block size search revisits the best buffer's trial
+        if any( x['blksize'] == blksize and x['socket_buffer'] == socket_buffer for x in trials ):
+            return
+        settings = { 'blksize' : blksize , 'socket_buffer' : socket_buffer }
+        trials.append({ **settings , 'goodput_bps' : measure( settings ) })
+
+    def find_best() -> dict:
+        measured = [ x for x in trials if x['goodput_bps'] is not None ]
+        return max( measured , key = lambda x: x['goodput_bps'] ) if measured else None
+
+    default = TCP_BLKSIZE if protocol == 'tcp' else UDP_BLKSIZE
+    for socket_buffer in generate_buffer_candidates( bw , rtt_ms ):
+        run_trial( default , socket_buffer )
+    best = find_best()
+    for blksize in ( TCP_BLKSIZE_CANDIDATES if protocol == 'tcp' else UDP_BLKSIZE_CANDIDATES ):
+        run_trial( blksize , best['socket_buffer'] if best else None )
+
+    return {
+        'protocol'  : protocol,
+        'bdp_bytes' : calculate_bdp( bw , rtt_ms ),
+        'trials'    : trials,
+        'best'      : find_best()
+    }
@@ -1,6 +1,8 @@
 import subprocess
 import os
 
+# absolute location of the testing modules... workers run from their own output directories
+SCRIPT_DIRECTORY = os.path.dirname( os.path.abspath(__file__) )
 SERVICE_DIRECTORY = "./service/"
 RESULTS_DIRECTORY = "./test-results/"
 FINAL_RESULT_DIRECTORY = "{}final/".format(RESULTS_DIRECTORY)
@@ -8,7 +10,14 @@ IPERF_DIRECTORY = "{}iperf/".format(RESULTS_DIRECTORY)
 PING_DIRECTORY = "{}ping/".format(RESULTS_DIRECTORY)
 IFCONFIG_DIRECTORY = "{}ifconfig/".format(RESULTS_DIRECTORY)
 PLOT_DIRECTORY   : str    = "{}plots/".format(RESULTS_DIRECTORY)
+RESULT_DATABASE = "{}results.sqlite".format(RESULTS_DIRECTORY)
 LOG_DIRECTORY = "{}logs/".format(SERVICE_DIRECTORY)
+AGENT_DIRECTORY = "{}agents/".format(SERVICE_DIRECTORY)
+WORKER_DIRECTORY = "{}workers/".format(SERVICE_DIRECTORY)
+
+# iperf block sizes (bytes)... part of every memoized sweep configuration (see analyze-perf.py)
+TCP_BLKSIZE : int = 22016
+UDP_BLKSIZE : int = 1234
 
 def init_file_system() :
     if not os.path.exists(SERVICE_DIRECTORY):
@@ -17,6 +26,12 @@ def init_file_system() :
     if not os.path.exists(LOG_DIRECTORY):
         subprocess.run(["mkdir", LOG_DIRECTORY])
     
+    if not os.path.exists(AGENT_DIRECTORY):
+        subprocess.run(["mkdir", AGENT_DIRECTORY])
+    
+    if not os.path.exists(WORKER_DIRECTORY):
+        subprocess.run(["mkdir", WORKER_DIRECTORY])
+    
     if not os.path.exists(RESULTS_DIRECTORY):
         subprocess.run(["mkdir", RESULTS_DIRECTORY])
     
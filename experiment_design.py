@@ -0,0 +1,221 @@
+# Experiment designs over link parameters.
+# A design assigns a level to every link parameter (bottleneck bw, delay, jitter, loss,
+# max_queue_size, and the same for the edge links as 'edge_<parameter>') at every point.
+# Full grids, Latin-hypercube samples and two-level fractional factorials are supported;
+# points are then ordered so consecutive points reconfigure as few links as possible.
+import itertools
+import math
+import random
+
+# TCLink parameters... delay and jitter in ms, loss in percent, max_queue_size in packets
+LINK_PARAMETERS = ( 'bw' , 'delay' , 'jitter' , 'loss' , 'max_queue_size' )
+EDGE_PREFIX     = 'edge_'
+DESIGNS         = ( 'full' , 'lhs' , 'fractional' )
+
+
+def parse_levels( spec : str ) -> list:
+    """
+    Function parses the levels of one parameter: a comma separated list ('8,32,64') or an
+    evenly spaced range 'low:high:count' ('0:50:6').<br>
+
+    Parameters:<br>
+    - <strong>spec</strong>     : <code>string</code> the levels<br>
+
+    Returns:<br>
+    - <code>list</code> numeric levels (int where integral), in the given order
+    """
+    if ':' in spec:
+        low, high, count = spec.split( ':' )
+        low, high, count = float(low), float(high), int(count)
+        levels = [ low + ( high - low ) * x / max( count - 1 , 1 ) for x in range( count ) ]
+    else:
+        levels = [ float(x) for x in spec.split( ',' ) if x ]
+    return [ int(x) if float(x).is_integer() else x for x in levels ]
+
+
+def parse_parameter_ranges( spec : str , prefix : str = '' ) -> dict:
+    """
+    Function parses parameter ranges of one link class, e.g. 'bw=8,32,64 delay=0:40:3 loss=0,1'.<br>
+
+    Parameters:<br>
+    - <strong>spec</strong>     : <code>string</code> space separated 'parameter=levels' pairs (see parse_levels)<br>
+    - <strong>prefix</strong>   : <code>string</code> prefix of the parameter names (<code>EDGE_PREFIX</code> for the edge links)<br>
+
+    Returns:<br>
+    - <code>dict</code> parameter name to levels
+    """
+    ranges = {}
+    for item in ( spec or '' ).split():
+        name, levels = item.split( '=' , 1 )
+        if name not in LINK_PARAMETERS:
+            raise ValueError( "unknown link parameter '{}' (expected one of {})".format( name , ", ".join( LINK_PARAMETERS ) ) )
+        ranges[prefix + name] = parse_levels( levels )
+    return ranges
+
+
+def generate_full_grid( ranges : dict ) -> list:
+    """
+    Function enumerates every combination of levels, in serpentine order: the last parameter
+    sweeps up and down in turn (and so on outwards), so consecutive points differ in exactly
+    one parameter.<br>
+
+    Parameters:<br>
+    - <strong>ranges</strong>   : <code>dict</code> parameter name to levels<br>
+
+    Returns:<br>
+    - <code>list</code> of points (parameter name to level)
+    """
+    names   = list( ranges )
+    points  = [ {} ]
+    for name in names:
+        expanded = []
+        for index, point in enumerate( points ):
+            levels = ranges[name] if index % 2 == 0 else list( reversed( ranges[name] ) )
+            expanded.extend( dict( point , **{ name : x } ) for x in levels )
+        points = expanded
+    return points
+
+
+def generate_latin_hypercube( ranges : dict , samples : int , seed : int = 0 ) -> list:
+    """
+    Function draws a Latin-hypercube sample: every parameter's range is split into
+    <code>samples</code> equal strata, each stratum is used once, and the strata of the
+    parameters are paired at random. Strata map onto the parameter's levels.<br>
+
+    Parameters:<br>
+    - <strong>ranges</strong>   : <code>dict</code> parameter name to levels<br>
+    - <strong>samples</strong>  : <code>int</code> number of points<br>
+    - <strong>seed</strong>     : <code>int</code> random seed (designs are reproducible)<br>
+
+    Returns:<br>
+    - <code>list</code> of points (parameter name to level)
+    """
+    generator   = random.Random( seed )
+    columns     = {}
+    for name, levels in ranges.items():
+        strata = list( range( samples ) )
+        generator.shuffle( strata )
+        columns[name] = [ levels[ min( int( ( x + generator.random() ) / samples * len(levels) ) , len(levels) - 1 ) ] for x in strata ]
+    return [ { x : columns[x][index] for x in ranges } for index in range( samples ) ]
+
+
+def generate_fractional_factorial( ranges : dict , fraction : int = None ) -> list:
+    """
+    Function builds a two-level 2^(k-p) fractional factorial over the lowest and highest level
+    of the k varying parameters. The first k-p parameters form a full factorial; every other
+    parameter is aliased with an interaction of those, highest order interactions first (the
+    least likely to matter). Parameters with a single level stay constant.<br>
+
+    Parameters:<br>
+    - <strong>ranges</strong>   : <code>dict</code> parameter name to levels<br>
+    - <strong>fraction</strong> : <code>int</code> p... by default the smallest design with a distinct
+    interaction for every aliased parameter (resolution III)<br>
+
+    Returns:<br>
+    - <code>list</code> of 2^(k-p) points (parameter name to level)
+    """
+    varying     = [ x for x in ranges if len( set( ranges[x] ) ) > 1 ]
+    constant    = { x : ranges[x][0] for x in ranges if x not in varying }
+    k           = len( varying )
+    # a base of m factors offers 2^m - m - 1 interactions to alias the others with
+    base        = k - fraction if fraction is not None else next( m for m in range( k + 1 ) if 2 ** m - 1 >= k )
+    if k and not 0 < base <= k:
+        raise ValueError( "a 2^({}-{}) design has no base factors".format( k , fraction ) )
+    interactions = sorted(
+        ( x for size in range( 2 , base + 1 ) for x in itertools.combinations( range( base ) , size ) ),
+        key = lambda x: -len( x )
+    )
+    if k - base > len( interactions ):
+        raise ValueError( "{} parameters cannot be aliased in a 2^({}-{}) design".format( k , k , k - base ) )
+    generators = [ ( x , ) for x in range( base ) ] + interactions[:k - base]
+
+    points = []
+    for signs in itertools.product( ( -1 , 1 ) , repeat = base ):
+        point = dict( constant )
+        for name, generator in zip( varying , generators ):
+            sign = math.prod( signs[x] for x in generator )
+            point[name] = min( ranges[name] ) if sign < 0 else max( ranges[name] )
+        points.append( point )
+    return points
+
+
+def calculate_reconfiguration_cost( previous : dict , point : dict ) -> int:
+    # links are reconfigured per class... a change of any edge (bottleneck) parameter reshapes every edge (the bottleneck) link
+    changed = [ x for x in point if previous is None or previous.get(x) != point[x] ]
+    return len( changed ) + 10 * len({ x.startswith( EDGE_PREFIX ) for x in changed })
+
+
+def order_points( points : list ) -> list:
+    """
+    Function orders points greedily, each next point being the remaining one that is cheapest
+    to reconfigure to (see calculate_reconfiguration_cost), ties kept in design order.<br>
+
+    Parameters:<br>
+    - <strong>points</strong>   : <code>list</code> the design points<br>
+
+    Returns:<br>
+    - <code>list</code> the points, reordered
+    """
+    remaining   = list( points )
+    ordered     = []
+    previous    = None
+    while remaining:
+        index = min( range( len(remaining) ) , key = lambda x: calculate_reconfiguration_cost( previous , remaining[x] ) )
+        previous = remaining.pop( index )
+        ordered.append( previous )
+    return ordered
+
+
+def generate_design( ranges : dict , design : str = 'full' , samples : int = None , fraction : int = None , seed : int = 0 ) -> list:
+    """
+    Function produces the ordered points of a design (see <code>DESIGNS</code>).<br>
+
+    Parameters:<br>
+    - <strong>ranges</strong>   : <code>dict</code> parameter name to levels<br>
+    - <strong>design</strong>   : <code>string</code> 'full', 'lhs' or 'fractional'<br>
+    - <strong>samples</strong>  : <code>int</code> Latin-hypercube points (default: as many as the largest range has levels)<br>
+    - <strong>fraction</strong> : <code>int</code> p of the fractional factorial (see generate_fractional_factorial)<br>
+    - <strong>seed</strong>     : <code>int</code> random seed of the Latin-hypercube sample<br>
+
+    Returns:<br>
+    - <code>list</code> of distinct points (parameter name to level)
+    """
+    if design == 'full':
+        # already one change per point... the edge parameters outermost, so the host links are reshaped least
+        edge_first = sorted( ranges , key = lambda x: not x.startswith( EDGE_PREFIX ) )
+        return generate_full_grid( { x : ranges[x] for x in edge_first } )
+    if design == 'lhs':
+        points = generate_latin_hypercube( ranges , samples or max( len(x) for x in ranges.values() ) , seed )
+    elif design == 'fractional':
+        points = generate_fractional_factorial( ranges , fraction )
+    else:
+        raise ValueError( "unknown design '{}' (expected one of {})".format( design , ", ".join( DESIGNS ) ) )
+    # samples of discrete levels may coincide
+    distinct = { tuple( sorted( x.items() ) ) : x for x in reversed( points ) }
+    return order_points( [ x for x in points if distinct[ tuple( sorted( x.items() ) ) ] is x ] )
+
+
+def describe_point( point : dict ) -> str:
+    # e.g. 'bw=32 delay=10 edge_loss=1'
+    return " ".join( "{}={}".format( x , y ) for x, y in point.items() )
+
+
+def calculate_main_effects( points : list , responses : list ) -> dict:
+    """
+    Function computes the main effect of every parameter: the mean response at each of its levels.<br>
+
+    Parameters:<br>
+    - <strong>points</strong>       : <code>list</code> the measured points<br>
+    - <strong>responses</strong>    : <code>list</code> the response of every point (None for unmeasured points)<br>
+
+    Returns:<br>
+    - <code>dict</code> parameter name to level to mean response
+    """
+    effects = {}
+    for name in ( points[0] if points else {} ):
+        by_level = {}
+        for point, response in zip( points , responses ):
+            if response is not None:
+                by_level.setdefault( point[name] , [] ).append( response )
+        effects[name] = { level : sum( x ) / len( x ) for level, x in sorted( by_level.items() ) }
+    return effects
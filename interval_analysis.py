@@ -0,0 +1,265 @@
+# Interval-level analytics over iperf3 output.
+# The per-second 'intervals' of every run are loaded into compact array-backed columns
+# (one row per run interval) and all statistics are computed in batch over the columns,
+# grouped by bottleneck bandwidth, rather than by walking the result dictionaries.
+import json
+import os
+from array import array
+import numpy as np
+from configure import FINAL_RESULT_DIRECTORY
+from result_store import TCP_INTERVAL_COLUMNS, UDP_INTERVAL_COLUMNS
+from result_store import extract_tcp_interval_rows, extract_udp_interval_rows
+
+# TCP rows come from the sender (client) intervals, UDP rows from the receiver (server) intervals
+TCP_COLUMNS = ( 'bw_bottleneck', 'case' ) + TCP_INTERVAL_COLUMNS
+UDP_COLUMNS = ( 'bw_bottleneck', 'case' ) + UDP_INTERVAL_COLUMNS
+
+
+class IntervalTable() :
+    """
+    Column store of iperf intervals. Rows are appended into <code>array('d')</code> buffers
+    while loading; <code>column</code> exposes each buffer as a numpy array without copying.
+    """
+
+    def __init__( self, columns : tuple ) -> None:
+
+        self.columns    = columns
+        self.__buffers  = { x : array('d') for x in columns }
+
+    def append( self, row : dict ) -> None:
+
+        for name in self.columns:
+            self.__buffers[name].append( row[name] )
+
+    def extend( self, columns : dict , **constants ) -> None:
+
+        # columns restored from the result store, plus per flow constants (bandwidth, case)
+        rows = len( next( iter( columns.values() ) ) )
+        for name in self.columns:
+            if name in constants:
+                self.__buffers[name].extend( [ float(constants[name]) ] * rows )
+            else:
+                self.__buffers[name].extend( columns[name] )
+
+    def column( self, name : str ):
+
+        return np.frombuffer( self.__buffers[name] , dtype = np.float64 )
+
+    def __len__( self ) -> int:
+
+        return len( self.__buffers[self.columns[0]] )
+
+
+def load_interval_tables( constraints : list , bw_other : int = 100 , directory : str = FINAL_RESULT_DIRECTORY ) -> tuple:
+    """
+    Function loads the intervals of every run found in the final result files of the
+    provided bottleneck bandwidths.<br>
+
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>list</code> bottleneck bandwidths (Mbps)<br>
+    - <strong>bw_other</strong>     : <code>int</code> bandwidth of other (normal) links (default 100 Mbps)<br>
+    - <strong>directory</strong>    : <code>string</code> directory holding the final result files<br>
+
+    Returns:<br>
+    - <code>tuple</code> ( TCP <code>IntervalTable</code> , UDP <code>IntervalTable</code> )
+    """
+    tcp_table = IntervalTable( TCP_COLUMNS )
+    udp_table = IntervalTable( UDP_COLUMNS )
+
+    for bw in constraints:
+        tcp_file = "{}output-tcp-{}-{}.json".format(directory, bw, bw_other)
+        if os.path.exists(tcp_file):
+            with open(tcp_file, 'r') as f:
+                tcp_data = json.load(f)
+            for case, test_case in tcp_data.items():
+                if test_case is None:
+                    continue
+                for row in extract_tcp_interval_rows( test_case ):
+                    tcp_table.append( dict( row , bw_bottleneck = bw , case = int(case) ) )
+
+        udp_file = "{}output-udp-{}-{}.json".format(directory, bw, bw_other)
+        if os.path.exists(udp_file):
+            with open(udp_file, 'r') as f:
+                udp_data = json.load(f)
+            for case, test_case in udp_data.items():
+                if test_case is None:
+                    continue
+                for row in extract_udp_interval_rows( test_case ):
+                    udp_table.append( dict( row , bw_bottleneck = bw , case = int(case) ) )
+
+    return tcp_table, udp_table
+
+
+def load_interval_tables_from_store( store , run_id : str , constraints : list , bw_other : int = 100 ) -> tuple:
+    """
+    Function loads the intervals of every flow of a run from the result store.<br>
+
+    Parameters:<br>
+    - <strong>store</strong>        : <code>ResultStore</code> the result store<br>
+    - <strong>run_id</strong>       : <code>string</code> the run to load, or <code>dict</code> bottleneck bandwidth to run (or runs)<br>
+    - <strong>constraints</strong>  : <code>list</code> bottleneck bandwidths (Mbps)<br>
+    - <strong>bw_other</strong>     : <code>int</code> bandwidth of other (normal) links (default 100 Mbps)<br>
+
+    Returns:<br>
+    - <code>tuple</code> ( TCP <code>IntervalTable</code> , UDP <code>IntervalTable</code> )
+    """
+    tables = { 'tcp' : IntervalTable( TCP_COLUMNS ) , 'udp' : IntervalTable( UDP_COLUMNS ) }
+    for bw in constraints:
+        # memoized sweeps reuse points measured by earlier runs... repeated points span several runs
+        point_run_ids = run_id[bw] if isinstance( run_id , dict ) else run_id
+        for point_run_id in ( point_run_ids if isinstance( point_run_ids , list ) else [ point_run_ids ] ):
+            # a retried test case is recorded again... the latest record wins
+            flows = { ( x['protocol'] , x['case_id'] ) : x for x in store.query_flows( run_id = point_run_id , bw_bottleneck = bw , bw_other = bw_other ) }
+            for flow in flows.values():
+                tables[flow['protocol']].extend( store.load_intervals( flow['id'] ) , bw_bottleneck = bw , case = flow['case_id'] )
+    return tables['tcp'], tables['udp']
+
+
+def grouped_percentiles( groups , values , percentiles : list ):
+    """
+    Function computes percentiles of <code>values</code> for every group at once
+    (linear interpolation, as <code>numpy.percentile</code>).<br>
+
+    Parameters:<br>
+    - <strong>groups</strong>       : <code>ndarray</code> integer group id (0 .. G-1) of every value<br>
+    - <strong>values</strong>       : <code>ndarray</code> the values<br>
+    - <strong>percentiles</strong>  : <code>list</code> percentiles (0-100) to compute<br>
+
+    Returns:<br>
+    - <code>ndarray</code> G x len(percentiles) percentile matrix
+    """
+    order   = np.lexsort( ( values , groups ) )
+    ordered = values[order]
+    counts  = np.bincount( groups )
+    starts  = np.concatenate( ( [0] , np.cumsum(counts)[:-1] ) )
+
+    positions   = starts[:, None] + ( np.asarray(percentiles) / 100.0 )[None, :] * ( counts[:, None] - 1 )
+    lower       = np.floor( positions ).astype( np.int64 )
+    upper       = np.ceil( positions ).astype( np.int64 )
+    weight      = positions - lower
+    return ordered[lower] * ( 1 - weight ) + ordered[upper] * weight
+
+
+def summarize_tcp_intervals( table : IntervalTable ) -> dict:
+    """
+    Function computes per sweep point TCP interval statistics: throughput stability,
+    retransmit rate and the mean cwnd and RTT traces across runs. Omitted (warm-up)
+    intervals are excluded.<br>
+
+    Parameters:<br>
+    - <strong>table</strong>    : <code>IntervalTable</code> TCP intervals (see load_interval_tables)<br>
+
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth -> { 'throughput_mean', 'throughput_std', 'throughput_cov',
+    'throughput_p5', 'throughput_p50', 'throughput_p95', 'retransmits_per_second', 'retransmits_per_mb',
+    'trace' : { 'start', 'snd_cwnd', 'rtt_ms' } }
+    """
+    if not len(table):
+        return {}
+    keep        = table.column('omitted') == 0
+    bandwidths, groups = np.unique( table.column('bw_bottleneck')[keep] , return_inverse = True )
+
+    bps         = table.column('bits_per_second')[keep]
+    counts      = np.bincount( groups )
+    mean        = np.bincount( groups , bps ) / counts
+    std         = np.sqrt( np.bincount( groups , ( bps - mean[groups] ) ** 2 ) / counts )
+    percentiles = grouped_percentiles( groups , bps , [5, 50, 95] )
+
+    retransmits = np.bincount( groups , table.column('retransmits')[keep] )
+    seconds     = np.bincount( groups , table.column('seconds')[keep] )
+    megabytes   = np.bincount( groups , table.column('bytes')[keep] ) / 1e6
+
+    # traces : mean over runs of every interval index of a sweep point
+    index       = table.column('index')[keep].astype( np.int64 )
+    slots       = index.max() + 1
+    cells       = groups * slots + index
+    cell_counts = np.bincount( cells , minlength = len(bandwidths) * slots )
+    with np.errstate( invalid = 'ignore' , divide = 'ignore' ):
+        start   = ( np.bincount( cells , table.column('start')[keep] , len(bandwidths) * slots ) / cell_counts ).reshape( -1 , slots )
+        cwnd    = ( np.bincount( cells , table.column('snd_cwnd')[keep] , len(bandwidths) * slots ) / cell_counts ).reshape( -1 , slots )
+        rtt     = ( np.bincount( cells , table.column('rtt_ms')[keep] , len(bandwidths) * slots ) / cell_counts ).reshape( -1 , slots )
+    present     = cell_counts.reshape( -1 , slots ) > 0
+
+    return {
+        int(bw) : {
+            'throughput_mean'           : float(mean[g]),
+            'throughput_std'            : float(std[g]),
+            'throughput_cov'            : float(std[g] / mean[g]) if mean[g] else 0.0,
+            'throughput_p5'             : float(percentiles[g][0]),
+            'throughput_p50'            : float(percentiles[g][1]),
+            'throughput_p95'            : float(percentiles[g][2]),
+            'retransmits_per_second'    : float(retransmits[g] / seconds[g]) if seconds[g] else 0.0,
+            'retransmits_per_mb'        : float(retransmits[g] / megabytes[g]) if megabytes[g] else 0.0,
+            'trace'                     : {
+                'start'     : start[g][present[g]].tolist(),
+                'snd_cwnd'  : cwnd[g][present[g]].tolist(),
+                'rtt_ms'    : rtt[g][present[g]].tolist()
+            }
+        }
+        for g, bw in enumerate( bandwidths )
+    }
+
+
+def summarize_udp_intervals( table : IntervalTable ) -> dict:
+    """
+    Function computes per sweep point UDP receiver statistics: throughput stability and
+    jitter and loss percentiles. Omitted (warm-up) intervals are excluded.<br>
+
+    Parameters:<br>
+    - <strong>table</strong>    : <code>IntervalTable</code> UDP intervals (see load_interval_tables)<br>
+
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth -> { 'throughput_mean', 'throughput_cov',
+    'jitter_ms_p50', 'jitter_ms_p95', 'jitter_ms_p99', 'lost_percent_p50', 'lost_percent_p95', 'lost_percent_p99' }
+    """
+    if not len(table):
+        return {}
+    keep        = table.column('omitted') == 0
+    bandwidths, groups = np.unique( table.column('bw_bottleneck')[keep] , return_inverse = True )
+
+    bps         = table.column('bits_per_second')[keep]
+    counts      = np.bincount( groups )
+    mean        = np.bincount( groups , bps ) / counts
+    std         = np.sqrt( np.bincount( groups , ( bps - mean[groups] ) ** 2 ) / counts )
+    jitter      = grouped_percentiles( groups , table.column('jitter_ms')[keep] , [50, 95, 99] )
+    lost        = grouped_percentiles( groups , table.column('lost_percent')[keep] , [50, 95, 99] )
+
+    return {
+        int(bw) : {
+            'throughput_mean'   : float(mean[g]),
+            'throughput_cov'    : float(std[g] / mean[g]) if mean[g] else 0.0,
+            'jitter_ms_p50'     : float(jitter[g][0]),
+            'jitter_ms_p95'     : float(jitter[g][1]),
+            'jitter_ms_p99'     : float(jitter[g][2]),
+            'lost_percent_p50'  : float(lost[g][0]),
+            'lost_percent_p95'  : float(lost[g][1]),
+            'lost_percent_p99'  : float(lost[g][2])
+        }
+        for g, bw in enumerate( bandwidths )
+    }
+
+
+def analyze_intervals( constraints : list , bw_other : int = 100 , directory : str = FINAL_RESULT_DIRECTORY ,
+                       store = None , run_id : str = None ) -> dict:
+    """
+    Function loads and summarizes the intervals of every run of the provided sweep, from
+    the result store when one is provided, otherwise from the final result files.<br>
+
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>list</code> bottleneck bandwidths (Mbps)<br>
+    - <strong>bw_other</strong>     : <code>int</code> bandwidth of other (normal) links (default 100 Mbps)<br>
+    - <strong>directory</strong>    : <code>string</code> directory holding the final result files<br>
+    - <strong>store</strong>        : <code>ResultStore</code> the result store (optional)<br>
+    - <strong>run_id</strong>       : <code>string</code> the run to load from the store, or <code>dict</code> bottleneck bandwidth to run (or runs)<br>
+
+    Returns:<br>
+    - <code>dict</code> { 'tcp' : see summarize_tcp_intervals , 'udp' : see summarize_udp_intervals }
+    """
+    if store is not None:
+        tcp_table, udp_table = load_interval_tables_from_store( store , run_id , constraints , bw_other )
+    else:
+        tcp_table, udp_table = load_interval_tables( constraints , bw_other , directory )
+    return {
+        'tcp' : summarize_tcp_intervals( tcp_table ),
+        'udp' : summarize_udp_intervals( udp_table )
+    }
@@ -1,83 +1,168 @@
 #!/usr/bin/python3
 # IMPORTS 
 import argparse
-from mininet.topo import Topo
-from mininet.link import TCLink
 from mininet.net import Mininet
+from mininet.node import Controller
 import subprocess
-from time import sleep
+from time import sleep, perf_counter, strftime
 import json
 import os
+import threading
+import itertools
+import re
+from contextlib import nullcontext
 from configure import SERVICE_DIRECTORY, FINAL_RESULT_DIRECTORY, IPERF_DIRECTORY
 from configure import LOG_DIRECTORY, IFCONFIG_DIRECTORY, PING_DIRECTORY
-from configure import init_file_system
+from configure import init_file_system, AGENT_DIRECTORY, SCRIPT_DIRECTORY, RESULT_DATABASE
+from agent import AgentConnection, agent_request, generate_agent_cmd
+from sink import AsyncResultSink
+from structured_log import LogWriter, StructuredLogger
+from spans import SpanRecorder, SamplingProfiler
+from telemetry import TelemetrySampler
+from saturation_search import STRATEGIES, search_saturation
+from client_tuning import search_client_settings
+from queue_discipline import DEFAULT_LIMIT, QUEUE_DISCIPLINES, generate_qdisc_cmd, summarize_rtts
+from topology import TieredBottleneckTopo, generate_pairing_plan
+from result_store import ResultStore
+from uuid import uuid4
 # GLOBAL CONSTANTS 
 # specify the number of times failed tests will repeat
 MAX_ATTEMPTS = 5
 # specify the duration of iperf tests
 TIME = 10 # redefined in main
+# convergence mode (see client.run_client_until_converged)... iperf tests stop once the throughput
+# confidence interval is within CONVERGE_TOLERANCE of the mean, after MIN_TIME and before MAX_TIME
+# seconds, ignoring the first OMIT_TIME seconds. Disabled when None.
+CONVERGE_TOLERANCE = None # redefined in main
+MIN_TIME  = 2 # redefined in main
+MAX_TIME  = 10 # redefined in main
+OMIT_TIME = 1 # redefined in main
 # specify network bandwidth restrictions
 BW_BOTTLENECK = 10 # redefined in main
 BW_OTHER      = 100
+# run iperf tests through resident per-host agents (see agent.py) instead of spawning scripts
+USE_AGENTS    = False # redefined in main
+# seconds to wait for an agent to answer after it is started
+AGENT_STARTUP_TIMEOUT = 10
+# host name -> unix socket path of the running agents
+HOST_AGENTS   = {}
+# seconds to wait for the server's result once the client has finished
+SERVER_RESULT_TIMEOUT = 10
+# seconds to wait for a server to listen on its port, polled every SERVER_READY_INTERVAL seconds
+SERVER_READY_TIMEOUT  = 5
+SERVER_READY_INTERVAL = 0.05
+# seconds a test may run past its duration before the client is stopped (see calculate_test_deadline)
+TEST_DEADLINE_MARGIN  = 15
+# seconds between failed attempts of a test... doubling per attempt up to RETRY_BACKOFF_MAX
+RETRY_BACKOFF         = 0.5
+RETRY_BACKOFF_MAX     = 8
+# run the perf test flows concurrently so they contend on the bottleneck (requires agents)
+CONCURRENT_FLOWS = False # redefined in main
+# service ports handed out to concurrent flows, one per flow
+FLOW_PORT_POOL = range( 5001 , 5101 )
+# send all topology probes at once and return structured results (see run_parallel_probes)
+PARALLEL_PROBES = False # redefined in main
+# pings sent per host pair, and the interval (s) between them
+PING_COUNT    = 3 # redefined in main
+PING_INTERVAL = 1.0 # redefined in main
+# isolation of parallel sweep workers (see parallel_sweep.py)... node name prefix and
+# worker index (subnet 10.<index>.0.0/16, dpid block and controller port 6653 + index)
+NODE_PREFIX   = '' # redefined in main
+WORKER_INDEX  = 0 # redefined in main
+# results of this process are recorded under RUN_ID in the result store at RESULT_DATABASE
+RUN_ID        = "{}-{}".format( strftime("%Y%m%d-%H%M%S") , uuid4().hex[:6] ) # redefined in main
+# persist raw iperf results to IPERF_DIRECTORY (written asynchronously, off the test path)
+PERSIST_IPERF_RESULTS = True # redefined in main
+# sample bottleneck telemetry while iperf clients run (see telemetry.py), every TELEMETRY_INTERVAL
+# seconds into a ring buffer of TELEMETRY_CAPACITY samples
+TELEMETRY          = False # redefined in main
+TELEMETRY_INTERVAL = 0.25 # redefined in main
+TELEMETRY_CAPACITY = 4096
+# link parameters of the current grid point besides the bandwidths (see experiment_design.py)...
+# delay, jitter, loss and max_queue_size of the bottleneck, 'edge_' prefixed for the host links
+LINK_PARAMS        = {} # redefined in sweeps
+# queue discipline comparison (see run_qdisc_comparison)... queue limit (packets) of the compared
+# disciplines, and the interval (s) of the pings sampling the RTT under load
+QUEUE_LIMIT        = DEFAULT_LIMIT # redefined in main
+RTT_PROBE_INTERVAL = 0.05 # redefined in main
+# TCP congestion control algorithm of the TCP flows (see run_congestion_matrix), the kernel default when None
+TCP_CONGESTION     = None # redefined in the congestion matrix
+# target bitrate (bits/s) of the UDP flows, iperf's default (1 Mbit/s) when None (see run_udp_saturation_search)
+UDP_BANDWIDTH      = None # redefined in main and the saturation search
+# parallel streams of every iperf flow (iperf reports each in end.streams... kept in the result store)
+STREAMS            = 1 # redefined in main
+# send TCP data with iperf's zero-copy (sendfile) method... less sender CPU per byte
+ZEROCOPY           = False # redefined in main
+# client block size and socket buffer (see run_client_tuning)... the settings of the running tuning trial
+# per protocol, and (with USE_TUNED_SETTINGS) the tuned settings of every profile read from the result store
+CLIENT_SETTINGS    = {} # redefined in the tuning trials
+USE_TUNED_SETTINGS = False # redefined in main
+TUNED_SETTINGS     = {}
 
 
-# CLASS - LOGGER
-class Logger() :
-    __log_index         = 0
-
-    def __init__( self, log_file :str = "out.txt" , logging_prefix :str = "[ LOG ] >> ") -> None:
-        
-        self.__log_file = log_file
-        self.__logging_prefix = logging_prefix
-    
-    def log( self, message :str ) -> None:
-        
-        message = "{} {} >>  {}\n".format( self.__logging_prefix , self.__log_index , message )
-        self.__log_index += 1
-        with open ( self.__log_file , 'a' ) as f:
-            f.write(message)
-
-def generate_instance_message( message : str ) -> str :
-     return "{}-{}-{}".format(
-            message,
-            BW_BOTTLENECK,
-            BW_OTHER
-        )
+def generate_log_context() -> dict:
+    # evaluated per record... sweeps change the bottleneck bandwidth in process
+    return {
+        'run_id'        : RUN_ID,
+        'bw_bottleneck' : BW_BOTTLENECK,
+        'bw_other'      : BW_OTHER,
+        'worker'        : WORKER_INDEX,
+        **( { 'link' : LINK_PARAMS } if LINK_PARAMS else {} )
+    }
             
 
 init_file_system()
 
 # INSTANTIATE GENERAL SESSION LOGGERS
+# one JSON-lines file, records are told apart by their level (see structured_log.py)
+log_writer              = LogWriter(log_file="{}network-bottleneck.jsonl".format(LOG_DIRECTORY))
+configuration_logger    = StructuredLogger(log_writer, level='config', context=generate_log_context)
+err_logger              = StructuredLogger(log_writer, level='error', context=generate_log_context)
+success_logger          = StructuredLogger(log_writer, level='info', context=generate_log_context)
+# timing spans of the orchestration phases, recorded when -trace is given (see spans.py)
+TRACE                   = SpanRecorder(context=generate_log_context)
 
-configuration_logger    = Logger(log_file="{}output-network-config-{}-{}.txt".format(LOG_DIRECTORY,BW_BOTTLENECK,BW_OTHER))
-err_logger              = Logger(log_file="{}error-output.txt".format(LOG_DIRECTORY))
-success_logger          = Logger(log_file="{}success-output.txt".format(LOG_DIRECTORY))
+# raw iperf result files are written by a background writer
+iperf_result_sink       = AsyncResultSink()
 
 # DEFINE NETWORK TOPOLOGY
-class BottleneckTopo( Topo ):
+class BottleneckTopo( TieredBottleneckTopo ):
     "Network topology for bottleneck testing"
 
     def build( self, bw_bottleneck : int , bw_other : int )  :
-        #clients
-        client_1    = self.addHost( 'h1' )
-        client_2    = self.addHost( 'h2' )
-        #servers
-        server_1    = self.addHost( 'h3' )
-        server_2    = self.addHost( 'h4' )
-        #switches
-        switch_1    = self.addSwitch( 's1' )
-        switch_2    = self.addSwitch( 's2' )
-        #links
-        # link : h1 (client 1) -to- s1 (switch 1)
-        link_1 = self.addLink( client_1 , switch_1 , cls=TCLink , bw=bw_other)
-        # link : h2 (client 2) -to- s1 (switch 1)
-        link_2 = self.addLink( client_2 , switch_1 , cls=TCLink , bw=bw_other)
-        #~~~bottleneck link : s1 (switch 1) -to- s2 (switch 2)
-        link_3 = self.addLink( switch_1 , switch_2 , cls=TCLink ,bw=bw_bottleneck)
-        # link : s2 (switch 2) -to- h3 (server 1)
-        link_4 = self.addLink( switch_2 , server_1 , cls=TCLink , bw=bw_other)
-        # link : s2 (switch 2) -to- h4 (server 2)
-        link_5 = self.addLink( switch_2 , server_2 , cls=TCLink , bw=bw_other)
+        # clients h1, h2 on s1... servers h3, h4 on s2... bottleneck link s1 -to- s2
+        super().build( senders = 2 , receivers = 2 , tier_bw = [ bw_bottleneck ] , bw_other = bw_other , 
+                       prefix = NODE_PREFIX , dpid_base = WORKER_INDEX )
+
+
+def prefixed( node_name : str ) -> str:
+    """
+    Function applies the network instance's node name prefix.<br>
+    
+    Parameters:<br>
+    - <strong>node_name</strong>    : <code>string</code> the unprefixed node name (e.g. h1)<br>
+    
+    Returns:<br>
+    - <code>string</code> the node name within this network instance
+    """
+    return NODE_PREFIX + node_name
+
+
+def generate_network_params() -> dict:
+    """
+    Function produces the <code>Mininet</code> keyword arguments which isolate this network
+    instance from the other parallel sweep workers: a 10.<i>.0.0/16 subnet and a dedicated
+    controller port. The default (index 0) instance uses Mininet's defaults.<br>
+    
+    Returns:<br>
+    - <code>dict</code> keyword arguments for <code>Mininet()</code>
+    """
+    if not WORKER_INDEX:
+        return {}
+    return {
+        'ipBase'        : "10.{}.0.0/16".format(WORKER_INDEX),
+        'controller'    : lambda name: Controller( name , port = 6653 + WORKER_INDEX )
+    }
     
 
 ######################################################################################
@@ -118,6 +203,28 @@ def log_node_cmd(node_name : str , cmd_to_log : str , file_prefix : str ) -> Non
         f.write(cmd_to_log)
     
    
+def sample_telemetry( network ):
+    """
+    Function prepares a telemetry sampler of the network's inter-switch (bottleneck) links and switch
+    ports, to be used as a context manager around a test.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance<br>
+    
+    Returns:<br>
+    - <code>TelemetrySampler</code>, or a context yielding None when <code>TELEMETRY</code> is not set
+    """
+    if not TELEMETRY:
+        return nullcontext()
+    switches        = set( network.switches )
+    link_interfaces = [ 
+        intf.name for link in network.links if link.intf1.node in switches and link.intf2.node in switches 
+        for intf in ( link.intf1 , link.intf2 ) 
+    ]
+    port_interfaces = [ x for switch in network.switches for x in switch.intfNames() if x != 'lo' ]
+    return TelemetrySampler( link_interfaces , port_interfaces , interval = TELEMETRY_INTERVAL , capacity = TELEMETRY_CAPACITY )
+
+
 def parse_NodeIP( mininet_node_Node_IP ) -> str:
     """ 
     Extracts the IPv4 address out of the <code>Mininet Node</code> instance
@@ -137,105 +244,274 @@ def parse_NodeIP( mininet_node_Node_IP ) -> str:
     ipv4address = ipv4address.split()[0]            # format  :  #.#.#.#
     return ipv4address  
 
+def start_host_agents( network ) -> None:
+    """
+    Procedure starts a resident iperf agent in every host of the provided network and waits
+    until each one answers on its unix socket. The agents are registered in <code>HOST_AGENTS</code>.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance<br>
+    
+    Returns:<br>
+    - None
+    """
+    for host in [x.name for x in network.hosts]:
+        socket_path = "{}{}.sock".format(AGENT_DIRECTORY, host)
+        process = network.get(host).popen( generate_agent_cmd( socket_path = socket_path ) )
+        
+        deadline = perf_counter() + AGENT_STARTUP_TIMEOUT
+        while True:
+            try:
+                agent_request( socket_path , { 'op' : 'ping' } , timeout = 1 )
+                break
+            except OSError:
+                if perf_counter() > deadline or process.poll() is not None:
+                    process.terminate()
+                    err_logger.log("[ ERROR ] failure to start agent [@{}] in start_host_agents".format(host))
+                    raise
+                sleep(0.05)
+        
+        HOST_AGENTS[host] = ( process , socket_path )
+        success_logger.log("successfully started agent [@{}] in start_host_agents...".format(host))
+
+
+def stop_host_agents() -> None:
+    """
+    Procedure shuts down every registered resident agent.<br>
+    
+    Returns:<br>
+    - None
+    """
+    for host, ( process , socket_path ) in HOST_AGENTS.items():
+        try:
+            agent_request( socket_path , { 'op' : 'shutdown' } , timeout = 1 )
+            process.wait( timeout = 1 )
+        except Exception:
+            process.terminate()
+    HOST_AGENTS.clear()
+
+
+def parse_ping_output( output : str ) -> dict:
+    """
+    Function extracts reachability and the round trip time summary from <code>ping</code> output.<br>
+    
+    Parameters:<br>
+    - <strong>output</strong>   : <code>string</code> the output of a ping command<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'reachable', 'transmitted', 'received', 'loss_percent', 'rtt_min', 'rtt_avg', 'rtt_max', 'rtt_mdev' }...
+    rtt values (ms) are <code>None</code> when no reply was received
+    """
+    summary = {
+        'reachable'     : False,
+        'transmitted'   : 0,
+        'received'      : 0,
+        'loss_percent'  : 100.0,
+        'rtt_min'       : None,
+        'rtt_avg'       : None,
+        'rtt_max'       : None,
+        'rtt_mdev'      : None
+    }
+    for line in output.splitlines():
+        # format : # packets transmitted, # received, #% packet loss, time #ms
+        if 'packets transmitted' in line:
+            fields = line.split(',')
+            summary['transmitted']  = int( fields[0].split()[0] )
+            summary['received']     = int( fields[1].split()[0] )
+            summary['loss_percent'] = float( [ x for x in fields if 'packet loss' in x ][0].split('%')[0] )
+        # format : rtt min/avg/max/mdev = #/#/#/# ms
+        elif line.startswith('rtt') or line.startswith('round-trip'):
+            values = line.split('=')[1].split()[0].split('/')
+            summary['rtt_min'], summary['rtt_avg'], summary['rtt_max'], summary['rtt_mdev'] = [ float(x) for x in values ]
+    summary['reachable'] = summary['received'] > 0
+    return summary
+
+
+def parse_ping_rtts( output : str ) -> list:
+    """
+    Function extracts the round trip time of every reply from <code>ping</code> output.<br>
+    
+    Parameters:<br>
+    - <strong>output</strong>   : <code>string</code> the output of a ping command<br>
+    
+    Returns:<br>
+    - <code>list</code> round trip times (ms), in order
+    """
+    # format : # bytes from #: icmp_seq=# ttl=# time=# ms
+    return [ float( line.split('time=')[1].split()[0] ) for line in output.splitlines() if 'time=' in line ]
+
+
+def run_parallel_probes( network ) -> dict:
+    """
+    Function sends every <code>ifconfig</code> and host to host <code>ping</code> at once as
+    non-blocking node commands, then collects them. Uses <code>PING_COUNT</code> and <code>PING_INTERVAL</code>.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'ifconfig' : { host : output }, 'ping' : { host : { other host : summary } } }...
+    see parse_ping_output for the summary format
+    """
+    hosts = [x.name for x in network.hosts]
+    
+    # Dispatch
+    ifconfig_processes  = { host : network.get(host).popen( ['ifconfig'] ) for host in hosts }
+    ping_processes      = {
+        host : {
+            alt_host : network.get(host).popen( 
+                            ['ping', '-c', str(PING_COUNT), '-i', str(PING_INTERVAL), parse_NodeIP(network.get(alt_host).IP)] 
+                        )
+            for alt_host in hosts if alt_host != host
+        }
+        for host in hosts
+    }
+    
+    # Collect
+    probes = { 'ifconfig' : {} , 'ping' : {} }
+    for host, process in ifconfig_processes.items():
+        probes['ifconfig'][host] = process.communicate()[0].decode()
+    for host, processes in ping_processes.items():
+        probes['ping'][host] = {}
+        for alt_host, process in processes.items():
+            probes['ping'][host][alt_host] = parse_ping_output( process.communicate()[0].decode() )
+            if not probes['ping'][host][alt_host]['reachable']:
+                err_logger.log("[ ERROR ] {} unreachable from {} in run_parallel_probes".format(alt_host, host))
+    return probes
+
+
 # TESTER
-def run_topology_tests() -> None:
+def run_topology_tests( network = None ) -> dict:
     """ 
     Network test to confirm capability to retrieve <code>ifconfig</code> information 
     from <code>mininet Node</code> instances and test the <code>ping</code> performance between them.<br>
     
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> an already started instance to test (optional)... when
+    omitted a network is built, started and stopped within the procedure<br>
     
     Returns:<br>
-    - None
+    - <code>dict</code> the structured probe results when <code>PARALLEL_PROBES</code> is set (see run_parallel_probes),
+    otherwise <code>None</code>... raw results are logged to files
     """   
-    #Build topology
-    try:
-        topo    = BottleneckTopo( BW_BOTTLENECK , BW_OTHER )
-        success_logger.log("successfully instantiated BottleneckTopo object in run_topology_tests...")
-    except Exception as e:
-        err_logger.log(generate_instance_message("[ ERROR ] failed to instantiate network topology."))
-        return
-    
-    #Instantiate network.
-    try:
-        network = Mininet( topo=topo ) 
-        success_logger.log("successfully instantiated Mininet() object in run_topology_tests...")
-    except:
-        err_logger.log(generate_instance_message("[ ERROR ] failed to instantiate Mininet network."))
-        return
-    
-    # Start network simulation
-    try:
-        network.start()
-        success_logger.log("successfully started a mininet network in run_topology_tests...")
-    except:
-        err_logger.log(generate_instance_message("[ ERROR ] failed to start network."))
-        return
+    # Networks provided by the caller (sweep mode) are neither built nor stopped here.
+    owns_network = network is None
+    if owns_network:
+        #Build topology
+        try:
+            with TRACE.span( 'BottleneckTopo' , 'setup' ):
+                topo    = BottleneckTopo( BW_BOTTLENECK , BW_OTHER )
+            success_logger.log("successfully instantiated BottleneckTopo object in run_topology_tests...")
+        except Exception as e:
+            err_logger.log("[ ERROR ] failed to instantiate network topology.")
+            return
+        
+        #Instantiate network.
+        try:
+            with TRACE.span( 'Mininet()' , 'setup' ):
+                network = Mininet( topo=topo , **generate_network_params() ) 
+            success_logger.log("successfully instantiated Mininet() object in run_topology_tests...")
+        except Exception:
+            err_logger.log("[ ERROR ] failed to instantiate Mininet network.")
+            return
+        
+        # Start network simulation
+        try:
+            with TRACE.span( 'network.start()' , 'setup' ):
+                network.start()
+            success_logger.log("successfully started a mininet network in run_topology_tests...")
+        except Exception:
+            err_logger.log("[ ERROR ] failed to start network.")
+            return
 
     # Log the parameters configured for the test as requested in assignment specifications.
     configuration_logger.log("Bandwidth for bottleneck link is : {}.".format(BW_BOTTLENECK))
     configuration_logger.log("Bandwidth for standard links is : {}.".format(BW_OTHER))
     
     # STARTING 
-    hosts = [x for x in network.keys() if x[0] == 'h']
-    # TEST ONE :: ifconfig testing ####################################3 
-    for host in hosts : 
-        
-        # Send command to node.
-        try:
-            ifconf_cmd_result = do_node_cmd(
-                                        network             =   network, 
-                                        target_node_name    =   host, 
-                                        node_cmd            =   'ifconfig'
-                            )
-            success_logger.log(generate_instance_message("successfully sent command to node : [{} : ifconfig]".format(host)))
-        except:
-            err_logger.log(generate_instance_message("[ ERROR ] failure in sending ifconfig command for {}.".format(host)))
-            
-        # Log command result.
-        try:     
-            log_node_cmd(
-                    node_name   =   host,
-                    cmd_to_log  =   ifconf_cmd_result,
-                    file_prefix =   '{}output-ifconfig-{}-{}'.format(IFCONFIG_DIRECTORY, BW_BOTTLENECK,BW_OTHER)
-            )
-            success_logger.log(generate_instance_message("successfully logged command [{} : {}] in run_topology_tests...".format(host,'ifconfig')))
-        except:
-            err_logger.log(generate_instance_message("[ ERROR ] failure in logging ifconfig command for {}".format(host)))
-        
-             
-        # TEST TWO :: ping testing ###########################################
-        for alt_host in hosts:
-            if alt_host != host:
-                # Ping all others hosts from top level host 
+    hosts = [x.name for x in network.hosts]
+    probes = None
+    with TRACE.span( 'probes' , 'probe' , parallel = PARALLEL_PROBES ):
+        if PARALLEL_PROBES:
+            # All ifconfig and ping commands in flight at once... results come back structured.
+            probes = run_parallel_probes( network = network )
+            for host in hosts:
                 try:
-                    ping_cmd = 'ping -c3 {}'.format( parse_NodeIP(network.get(alt_host).IP))
-                    ping_cmd_result = do_node_cmd(
-                                            network         =   network,
-                                            target_node_name=   host, 
-                                            node_cmd        =   ping_cmd
-                                    ) 
-                    success_logger.log(generate_instance_message("successfully sent command to node : [{} : ping to {}]".format(host,alt_host)))
-                except:
-                    err_logger.log(generate_instance_message("[ ERROR ] failure in pinging test for {} to {}.".format(host,alt_host)))
-
-                # Logging ping results.
+                    log_node_cmd(
+                            node_name   =   host,
+                            cmd_to_log  =   probes['ifconfig'][host],
+                            file_prefix =   '{}output-ifconfig-{}-{}'.format(IFCONFIG_DIRECTORY, BW_BOTTLENECK,BW_OTHER)
+                    )
+                except Exception:
+                    err_logger.log("[ ERROR ] failure in logging ifconfig command for {}".format(host))
+            iperf_result_sink.submit( 
+                        '{}output-ping-{}-{}.json'.format(PING_DIRECTORY, BW_BOTTLENECK, BW_OTHER) , 
+                        probes['ping'] 
+                    )
+            success_logger.log("successfully performed parallel probes in run_topology_tests...")
+        else:
+            # TEST ONE :: ifconfig testing ####################################3 
+            for host in hosts : 
+        
+                # Send command to node.
                 try:
+                    ifconf_cmd_result = do_node_cmd(
+                                                network             =   network, 
+                                                target_node_name    =   host, 
+                                                node_cmd            =   'ifconfig'
+                                    )
+                    success_logger.log("successfully sent command to node : [{} : ifconfig]".format(host))
+                except Exception:
+                    err_logger.log("[ ERROR ] failure in sending ifconfig command for {}.".format(host))
+            
+                # Log command result.
+                try:     
                     log_node_cmd(
                             node_name   =   host,
-                            cmd_to_log  =   ping_cmd_result,
-                            file_prefix =   '{}output-ping-{}-{}'.format(PING_DIRECTORY, BW_BOTTLENECK,BW_OTHER)
+                            cmd_to_log  =   ifconf_cmd_result,
+                            file_prefix =   '{}output-ifconfig-{}-{}'.format(IFCONFIG_DIRECTORY, BW_BOTTLENECK,BW_OTHER)
                     )
-                    success_logger.log(generate_instance_message("successfully logged command [{} : ping to {}] in run_topology_tests...".format(host,alt_host)))
-                except:
-                    err_logger.log(generate_instance_message("[ ERROR ]  failure in logging ping results for {} to {}.".format(host,alt_host)))
+                    success_logger.log("successfully logged command [{} : {}] in run_topology_tests...".format(host,'ifconfig'))
+                except Exception:
+                    err_logger.log("[ ERROR ] failure in logging ifconfig command for {}".format(host))
+        
+             
+                # TEST TWO :: ping testing ###########################################
+                for alt_host in hosts:
+                    if alt_host != host:
+                        # Ping all others hosts from top level host 
+                        try:
+                            ping_cmd = 'ping -c{} -i {} {}'.format( PING_COUNT, PING_INTERVAL, parse_NodeIP(network.get(alt_host).IP))
+                            ping_cmd_result = do_node_cmd(
+                                                    network         =   network,
+                                                    target_node_name=   host, 
+                                                    node_cmd        =   ping_cmd
+                                            ) 
+                            success_logger.log("successfully sent command to node : [{} : ping to {}]".format(host,alt_host))
+                        except Exception:
+                            err_logger.log("[ ERROR ] failure in pinging test for {} to {}.".format(host,alt_host))
+
+                        # Logging ping results.
+                        try:
+                            log_node_cmd(
+                                    node_name   =   host,
+                                    cmd_to_log  =   ping_cmd_result,
+                                    file_prefix =   '{}output-ping-{}-{}'.format(PING_DIRECTORY, BW_BOTTLENECK,BW_OTHER)
+                            )
+                            success_logger.log("successfully logged command [{} : ping to {}] in run_topology_tests...".format(host,alt_host))
+                        except Exception:
+                            err_logger.log("[ ERROR ]  failure in logging ping results for {} to {}.".format(host,alt_host))
     
     # FINISHED
+    if not owns_network:
+        return probes
     try:
-        network.stop()
-        success_logger.log(generate_instance_message("successfully stopped mininet network in run_topology_tests..."))
-    except:
-        err_logger.log(generate_instance_message("[ ERROR ] failure to gracefully terminate Mininet network simulation."))
-        return
+        with TRACE.span( 'network.stop()' , 'teardown' ):
+            network.stop()
+        success_logger.log("successfully stopped mininet network in run_topology_tests...")
+    except Exception:
+        err_logger.log("[ ERROR ] failure to gracefully terminate Mininet network simulation.")
+    return probes
 
 
 def generate_server_test_cmd( server_ip : str, service_port : int) -> str :
@@ -249,7 +525,7 @@ def generate_server_test_cmd( server_ip : str, service_port : int) -> str :
         Returns:<br>
         - <code>string<code> the formatted command
     """
-    test_cmd_Server = "python3 server.py -ip {} -port {}".format(server_ip,service_port)
+    test_cmd_Server = "python3 {}/server.py -ip {} -port {} -stdout".format(SCRIPT_DIRECTORY,server_ip,service_port)
     return test_cmd_Server
 
 
@@ -266,15 +542,124 @@ def generate_client_test_cmd( client_ip : str , service_port : int , server_ip :
         Returns:<br>
         - <code>string</code> the formatted command
     """
-    test_cmd_Client = "python3 client.py -ip {} -port {} -server_ip {} -test {} -time {}".format(
+    test_cmd_Client = "python3 {}/client.py -ip {} -port {} -server_ip {} -test {} -time {} -stdout".format(
+                    SCRIPT_DIRECTORY,
                     client_ip,
                     service_port,
                     server_ip,
                     tcp_udp,
                     TIME)
+    if CONVERGE_TOLERANCE is not None:
+        test_cmd_Client += " -converge {} -min_time {} -max_time {} -omit {}".format(
+                    CONVERGE_TOLERANCE,
+                    MIN_TIME,
+                    MAX_TIME,
+                    OMIT_TIME)
+    if tcp_udp == 'tcp' and TCP_CONGESTION is not None:
+        test_cmd_Client += " -congestion {}".format(TCP_CONGESTION)
+    if tcp_udp == 'udp' and UDP_BANDWIDTH is not None:
+        test_cmd_Client += " -bandwidth {}".format(UDP_BANDWIDTH)
+    if STREAMS > 1:
+        test_cmd_Client += " -streams {}".format(STREAMS)
+    if tcp_udp == 'tcp' and ZEROCOPY:
+        test_cmd_Client += " -zerocopy"
+    for setting, value in find_client_settings( tcp_udp ).items():
+        test_cmd_Client += " -{} {}".format(setting, value)
     return test_cmd_Client
 
 
+def generate_convergence_params() -> dict:
+    """
+        Function produces the convergence parameters of an agent client command (see agent.py),
+        empty when convergence mode is disabled.<br>
+        
+        Returns:<br>
+        - <code>dict</code> { 'converge' , 'min_time' , 'max_time' , 'omit' }
+    """
+    if CONVERGE_TOLERANCE is None:
+        return {}
+    return {
+        'converge'  : CONVERGE_TOLERANCE,
+        'min_time'  : MIN_TIME,
+        'max_time'  : MAX_TIME,
+        'omit'      : OMIT_TIME
+    }
+
+
+def generate_congestion_params( tcp_udp : str , congestion : str = None ) -> dict:
+    """
+        Function produces the congestion control parameter of an agent client command (see agent.py),
+        empty for UDP tests and when the kernel default is used.<br>
+        
+        Parameters:<br>
+        - <strong>tcp_udp</strong>      : <code>string</code> specify tcp or udp iperf test<br>
+        - <strong>congestion</strong>   : <code>string</code> the flow's algorithm (default <code>TCP_CONGESTION</code>)<br>
+        
+        Returns:<br>
+        - <code>dict</code> { 'congestion' }
+    """
+    congestion = congestion if congestion is not None else TCP_CONGESTION
+    if tcp_udp != 'tcp' or congestion is None:
+        return {}
+    return { 'congestion' : congestion }
+
+
+def generate_rate_params( tcp_udp : str ) -> dict:
+    """
+        Function produces the load parameters of an agent client command (see agent.py): the parallel
+        streams, the target bitrate of UDP tests, the zero-copy send path of TCP tests and the client
+        settings (see find_client_settings)... empty for iperf's defaults.<br>
+        
+        Parameters:<br>
+        - <strong>tcp_udp</strong>      : <code>string</code> specify tcp or udp iperf test<br>
+        
+        Returns:<br>
+        - <code>dict</code> { 'streams' , 'bandwidth' , 'zerocopy' , 'blksize' , 'socket_buffer' }
+    """
+    params = { 'streams' : STREAMS } if STREAMS > 1 else {}
+    if tcp_udp == 'udp' and UDP_BANDWIDTH is not None:
+        params['bandwidth'] = UDP_BANDWIDTH
+    if tcp_udp == 'tcp' and ZEROCOPY:
+        params['zerocopy'] = True
+    params.update( find_client_settings( tcp_udp ) )
+    return params
+
+
+def store_flow_results( protocol : str , test_results : dict , flow_names : dict ) -> None:
+    """
+    Procedure appends the flows of a test to the result store under <code>RUN_ID</code>. Telemetry
+    sampled during a flow (see sample_telemetry) is moved out of its test case into the store.<br>
+    
+    Parameters:<br>
+    - <strong>protocol</strong>         : <code>string</code>   specifies udp or tcp test<br>
+    - <strong>test_results</strong>     : <code>dict</code>     case id -> client and server results<br>
+    - <strong>flow_names</strong>       : <code>dict</code>     case id -> ( client name , server name )<br>
+    
+    Returns:<br>
+    - None
+    """
+    store = ResultStore( RESULT_DATABASE )
+    try:
+        for case_id, test_case in test_results.items():
+            if test_case is None:
+                continue
+            telemetry = test_case.pop( 'telemetry' , None )
+            flow_id = store.record_flow(
+                        run_id          = RUN_ID,
+                        bw_bottleneck   = BW_BOTTLENECK,
+                        bw_other        = BW_OTHER,
+                        protocol        = protocol,
+                        case_id         = case_id,
+                        client          = flow_names[case_id][0],
+                        server          = flow_names[case_id][1],
+                        test_case       = test_case
+                    )
+            if telemetry is not None:
+                store.record_telemetry( flow_id = flow_id , run_id = RUN_ID , telemetry = telemetry )
+    finally:
+        store.close()
+
+
 def bottleneck_testing_json_dump( test_type : str , test_results : dict ) -> None:  
     """
         Procedure dumps a provided dictionary to a json file.
@@ -295,6 +680,7 @@ def bottleneck_testing_json_dump( test_type : str , test_results : dict ) -> Non
 def generate_iperf_client_server_file_name( network, client_name : str, server_name : str , protocol : str, cli_or_srv : chr ) -> str:
     """
         Function produces the iperf test result file name specific to the provided parameters as specified by the application instance.
+        The name is suffixed with the current bandwidth constraints.
 
         Parameters:<br>
         - <strong>network</strong>            :   <code>mininet.net.Mininet</code>    the network simulation instance<br>
@@ -309,29 +695,67 @@ def generate_iperf_client_server_file_name( network, client_name : str, server_n
     client_ip = parse_NodeIP( mininet_node_Node_IP = network.get(client_name).IP )
     server_ip = parse_NodeIP( mininet_node_Node_IP = network.get(server_name).IP )
     
-    file_name = "{}{}-iperf-client-{}-to-server-{}-test-{}.json".format(
+    file_name = "{}{}-iperf-client-{}-to-server-{}-test-{}-{}-{}.json".format(
         IPERF_DIRECTORY,
         cli_or_srv,
         client_ip,
         server_ip,
-        protocol.upper()
+        protocol.upper(),
+        BW_BOTTLENECK,
+        BW_OTHER
     )
     
-    new_file_name = file_name[:len(file_name)-5]
-    new_file_name += "-{}-{}.json".format(BW_BOTTLENECK,BW_OTHER)
-    
-    if os.path.exists(file_name) :
-        subprocess.run( ["mv", file_name, new_file_name])
+    return file_name
+
+
+def parse_json_output( output : str ) -> dict:
+    """
+        Function extracts the single line JSON result printed by <code>server.py</code> or
+        <code>client.py</code> when run with <code>-stdout</code>.<br>
+        
+        Parameters:<br>
+        - <strong>output</strong>   : <code>string</code> the process output<br>
+        
+        Returns:<br>
+        -<code>dict</code>  the decoded result
+    """
+    lines = [ x for x in output.splitlines() if x.startswith('{') ]
+    return json.loads( lines[-1] )
+
+
+def persist_client_server_JSON_data( network, client_name : str, server_name : str, protocol : str, result : dict) -> None:
+    """
+        Procedure hands the client and server results of a test case to the asynchronous
+        result sink, which writes them under the names read by <code>load_client_server_JSON_data</code>.<br>
+        
+        Parameters:<br>
+        - <strong>network</strong>          : <code>mininet.net.Mininet</code>  the network simulation instance.<br>
+        - <strong>client_name</strong>      : <code>string</code>               the name of the client in the test case<br>
+        - <strong>server_name</strong>      : <code>string</code>               the name of the server in the test case<br>
+        - <strong>protocol</strong>         : <code>string</code>               specifies the protocol of the test<br>
+        - <strong>result</strong>           : <code>dict</code>                 the client and server results<br>
+        
+        Returns:<br>
+        - None
+    """
+    for cli_or_srv, side in ( ('c', 'client') , ('s', 'server') ):
+        iperf_result_sink.submit( 
+                    generate_iperf_client_server_file_name( 
+                        network      = network ,
+                        client_name  = client_name,
+                        server_name  = server_name, 
+                        protocol     = protocol, 
+                        cli_or_srv   = cli_or_srv
+                    ),
+                    result[side]
+                )
 
-    
-    return new_file_name
-    
-     
 
 def load_client_server_JSON_data( network, client_name : str, server_name : str, protocol : str) -> dict:
     """
         Function loads json formatted iperf test data and returns a dictionary.
-        The paramaters specify the test case instance.<br>
+        The paramaters specify the test case instance. Test runs receive their results
+        directly... this reads back the persisted files for offline use.<br>
         
         Parameters:<br>
         - <strong>network</strong>          : <code>mininet.net.Mininet</code>  the network simulation instance.<br>
@@ -375,9 +799,72 @@ def load_client_server_JSON_data( network, client_name : str, server_name : str,
 
 
 # TESTER
+def stop_test_server( server ) -> None:
+    """
+    Procedure stops the server of a test attempt... a spawned server.py is terminated, and a
+    pending agent server is cancelled by closing its connection.<br>
+    
+    Parameters:<br>
+    - <strong>server</strong>   : <code>Popen</code> or <code>AgentConnection</code> the server (None if it did not start)<br>
+    
+    Returns:<br>
+    - None
+    """
+    if server is None:
+        return
+    if isinstance( server , AgentConnection ):
+        server.close()
+    else:
+        server.terminate()
+        try:
+            server.wait( timeout = SERVER_RESULT_TIMEOUT )
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def wait_for_server_ready( network , server_name : str , service_port : int , server = None ) -> None:
+    """
+    Procedure waits until the iperf server of a test listens on its service port (the TCP control
+    connection... UDP tests open it as well), polling <code>ss</code> in the server's namespace every
+    <code>SERVER_READY_INTERVAL</code> seconds for at most <code>SERVER_READY_TIMEOUT</code> seconds.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>      : <code>Mininet()</code> instance<br>
+    - <strong>server_name</strong>  : <code>string</code> name of the node running the server<br>
+    - <strong>service_port</strong> : <code>int</code> service port of the server<br>
+    - <strong>server</strong>       : <code>Popen</code> a spawned server.py... a server which exits fails at once<br>
+    
+    Returns:<br>
+    - None... raises <code>TimeoutError</code> if the server is not listening in time
+    """
+    listening = re.compile( r":{}\s".format(service_port) )
+    deadline  = perf_counter() + SERVER_READY_TIMEOUT
+    while perf_counter() < deadline:
+        if listening.search( network.get(server_name).cmd( "ss -ltn" ) ):
+            return
+        if server is not None and not isinstance( server , AgentConnection ) and server.poll() is not None:
+            raise RuntimeError("server exited with {} before listening on port {}".format(server.returncode, service_port))
+        sleep( SERVER_READY_INTERVAL )
+    raise TimeoutError("server not listening on port {} after {}s".format(service_port, SERVER_READY_TIMEOUT))
+
+
+def calculate_test_deadline() -> float:
+    # the longest a test may run (convergence mode stops by MAX_TIME), plus connection setup and the end exchange
+    return ( MAX_TIME if CONVERGE_TOLERANCE is not None else TIME ) + TEST_DEADLINE_MARGIN
+
+
+def calculate_retry_backoff( attempt : int ) -> float:
+    # exponential... RETRY_BACKOFF after the first failed attempt, doubling up to RETRY_BACKOFF_MAX
+    return min( RETRY_BACKOFF * 2 ** ( attempt - 1 ) , RETRY_BACKOFF_MAX )
+
+
 def run_iperf_client_server_test( client_name : str , server_name : str, network , service_port : int , tcp_udp : str ) -> dict:
     """ 
-    Function performs <code>iperf3</code> testing between two <code>Mininet Node</code> instances.<br>
+    Function performs <code>iperf3</code> testing between two <code>Mininet Node</code> instances.
+    Every attempt waits for the server to listen before the client starts (see wait_for_server_ready),
+    the client is stopped at the test deadline (see calculate_test_deadline), and failed attempts are
+    retried after a growing backoff (see calculate_retry_backoff). A <code>KeyboardInterrupt</code>
+    stops the attempt's server and propagates... the remaining attempts are not run.<br>
     
     Parameters:<br>
     - <strong>client_name</strong>  : <code>string</code> name of the node to act as the client<br>
@@ -396,8 +883,8 @@ def run_iperf_client_server_test( client_name : str , server_name : str, network
     try:
         server_ip       = parse_NodeIP(network.get(server_name).IP)
         client_ip       = parse_NodeIP(network.get(client_name).IP)
-    except:
-        err_logger.log(generate_instance_message("[ ERROR ] failure to extract IP addresses from test subjects in run_iperf_client_server_test"))
+    except Exception:
+        err_logger.log("failure to extract IP addresses from test subjects", client=client_name, server=server_name, protocol=tcp_udp)
         return None
     # Latch will be used to skip over procedures, in the case of a failure.
     result = {}
@@ -405,90 +892,145 @@ def run_iperf_client_server_test( client_name : str , server_name : str, network
     success = False
     while not success and attempts:
         success_latch = 1
-        # iperf3 server set        
+        # structured fields of every record of this attempt
+        attempt_fields = { 'client' : client_name , 'server' : server_name , 'protocol' : tcp_udp , 'attempt' : MAX_ATTEMPTS-attempts+1 }
+        # bottleneck telemetry of the client run (see sample_telemetry)
+        telemetry = None
+        # the server of this attempt (see stop_test_server)
+        p1 = None
         try:
-            # Initiate the server on a separate thread.
-            command =   generate_server_test_cmd(
-                                    server_ip   =   server_ip,
-                                    service_port=   service_port
-                        )
-            # Server initiated here...
-            p1 = network.get(server_name).popen( command )
-
-            success_logger.log(generate_instance_message("successfully initiated server [@{}] in run_iperf_client_server_test...".format(server_name)))
-        # failed to initiate server
-        except:
-            err_logger.log(generate_instance_message("[ ERROR ] failure in initiating server in run_iperf_client_server_test({%s}) @ attempt %d".format(
-                server_name, MAX_ATTEMPTS-attempts+1 )))
-            # jump to next attempt
-            success_latch = 0            
-        
-        # successfully initiated server...
-        if success_latch:
+            # iperf3 server set        
             try:
-                # iperf3 client connection & testing
-                command = generate_client_test_cmd(
-                                                client_ip   =   client_ip,
-                                                service_port=   service_port, 
+                with TRACE.span( 'server start' , 'setup' , **attempt_fields ):
+                    if HOST_AGENTS:
+                        # Server command stays pending on its connection until the test completes.
+                        p1 = AgentConnection( HOST_AGENTS[server_name][1] , timeout = SERVER_RESULT_TIMEOUT )
+                        p1.send({ 'op' : 'server' , 'ip' : server_ip , 'port' : service_port , 'converge' : CONVERGE_TOLERANCE })
+                    else:
+                        # Initiate the server on a separate thread.
+                        command =   generate_server_test_cmd(
                                                 server_ip   =   server_ip,
-                                                tcp_udp     =   tcp_udp
-                                            )
-                # Client connects here...
-                network.get(client_name).cmd(command)
-
-                success_logger.log(generate_instance_message("successfully initiated client in iperf test [@server {} : @client {}] in run_iperf_client_server_test...".format(
-                                        server_name, 
-                                        client_name)))
-            # failed to run client connection to server
-            except:
-                err_logger.log(generate_instance_message("[ ERROR ] failure in client connection in run_iperf_client_server_test ({%s}) @ attempt %d".format( 
-                                    client_name, 
-                                    MAX_ATTEMPTS-attempts+1 ))
-                            )
-                
+                                                service_port=   service_port
+                                    )
+                        # Server initiated here...
+                        p1 = network.get(server_name).popen( command )
+                    # ...and listening before the client connects.
+                    wait_for_server_ready( network , server_name , service_port , server = p1 )
+
+                success_logger.log("successfully initiated server", **attempt_fields)
+            # failed to initiate server
+            except Exception:
+                err_logger.log("failure in initiating server", **attempt_fields)
                 # jump to next attempt
-                success_latch = 0
-        
-        # successful test was potentially performed
-        if success_latch:
-            # Successful test ?
-            # Ensures that result data is present.
-            try:
-                # Ensure that server.py and client.py have time to write results
-                sleep(1)
-                result = load_client_server_JSON_data(
-                            network     = network,
-                            client_name = client_name,
-                            server_name = server_name,
-                            protocol    = tcp_udp
-                )
-                # Data is calculated and loaded... ready to abort operation.
-                success = True
-                success_logger.log(generate_instance_message("successfully performed server client test & exited iperf test [@server {} : @client {}] in run_iperf_client_server_test...".format(
-                                        server_name,
-                                        client_name
-                                    ))
-                                )
-                
-            # results are missing
-            except: # will try again
-                err_logger.log(generate_instance_message("failed attempt({}) in run_iperf_client_server_test (client:{} server{})".format(
-                                            MAX_ATTEMPTS-attempts+1,
-                                            client_name,
-                                            server_name
-                )))
+                success_latch = 0            
+            
+            # successfully initiated server...
+            if success_latch:
+                try:
+                    if HOST_AGENTS:
+                        # Agents reply with the result as soon as the test finishes... or the request times out at the deadline.
+                        with sample_telemetry( network ) as sampler, TRACE.span( 'client run' , 'measurement' , **attempt_fields ):
+                            client_output = agent_request( HOST_AGENTS[client_name][1] , {
+                                        'op'        : 'client',
+                                        'ip'        : client_ip,
+                                        'port'      : service_port,
+                                        'server_ip' : server_ip,
+                                        'test'      : tcp_udp,
+                                        'time'      : TIME,
+                                        **generate_convergence_params(),
+                                        **generate_congestion_params( tcp_udp ),
+                                        **generate_rate_params( tcp_udp )
+                                    } , timeout = calculate_test_deadline() )
+                        telemetry = sampler.stop() if sampler else None
+                        with TRACE.span( 'server result' , 'record' , **attempt_fields ):
+                            server_output = p1.receive() if client_output['status'] == 'ok' else client_output
+                    else:
+                        # iperf3 client connection & testing... killed at the deadline rather than blocking node.cmd forever
+                        command = "timeout -k {} {} {}".format(
+                                                        SERVER_RESULT_TIMEOUT,
+                                                        calculate_test_deadline(),
+                                                        generate_client_test_cmd(
+                                                            client_ip   =   client_ip,
+                                                            service_port=   service_port, 
+                                                            server_ip   =   server_ip,
+                                                            tcp_udp     =   tcp_udp
+                                                        ))
+                        # Client connects here... the result is printed to the command output.
+                        with sample_telemetry( network ) as sampler, TRACE.span( 'client run' , 'measurement' , **attempt_fields ):
+                            client_output = network.get(client_name).cmd(command)
+                        telemetry = sampler.stop() if sampler else None
+                        with TRACE.span( 'server result' , 'record' , **attempt_fields ):
+                            # A failed client leaves the server waiting... do not wait on it.
+                            parse_json_output( client_output )
+                            # The server exits, printing its result, once the test completes.
+                            server_output = p1.communicate( timeout = SERVER_RESULT_TIMEOUT )[0].decode()
+
+                    success_logger.log("successfully initiated client in iperf test", **attempt_fields)
+                # failed to run client connection to server
+                except Exception:
+                    err_logger.log("failure in client connection", **attempt_fields)
+                    
+                    # jump to next attempt
+                    success_latch = 0
+            
+            # successful test was potentially performed
+            if success_latch:
+                # Successful test ?
+                # Ensures that result data is present.
+                try:
+                    with TRACE.span( 'result parse' , 'record' , **attempt_fields ):
+                        if HOST_AGENTS:
+                            if client_output['status'] != 'ok' or server_output['status'] != 'ok':
+                                raise RuntimeError(client_output.get('error', server_output.get('error')))
+                            result = {
+                                        "client": client_output['result'],
+                                        "server": server_output['result']
+                                    }
+                        else:
+                            result = {
+                                        "client": parse_json_output( client_output ),
+                                        "server": parse_json_output( server_output )
+                                    }
+                        # moved into the result store with the flow (see store_flow_results)
+                        if telemetry is not None:
+                            result['telemetry'] = telemetry
+                        if PERSIST_IPERF_RESULTS:
+                            persist_client_server_JSON_data(
+                                        network     = network,
+                                        client_name = client_name,
+                                        server_name = server_name,
+                                        protocol    = tcp_udp,
+                                        result      = result
+                            )
+                    # Data is calculated and loaded... ready to abort operation.
+                    success = True
+                    success_logger.log("successfully performed server client test & exited iperf test", **attempt_fields)
+                    
+                # results are missing
+                except Exception: # will try again
+                    err_logger.log("failed attempt... results are missing", **attempt_fields)
+        except KeyboardInterrupt:
+            # cancelled... no further attempts, the interruption ends the sweep
+            err_logger.log("test cancelled by the user", **attempt_fields)
+            raise
+        finally:
+            # iperf3 server clear
+            # necessary for repetative testing
+            with TRACE.span( 'server stop' , 'teardown' , **attempt_fields ):
+                stop_test_server( p1 )
 
         attempts -= 1
-        # iperf3 server clear
-        # necessary for repetative testing
-        p1.terminate()
+        if not success and attempts:
+            # a transient failure (e.g. a port still held by the previous server) gets time to clear
+            with TRACE.span( 'retry backoff' , 'setup' , **attempt_fields ):
+                sleep( calculate_retry_backoff( MAX_ATTEMPTS - attempts ) )
         # reset succes_latch flag
         success_latch = 1
     # END WHILE
 
     # Indicates failure in iperf test where no attempts are remaining.
-    if not attempts :
-        err_logger.log(generate_instance_message("failure to complete testing (ATTEMPTS EXCEEDED) [@server {} : @client {}] in run_iperf_client_server_test...".format(server_name,client_name)))
+    if not success :
+        err_logger.log("failure to complete testing (ATTEMPTS EXCEEDED)", client=client_name, server=server_name, protocol=tcp_udp)
         return None
     
     # RETURNING
@@ -496,62 +1038,233 @@ def run_iperf_client_server_test( client_name : str , server_name : str, network
         return result
     
 
-def run_perf_tests() -> None :
+def run_concurrent_flows( network , flows : list ) -> list:
+    """
+    Function runs a set of <code>iperf3</code> flows at the same time through the resident agents.
+    Every flow is given its own service port from <code>FLOW_PORT_POOL</code>; all servers are
+    started first, and once all listen (see wait_for_server_ready) the clients are released together
+    behind a start barrier. A client which outlasts the test deadline (see calculate_test_deadline) fails.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance<br>
+    - <strong>flows</strong>    : <code>list</code> of (client name, server name, 'tcp' or 'udp') tuples... TCP flows may add
+    their congestion control algorithm as a fourth item (default <code>TCP_CONGESTION</code>)<br>
+    
+    Returns:<br>
+    - <code>list</code> one dictionary per flow, in order...
+        { 'client', 'server', 'protocol', 'congestion', 'port', 'result' }... <code>result</code> holds the client and server
+        results, or <code>None</code> for a failed flow
+    """
+    if not HOST_AGENTS:
+        raise RuntimeError("concurrent flows require resident agents (see start_host_agents)")
+    if len(flows) > len(FLOW_PORT_POOL):
+        raise ValueError("{} flows exceed the {} ports of FLOW_PORT_POOL".format(len(flows), len(FLOW_PORT_POOL)))
+    
+    schedule = []
+    for flow , port in zip( flows , FLOW_PORT_POOL ):
+        client_name , server_name , protocol = flow[:3]
+        schedule.append({
+            'client'    : client_name,
+            'server'    : server_name,
+            'protocol'  : protocol,
+            'congestion': generate_congestion_params( protocol , flow[3] if len(flow) > 3 else None ).get('congestion'),
+            'port'      : port,
+            'result'    : None
+        })
+    
+    # Client commands up front... a failure here must not strand the other clients at the start barrier.
+    client_commands = [
+        {
+            'op'        : 'client',
+            'ip'        : parse_NodeIP(network.get(flow['client']).IP),
+            'port'      : flow['port'],
+            'server_ip' : parse_NodeIP(network.get(flow['server']).IP),
+            'test'      : flow['protocol'],
+            'time'      : TIME,
+            **generate_convergence_params(),
+            **generate_congestion_params( flow['protocol'] , flow['congestion'] ),
+            **generate_rate_params( flow['protocol'] )
+        }
+        for flow in schedule
+    ]
+    
+    # Servers first... each stays pending on its own connection until its flow completes.
+    server_connections = []
+    with TRACE.span( 'server start' , 'setup' , flows = len(schedule) ):
+        try:
+            for flow in schedule:
+                connection = AgentConnection( HOST_AGENTS[flow['server']][1] , timeout = SERVER_RESULT_TIMEOUT )
+                server_connections.append( connection )
+                connection.send({ 
+                            'op'    : 'server', 
+                            'ip'    : parse_NodeIP(network.get(flow['server']).IP), 
+                            'port'  : flow['port'],
+                            'converge' : CONVERGE_TOLERANCE
+                        })
+            # every server listening before any client is released
+            for flow in schedule:
+                wait_for_server_ready( network , flow['server'] , flow['port'] )
+        except Exception:
+            # the servers already started are cancelled... their ports are free for the next attempt
+            for connection in server_connections:
+                connection.close()
+            raise
+    
+    client_outputs  = [ None ] * len(schedule)
+    start_barrier   = threading.Barrier( len(schedule) )
+    
+    def release_client( index : int ) -> None:
+        try:
+            # broken (see below) when the clients are not all started... the flow fails
+            start_barrier.wait()
+            client_outputs[index] = agent_request( HOST_AGENTS[schedule[index]['client']][1] , client_commands[index] ,
+                                                   timeout = calculate_test_deadline() )
+        except Exception as e:
+            client_outputs[index] = { 'status' : 'error' , 'error' : repr(e) }
+    
+    try:
+        with sample_telemetry( network ) as sampler, TRACE.span( 'concurrent flows' , 'measurement' , flows = len(schedule) ):
+            threads = [ threading.Thread( target = release_client , args = (index,) ) for index in range(len(schedule)) ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # the flows share the bottleneck... and its telemetry
+        telemetry = sampler.stop() if sampler else None
+    
+        with TRACE.span( 'collect results' , 'record' , flows = len(schedule) ):
+            # Collect... a failed client's server is cancelled by closing its connection (see below).
+            for flow, client_output, connection in zip( schedule , client_outputs , server_connections ):
+                try:
+                    if client_output['status'] != 'ok':
+                        raise RuntimeError(client_output.get('error'))
+                    server_output = connection.receive()
+                    if server_output['status'] != 'ok':
+                        raise RuntimeError(server_output.get('error'))
+                    flow['result'] = {
+                                        "client": client_output['result'],
+                                        "server": server_output['result']
+                                    }
+                    if telemetry is not None:
+                        flow['result']['telemetry'] = telemetry
+                    if PERSIST_IPERF_RESULTS:
+                        persist_client_server_JSON_data(
+                                    network     = network,
+                                    client_name = flow['client'],
+                                    server_name = flow['server'],
+                                    protocol    = flow['protocol'],
+                                    result      = flow['result']
+                        )
+                    success_logger.log("successfully performed concurrent flow [@server {} : @client {} : port {}] in run_concurrent_flows...".format(
+                                                flow['server'],
+                                                flow['client'],
+                                                flow['port']
+                                            ))
+                except Exception:
+                    err_logger.log("[ ERROR ] failed concurrent flow [@server {} : @client {} : port {}] in run_concurrent_flows".format(
+                                                flow['server'],
+                                                flow['client'],
+                                                flow['port']
+                                            ))
+    finally:
+        # every server and waiting client is released... also when telemetry or the client threads fail before collection
+        start_barrier.abort()
+        for connection in server_connections:
+            connection.close()
+    
+    return schedule
+
+
+def run_perf_tests( network = None ) -> dict :
     """
     Procedure creates a <code>Mininet</code> network instance and performs <code>iperf3</code>
     testing, given specified constraints on bandwidth.<br>
     
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> an already started instance to test (optional)... when
+    omitted a network is built, started and stopped within the procedure<br>
+    
     Returns:<br>
-    - <code>list</code> : result of iperf3 testing ( sent/received bytes )<br>
-        - [ (tcp) h1-h3, (tcp) h3-h1, (udp) h2-h4, (udp) h4-h2 ]
+    - <code>dict</code> : result of iperf3 testing ( sent/received bytes ), <code>None</code> upon failure<br>
+        - { 'tcp' : { 1 : (tcp) h1-h3, 2 : (tcp) h3-h1 }, 'udp' : { 1 : (udp) h2-h4, 2 : (udp) h4-h2 } }<br>
+    When <code>CONCURRENT_FLOWS</code> is set the four flows run at the same time (see run_concurrent_flows).
     """
     
-    # Build topology.
-    try:
-        topo    = BottleneckTopo( BW_BOTTLENECK, BW_OTHER )
-    except:
-        err_logger.log(generate_instance_message("failure to initiate topology in run_perf_tests - {}-{}".format(
-            BW_BOTTLENECK,
-            BW_OTHER
-        )))
-    
-    # Instantiate Mininet object.
-    try:
-        network = Mininet( topo=topo ) 
-    except:
-        err_logger.log(generate_instance_message("failure to initiate mininet.net.Mininet network in run_perf_tests - {}-{}".format(
-            BW_BOTTLENECK,
-            BW_OTHER
-        )))
-    
-    # Start the network simulation.
-    try:
-        network.start()
-    except:
-        err_logger.log(generate_instance_message("failure to start mininet simulation in run_perf_tests - {}-{}".format(
-            BW_BOTTLENECK,
-            BW_OTHER
-        )))
+    # Networks provided by the caller (sweep mode) are neither built nor stopped here.
+    owns_network = network is None
+    if owns_network:
+        # Build topology.
+        try:
+            with TRACE.span( 'BottleneckTopo' , 'setup' ):
+                topo    = BottleneckTopo( BW_BOTTLENECK, BW_OTHER )
+        except Exception:
+            err_logger.log("failure to initiate topology in run_perf_tests - {}-{}".format(
+                BW_BOTTLENECK,
+                BW_OTHER
+            ))
+        
+        # Instantiate Mininet object.
+        try:
+            with TRACE.span( 'Mininet()' , 'setup' ):
+                network = Mininet( topo=topo , **generate_network_params() ) 
+        except Exception:
+            err_logger.log("failure to initiate mininet.net.Mininet network in run_perf_tests - {}-{}".format(
+                BW_BOTTLENECK,
+                BW_OTHER
+            ))
+        
+        # Start the network simulation.
+        try:
+            with TRACE.span( 'network.start()' , 'setup' ):
+                network.start()
+            if USE_AGENTS:
+                with TRACE.span( 'start agents' , 'setup' ):
+                    start_host_agents( network )
+        except Exception:
+            err_logger.log("failure to start mininet simulation in run_perf_tests - {}-{}".format(
+                BW_BOTTLENECK,
+                BW_OTHER
+            ))
     
     # maximum number of times to try again
     attempts = MAX_ATTEMPTS
     # flag marks successful aquisition of data
     success = False
-    while not success and attempts :
+    while not success and attempts and CONCURRENT_FLOWS :
+        try :
+            # All four flows share the bottleneck at once... retried together to keep the contention intact.
+            flows = run_concurrent_flows( 
+                                network = network , 
+                                flows   = [ 
+                                            (prefixed('h1'), prefixed('h3'), 'tcp') , (prefixed('h3'), prefixed('h1'), 'tcp') , 
+                                            (prefixed('h2'), prefixed('h4'), 'udp') , (prefixed('h4'), prefixed('h2'), 'udp') 
+                                        ] 
+                            )
+            if None in [ flow['result'] for flow in flows ]:
+                raise RuntimeError("incomplete concurrent flows")
+            
+            iperf_test_results_h1_h3 = { 1: flows[0]['result'] , 2: flows[1]['result'] }
+            iperf_test_results_h2_h4 = { 1: flows[2]['result'] , 2: flows[3]['result'] }
+            success = True
+        except Exception:
+            err_logger.log("[ ERROR ] Failure in concurrent run_perf_tests @ attempt #{}".format(MAX_ATTEMPTS-attempts+1))
+            attempts -= 1
+    
+    while not success and attempts and not CONCURRENT_FLOWS :
         try :    
 
             # TESTING h1 to h3 
             iperf_h1_Client_h3_Server_result = run_iperf_client_server_test( 
-                                            client_name     =   'h1' , 
-                                            server_name     =   'h3' , 
+                                            client_name     =   prefixed('h1') , 
+                                            server_name     =   prefixed('h3') , 
                                             network         =   network , 
                                             service_port    =   5000, 
                                             tcp_udp         =   'tcp' 
                                         )
             
             iperf_h3_Client_h1_Server_result = run_iperf_client_server_test( 
-                                            client_name     =   'h3' , 
-                                            server_name     =   'h1' , 
+                                            client_name     =   prefixed('h3') , 
+                                            server_name     =   prefixed('h1') , 
                                             network         =   network , 
                                             service_port    =   5000, 
                                             tcp_udp         =   'tcp' 
@@ -565,15 +1278,15 @@ def run_perf_tests() -> None :
             
             # TESTING h2 to h4
             iperf_h2_Client_h4_Server_result = run_iperf_client_server_test( 
-                                            client_name     =   'h2' , 
-                                            server_name     =   'h4' , 
+                                            client_name     =   prefixed('h2') , 
+                                            server_name     =   prefixed('h4') , 
                                             network         =   network , 
                                             service_port    =   5000, 
                                             tcp_udp         =   'udp' 
                                         )
             iperf_h4_Client_h2_Server_result = run_iperf_client_server_test( 
-                                            client_name     =   'h4' , 
-                                            server_name     =   'h2' , 
+                                            client_name     =   prefixed('h4') , 
+                                            server_name     =   prefixed('h2') , 
                                             network         =   network , 
                                             service_port    =   5000, 
                                             tcp_udp         =   'udp' 
@@ -587,31 +1300,844 @@ def run_perf_tests() -> None :
 
             # exit procedure
             success = True
-        except :        
-            err_logger.log(generate_instance_message("[ ERROR ] Failure in run_perf_tests @ attempt #{}".format(MAX_ATTEMPTS-attempts+1)))
+        except Exception:        
+            err_logger.log("[ ERROR ] Failure in run_perf_tests @ attempt #{}".format(MAX_ATTEMPTS-attempts+1))
             attempts -= 1
-                
+    
+    if owns_network:
+        try:
+            with TRACE.span( 'network.stop()' , 'teardown' ):
+                stop_host_agents()
+                network.stop()
+        except Exception:
+            err_logger.log("failure to properly halt mininet.net.Mininet network in run_perf_tests - {}-{}".format(
+                BW_BOTTLENECK,
+                BW_OTHER
+            ))
+
+    with TRACE.span( 'record results' , 'record' ):
+        # Recording the flows in the append-only result store (read by analyze-perf.py).
+        try:
+            store_flow_results( 
+                            protocol        =   'tcp',
+                            test_results    =   iperf_test_results_h1_h3,
+                            flow_names      =   { 1 : ('h1', 'h3') , 2 : ('h3', 'h1') }
+                        )
+            store_flow_results( 
+                            protocol        =   'udp',
+                            test_results    =   iperf_test_results_h2_h4,
+                            flow_names      =   { 1 : ('h2', 'h4') , 2 : ('h4', 'h2') }
+                        )
+        except Exception:
+            err_logger.log("[ ERROR ] failure to record results in the result store in run_perf_tests")
+    
+        # Producing final json files for test result ( output-<test>-<BW_BOTTLENECK>-<bw_other>.json ).
+        # files requested per assignment specifications
+        try:
+            bottleneck_testing_json_dump( 
+                                    test_type       =   'tcp', 
+                                    test_results    =   iperf_test_results_h1_h3
+                        )   
+            bottleneck_testing_json_dump( 
+                                    test_type       =   'udp', 
+                                    test_results    =   iperf_test_results_h2_h4
+                        )   
+        except Exception:        
+            return None
+    
+    return {
+                'tcp' : iperf_test_results_h1_h3,
+                'udp' : iperf_test_results_h2_h4
+            }
+
+
+def run_plan_tests( senders : int , receivers : int , tier_bw : list , protocol : str = 'tcp' ) -> list:
+    """
+    Function builds a <code>TieredBottleneckTopo</code> network and runs every flow of its
+    pairing plan concurrently. Results are written to
+    'output-plan-<senders>x<receivers>-<tier bandwidths>-<bw_other>.json'.<br>
+    
+    Parameters:<br>
+    - <strong>senders</strong>      : <code>int</code> number of sending hosts<br>
+    - <strong>receivers</strong>    : <code>int</code> number of receiving hosts<br>
+    - <strong>tier_bw</strong>      : <code>list</code> bandwidth (Mbps) of each inter-tier link<br>
+    - <strong>protocol</strong>     : <code>string</code> 'tcp' or 'udp' (default 'tcp')<br>
+    
+    Returns:<br>
+    - <code>list</code> the flow results (see run_concurrent_flows), <code>None</code> upon failure
+    """
     try:
+        network = Mininet( 
+                    topo = TieredBottleneckTopo( senders = senders , receivers = receivers , tier_bw = tier_bw , bw_other = BW_OTHER , 
+                                                 prefix = NODE_PREFIX , dpid_base = WORKER_INDEX ),
+                    **generate_network_params() 
+                )
+        network.start()
+        start_host_agents( network )
+    except Exception:
+        err_logger.log("[ ERROR ] failure to start tiered network in run_plan_tests")
+        return None
+    
+    try:
+        flows = run_concurrent_flows( network = network , flows = generate_pairing_plan( senders , receivers , protocol , NODE_PREFIX ) )
+    except Exception:
+        err_logger.log("[ ERROR ] failure running pairing plan in run_plan_tests")
+        flows = None
+    finally:
+        stop_host_agents()
         network.stop()
-    except:
-        err_logger.log(generate_instance_message("failure to properly halt mininet.net.Mininet network in run_perf_tests - {}-{}".format(
-            BW_BOTTLENECK,
-            BW_OTHER
-        )))
-
-    # Producing final json files for test result ( output-<test>-<BW_BOTTLENECK>-<bw_other>.json ).
-    # files requested per assignment specifications
+    
+    with open("{}output-plan-{}x{}-{}-{}.json".format( FINAL_RESULT_DIRECTORY, senders, receivers, "-".join( str(x) for x in tier_bw ), BW_OTHER ),
+            'w') as f:
+        json.dump(flows, f)
+    
+    if flows is not None:
+        for protocol in set( flow['protocol'] for flow in flows ):
+            cases = { index + 1 : flow for index, flow in enumerate(flows) if flow['protocol'] == protocol }
+            store_flow_results(
+                        protocol        =   protocol,
+                        test_results    =   { x : flow['result'] for x, flow in cases.items() },
+                        flow_names      =   { x : ( flow['client'] , flow['server'] ) for x, flow in cases.items() }
+                    )
+    return flows
+
+
+######################################################################################
+# SWEEP MODE
+# A single network is built for the whole sweep... the bottleneck link is reshaped
+# in place between sweep points rather than rebuilding namespaces, bridges and veths.
+
+def build_network():
+    """
+    Function builds and starts a <code>BottleneckTopo</code> network with the current
+    bandwidth constraints. Resident agents are started when <code>USE_AGENTS</code> is set.<br>
+    
+    Returns:<br>
+    - <code>Mininet()</code> the started network instance
+    """
+    topo    = BottleneckTopo( BW_BOTTLENECK , BW_OTHER )
+    network = Mininet( topo=topo , **generate_network_params() )
+    network.start()
+    if USE_AGENTS:
+        start_host_agents( network )
+    return network
+
+
+def generate_link_config( params : dict , prefix : str = '' ) -> dict:
+    """
+    Function converts the link parameters of a grid point (see experiment_design.py) into
+    <code>TCIntf.config</code> keyword arguments. Zero delay, jitter and loss leave netem out.<br>
+    
+    Parameters:<br>
+    - <strong>params</strong>   : <code>dict</code> link parameters (delay and jitter in ms, loss in percent, max_queue_size in packets)<br>
+    - <strong>prefix</strong>   : <code>string</code> prefix of the link class ('edge_' for the host links, none for the bottleneck)<br>
+    
+    Returns:<br>
+    - <code>dict</code> keyword arguments (bw excluded)
+    """
+    delay, jitter, loss = ( params.get( prefix + x ) for x in ( 'delay' , 'jitter' , 'loss' ) )
+    queue = params.get( prefix + 'max_queue_size' )
+    return {
+        'delay'             : "{}ms".format(delay) if delay else None,
+        'jitter'            : "{}ms".format(jitter) if jitter else None,
+        'loss'              : loss if loss else None,
+        'max_queue_size'    : int(queue) if queue else None
+    }
+
+
+def reshape_bottleneck_link( network , bw_bottleneck : int , **link_config ) -> None:
+    """
+    Procedure reconfigures the s1-s2 <code>TCLink</code> of a running network to the
+    provided bandwidth. Both interfaces of the link are reshaped.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>        : <code>Mininet()</code> instance<br>
+    - <strong>bw_bottleneck</strong>  : <code>int</code> the new bottleneck bandwidth (Mbps)<br>
+    - <strong>link_config</strong>    : further <code>TCIntf.config</code> arguments (see generate_link_config)<br>
+    
+    Returns:<br>
+    - None
+    """
+    link = network.linksBetween( network.get(prefixed('s1')) , network.get(prefixed('s2')) )[0]
+    link.intf1.config( bw = bw_bottleneck , **link_config )
+    link.intf2.config( bw = bw_bottleneck , **link_config )
+
+
+def reshape_edge_links( network , bw_other : int , **link_config ) -> None:
+    """
+    Procedure reconfigures the host-to-switch <code>TCLink</code>s of a running network. Both
+    interfaces of every link are reshaped.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>        : <code>Mininet()</code> instance<br>
+    - <strong>bw_other</strong>       : <code>int</code> the new bandwidth of the host links (Mbps)<br>
+    - <strong>link_config</strong>    : further <code>TCIntf.config</code> arguments (see generate_link_config)<br>
+    
+    Returns:<br>
+    - None
+    """
+    for host in network.hosts:
+        for intf in host.intfList():
+            if intf.link is not None:
+                intf.link.intf1.config( bw = bw_other , **link_config )
+                intf.link.intf2.config( bw = bw_other , **link_config )
+
+
+def cleanup_network( network ) -> None:
+    """
+    Procedure attempts to stop the provided network and then performs a full
+    <code>mn -c</code> cleanup. Used as the fallback when a sweep point fails.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance (may be <code>None</code>)<br>
+    
+    Returns:<br>
+    - None
+    """
+    stop_host_agents()
+    if network is not None:
+        try:
+            network.stop()
+        except Exception:
+            err_logger.log("[ ERROR ] failure to stop network prior to cleanup in cleanup_network")
+    subprocess.run( ["mn", "-c"] , stdout=subprocess.DEVNULL , stderr=subprocess.DEVNULL )
+
+
+
+def rebuild_network( network ):
+    """
+    Function replaces the network of a single-network mode after a failing point: full cleanup
+    (see cleanup_network), then a new network (see build_network).<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> the failed instance (may be <code>None</code>)<br>
+    
+    Returns:<br>
+    - <code>Mininet()</code> the new network, <code>None</code> when the rebuild failed (the next point tries again)
+    """
+    try:
+        with TRACE.span( 'mn -c' , 'cleanup' ):
+            cleanup_network( network )
+        with TRACE.span( 'build_network' , 'setup' ):
+            return build_network()
+    except Exception:
+        err_logger.log("[ ERROR ] failure to rebuild network in rebuild_network")
+        return None
+
+def apply_sweep_point( point : dict ) -> None:
+    """
+    Procedure makes a sweep point current: its bandwidths, link parameters and (grid points)
+    the run its results are recorded under.<br>
+    
+    Parameters:<br>
+    - <strong>point</strong>    : <code>dict</code> { 'bw' , ['run_id'] , ['edge_bw'] , ...link parameters }<br>
+    
+    Returns:<br>
+    - None
+    """
+    global BW_BOTTLENECK, BW_OTHER, RUN_ID, LINK_PARAMS
+    
+    BW_BOTTLENECK   = point['bw']
+    BW_OTHER        = point.get( 'edge_bw' , BW_OTHER )
+    RUN_ID          = point.get( 'run_id' , RUN_ID )
+    LINK_PARAMS     = { x : y for x, y in point.items() if x not in ( 'bw' , 'edge_bw' , 'run_id' ) }
+
+
+def reconfigure_links( network , point : dict , previous : dict = None ) -> None:
+    """
+    Procedure reshapes the links of a running network for a sweep point. Only the link classes
+    (bottleneck, host links) whose parameters differ from the previous point are reshaped... the
+    host links only when the point has edge parameters at all.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>    : <code>Mininet()</code> instance<br>
+    - <strong>point</strong>      : <code>dict</code> the sweep point (see apply_sweep_point)<br>
+    - <strong>previous</strong>   : <code>dict</code> the point the network is configured for (None after a build)<br>
+    
+    Returns:<br>
+    - None
+    """
+    def changed( edge : bool ) -> bool:
+        names = [ x for x in set( point ) | set( previous or {} ) if x != 'run_id' and x.startswith( 'edge_' ) == edge ]
+        return previous is None or any( point.get(x) != previous.get(x) for x in names )
+    
+    if changed( edge = False ):
+        reshape_bottleneck_link( network = network , bw_bottleneck = point['bw'] , **generate_link_config( point ) )
+    if any( x.startswith( 'edge_' ) for x in point ) and changed( edge = True ):
+        reshape_edge_links( network = network , bw_other = BW_OTHER , **generate_link_config( point , prefix = 'edge_' ) )
+
+
+def run_bandwidth_sweep( constraints : list ) -> dict:
+    """
+    Function performs the topology and iperf tests for every provided bottleneck
+    bandwidth on a single network instance. The bottleneck link is reshaped in place
+    between sweep points... a full <code>mn -c</code> cleanup and rebuild only occurs
+    when a sweep point fails. Grid points (see experiment_design.py) also reshape the
+    delay, jitter, loss and queue size of the bottleneck and host links, and carry the
+    run their results are recorded under.<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>list</code> bottleneck bandwidths (Mbps), or grid points (see apply_sweep_point), to test<br>
+    
+    Returns:<br>
+    - <code>dict</code> timing report of the sweep (seconds)<br>
+        - setup, teardown, cleanup, reshape (per bandwidth or grid point run), fallbacks, estimated_legacy, actual, saved
+    """
+    points = [ x if isinstance( x , dict ) else { 'bw' : x } for x in constraints ]
+    
+    report = {
+        'setup'             : 0.0,
+        'teardown'          : 0.0,
+        'cleanup'           : 0.0,
+        'reshape'           : {},
+        'fallbacks'         : 0,
+        'estimated_legacy'  : 0.0,
+        'actual'            : 0.0,
+        'saved'             : 0.0
+    }
+    
+    # Measured once... the legacy mode pays for this at every sweep point.
+    # (the sweep network is shared by all points... its spans carry no bottleneck bandwidth)
+    started = perf_counter()
+    with TRACE.span( 'mn -c' , 'cleanup' , bw_bottleneck = None ):
+        subprocess.run( ["mn", "-c"] , stdout=subprocess.DEVNULL , stderr=subprocess.DEVNULL )
+    report['cleanup'] = perf_counter() - started
+    
+    apply_sweep_point( points[0] )
+    started = perf_counter()
+    with TRACE.span( 'build_network' , 'setup' , bw_bottleneck = None ):
+        network = build_network()
+    report['setup'] = perf_counter() - started
+    success_logger.log("successfully started sweep network in run_bandwidth_sweep...")
+    
+    overhead = report['cleanup'] + report['setup']
+    previous = None
+    for point in points:
+        apply_sweep_point( point )
+        configuration_logger.log("Preparing sweep point...")
+        
+        try:
+            if network is None:
+                # lost with the rebuild of an earlier point... the fallback builds it anew
+                raise RuntimeError("no sweep network")
+            started = perf_counter()
+            with TRACE.span( 'reshape link' , 'setup' ):
+                reconfigure_links( network = network , point = point , previous = previous )
+            previous = point
+            report['reshape'][point.get( 'run_id' , point['bw'] )] = perf_counter() - started
+            overhead += perf_counter() - started
+            run_topology_tests( network = network )
+            result = run_perf_tests( network = network )
+            if result is None or None in result['tcp'].values() or None in result['udp'].values():
+                raise RuntimeError("incomplete sweep point")
+            success_logger.log("successfully completed sweep point in run_bandwidth_sweep...")
+        except Exception:
+            # Fallback... full cleanup and rebuild at the failing point, then retry once.
+            err_logger.log("[ ERROR ] sweep point failed, falling back to mn -c and rebuild in run_bandwidth_sweep")
+            report['fallbacks'] += 1
+            started = perf_counter()
+            try:
+                with TRACE.span( 'mn -c' , 'cleanup' ):
+                    cleanup_network( network )
+                network = None
+                with TRACE.span( 'build_network' , 'setup' ):
+                    network = build_network()
+                    reconfigure_links( network = network , point = point )
+                previous = point
+                overhead += perf_counter() - started
+                run_topology_tests( network = network )
+                run_perf_tests( network = network )
+            except Exception:
+                # the sweep goes on... a network left half built is torn down at the next point's fallback
+                err_logger.log("[ ERROR ] sweep point failed after rebuild in run_bandwidth_sweep, moving on to the next point")
+                previous = None
+    
+    started = perf_counter()
+    if network is not None:
+        try:
+            with TRACE.span( 'network.stop()' , 'teardown' , bw_bottleneck = None ):
+                stop_host_agents()
+                network.stop()
+        except Exception:
+            err_logger.log("[ ERROR ] failure to stop sweep network in run_bandwidth_sweep")
+    report['teardown'] = perf_counter() - started
+    overhead += report['teardown']
+    
+    # Legacy mode: mn -c, then two build/start/stop cycles (topology + perf tests) per point.
+    per_point = report['cleanup'] + 2 * ( report['setup'] + report['teardown'] )
+    report['estimated_legacy']  = per_point * len(points)
+    report['actual']            = overhead
+    report['saved']             = report['estimated_legacy'] - report['actual']
+    
+    configuration_logger.log("Sweep setup overhead (s) : {:.3f} actual vs {:.3f} estimated legacy... saved {:.3f} over {} points ({} fallbacks).".format(
+        report['actual'],
+        report['estimated_legacy'],
+        report['saved'],
+        len(points),
+        report['fallbacks']
+    ))
+    return report
+
+
+######################################################################################
+# QUEUE DISCIPLINE COMPARISON MODE
+# The same saturating TCP workload runs under every queue discipline (see queue_discipline.py)
+# of the bottleneck, on a single network, while pings sample the round trip time under load.
+
+def apply_queue_discipline( network , discipline : str ) -> None:
+    """
+    Procedure replaces the queue of both interfaces of the s1-s2 link with the provided discipline.
+    The link must have just been (re)shaped... reshaping replaces the discipline again.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>      : <code>Mininet()</code> instance<br>
+    - <strong>discipline</strong>   : <code>string</code> one of <code>QUEUE_DISCIPLINES</code><br>
+    
+    Returns:<br>
+    - None
+    """
+    link    = network.linksBetween( network.get(prefixed('s1')) , network.get(prefixed('s2')) )[0]
+    netem   = any( x is not None for x in generate_link_config( LINK_PARAMS ).values() )
+    for intf in ( link.intf1 , link.intf2 ):
+        output = intf.node.cmd( " ".join( generate_qdisc_cmd( intf.name , discipline , BW_BOTTLENECK , netem = netem , limit = QUEUE_LIMIT ) ) )
+        # tc is silent on success
+        if output.strip():
+            raise RuntimeError("failure to apply {} on {}: {}".format(discipline, intf.name, output.strip()))
+
+
+def run_latency_under_load( network ) -> dict:
+    """
+    Function saturates the bottleneck with TCP (h1 to h3, and h2 to h4 at the same time when
+    agents are running) while h2 pings h4 every <code>RTT_PROBE_INTERVAL</code> seconds across it.
+    The flows are recorded in the result store under <code>RUN_ID</code>.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'run_id' , 'flows' , 'throughput_bps' , 'retransmits' , 'ping_loss_percent' , ...summarize_rtts }
+    """
+    flow_names  = { 1 : ('h1', 'h3') , 2 : ('h2', 'h4') }
+    prober      = network.get(prefixed('h2')).popen( 
+                    ['ping', '-i', str(RTT_PROBE_INTERVAL), '-w', str(TIME + 1), parse_NodeIP(network.get(prefixed('h4')).IP)] 
+                )
+    if USE_AGENTS:
+        flows   = run_concurrent_flows( 
+                        network = network , 
+                        flows   = [ (prefixed(x), prefixed(y), 'tcp') for x, y in flow_names.values() ] 
+                    )
+        results = { index + 1 : flow['result'] for index, flow in enumerate(flows) }
+    else:
+        results = { 1 : run_iperf_client_server_test( 
+                                client_name     =   prefixed('h1') , 
+                                server_name     =   prefixed('h3') , 
+                                network         =   network , 
+                                service_port    =   5000, 
+                                tcp_udp         =   'tcp' 
+                            ) }
+    output = prober.communicate()[0].decode()
+    if None in results.values():
+        raise RuntimeError("incomplete workload")
+    
+    with TRACE.span( 'record results' , 'record' ):
+        store_flow_results( protocol = 'tcp' , test_results = results , flow_names = flow_names )
+    return {
+        'run_id'            : RUN_ID,
+        'flows'             : len(results),
+        'throughput_bps'    : sum( x['client']['end']['sum_received']['bits_per_second'] for x in results.values() ),
+        'retransmits'       : sum( x['client']['end']['sum_sent'].get('retransmits', 0) for x in results.values() ),
+        'ping_loss_percent' : parse_ping_output( output )['loss_percent'],
+        **summarize_rtts( parse_ping_rtts( output ) )
+    }
+
+
+def run_qdisc_comparison( constraints : list , disciplines : list ) -> dict:
+    """
+    Function runs the latency under load workload (see run_latency_under_load) under every
+    discipline, for every bottleneck bandwidth, on a single network. The flows of a discipline are
+    recorded under the run '<RUN_ID>-<discipline>'. A failing point is recorded as None and the
+    network rebuilt (see rebuild_network). The comparison of every bandwidth is written to
+    'output-qdisc-<bw_bottleneck>-<bw_other>.json'.<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>list</code> bottleneck bandwidths (Mbps) to test<br>
+    - <strong>disciplines</strong>  : <code>list</code> queue disciplines (see <code>QUEUE_DISCIPLINES</code>) to compare<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to discipline to its result (see run_latency_under_load)
+    """
+    run_id = RUN_ID
+    
+    with TRACE.span( 'mn -c' , 'cleanup' , bw_bottleneck = None ):
+        subprocess.run( ["mn", "-c"] , stdout=subprocess.DEVNULL , stderr=subprocess.DEVNULL )
+    apply_sweep_point({ 'bw' : constraints[0] })
+    with TRACE.span( 'build_network' , 'setup' , bw_bottleneck = None ):
+        network = build_network()
+    
+    comparison = {}
+    for bw in constraints:
+        comparison[bw] = {}
+        for discipline in disciplines:
+            apply_sweep_point({ 'bw' : bw , 'run_id' : "{}-{}".format( run_id , discipline ) })
+            configuration_logger.log("Preparing {} comparison point...".format(discipline))
+            try:
+                if network is None:
+                    # lost with the rebuild of an earlier point... rebuilt below
+                    raise RuntimeError("no comparison network")
+                with TRACE.span( 'reshape link' , 'setup' , qdisc = discipline ):
+                    # shaped from scratch... no discipline carries over from the previous point
+                    reconfigure_links( network = network , point = { 'bw' : bw } )
+                    apply_queue_discipline( network = network , discipline = discipline )
+                comparison[bw][discipline] = run_latency_under_load( network = network )
+                success_logger.log("successfully completed {} comparison point in run_qdisc_comparison...".format(discipline))
+            except Exception:
+                err_logger.log("[ ERROR ] {} comparison point failed, falling back to mn -c and rebuild in run_qdisc_comparison".format(discipline))
+                comparison[bw][discipline] = None
+                network = rebuild_network( network )
+        
+        with open("{}output-qdisc-{}-{}.json".format( FINAL_RESULT_DIRECTORY, bw, BW_OTHER ), 'w') as f:
+            json.dump(comparison[bw], f)
+    
+    if network is not None:
+        try:
+            with TRACE.span( 'network.stop()' , 'teardown' , bw_bottleneck = None ):
+                stop_host_agents()
+                network.stop()
+        except Exception:
+            err_logger.log("[ ERROR ] failure to stop comparison network in run_qdisc_comparison")
+    return comparison
+
+
+######################################################################################
+# CONGESTION CONTROL MATRIX MODE
+# Every bottleneck bandwidth is tested with the TCP flows of every algorithm, on a single network,
+# then (with agents) every pair of algorithms shares the bottleneck at once to measure fairness.
+
+def generate_mixed_run_id( run_id : str , algorithms : tuple ) -> str:
+    # e.g. <run id>-cubic-vs-bbr
+    return "{}-{}".format( run_id , "-vs-".join( algorithms ) )
+
+
+def run_congestion_matrix( constraints : list , algorithms : list ) -> None:
+    """
+    Procedure runs the perf tests (see run_perf_tests) of every bandwidth with every TCP congestion
+    control algorithm, recorded under the run '<RUN_ID>-<algorithm>'. With agents, every pair of
+    algorithms then runs two concurrent TCP flows (h1 to h3 and h2 to h4) over the bottleneck,
+    recorded under '<RUN_ID>-<algorithm>-vs-<algorithm>' (see generate_mixed_run_id). A failing
+    point is skipped and the network rebuilt (see rebuild_network).<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>list</code> bottleneck bandwidths (Mbps) to test<br>
+    - <strong>algorithms</strong>   : <code>list</code> congestion control algorithms (see /proc/sys/net/ipv4/tcp_available_congestion_control)<br>
+    
+    Returns:<br>
+    - None
+    """
+    global TCP_CONGESTION
+    
+    run_id  = RUN_ID
+    pairs   = list( itertools.combinations( algorithms , 2 ) ) if USE_AGENTS else []
+    if not USE_AGENTS and len(algorithms) > 1:
+        configuration_logger.log("mixed algorithm runs require agents... skipped in run_congestion_matrix")
+    
+    with TRACE.span( 'mn -c' , 'cleanup' , bw_bottleneck = None ):
+        subprocess.run( ["mn", "-c"] , stdout=subprocess.DEVNULL , stderr=subprocess.DEVNULL )
+    apply_sweep_point({ 'bw' : constraints[0] })
+    with TRACE.span( 'build_network' , 'setup' , bw_bottleneck = None ):
+        network = build_network()
+    
+    for bw in constraints:
+        # single algorithm points, then the mixed pairs
+        for algorithms_of_point in [ ( x , ) for x in algorithms ] + pairs:
+            apply_sweep_point({ 'bw' : bw , 'run_id' : generate_mixed_run_id( run_id , algorithms_of_point ) })
+            TCP_CONGESTION = algorithms_of_point[0] if len(algorithms_of_point) == 1 else None
+            configuration_logger.log("Preparing {} congestion control point...".format(" vs ".join(algorithms_of_point)))
+            try:
+                if network is None:
+                    # lost with the rebuild of an earlier point... rebuilt below
+                    raise RuntimeError("no matrix network")
+                with TRACE.span( 'reshape link' , 'setup' , congestion = algorithms_of_point ):
+                    reconfigure_links( network = network , point = { 'bw' : bw } )
+                if len(algorithms_of_point) == 1:
+                    result = run_perf_tests( network = network )
+                    if result is None or None in result['tcp'].values():
+                        raise RuntimeError("incomplete congestion control point")
+                else:
+                    flows = run_concurrent_flows( 
+                                    network = network , 
+                                    flows   = [ (prefixed('h1'), prefixed('h3'), 'tcp', algorithms_of_point[0]) , 
+                                                (prefixed('h2'), prefixed('h4'), 'tcp', algorithms_of_point[1]) ] 
+                                )
+                    if None in [ flow['result'] for flow in flows ]:
+                        raise RuntimeError("incomplete mixed flows")
+                    with TRACE.span( 'record results' , 'record' ):
+                        store_flow_results( 
+                                        protocol        =   'tcp',
+                                        test_results    =   { index + 1 : flow['result'] for index, flow in enumerate(flows) },
+                                        flow_names      =   { 1 : ('h1', 'h3') , 2 : ('h2', 'h4') }
+                                    )
+                success_logger.log("successfully completed congestion control point in run_congestion_matrix...")
+            except Exception:
+                err_logger.log("[ ERROR ] congestion control point failed, falling back to mn -c and rebuild in run_congestion_matrix")
+                network = rebuild_network( network )
+    TCP_CONGESTION = None
+    
+    if network is not None:
+        try:
+            with TRACE.span( 'network.stop()' , 'teardown' , bw_bottleneck = None ):
+                stop_host_agents()
+                network.stop()
+        except Exception:
+            err_logger.log("[ ERROR ] failure to stop matrix network in run_congestion_matrix")
+
+
+######################################################################################
+# UDP SATURATION SEARCH MODE
+# The target bitrate of a UDP flow across the bottleneck is ramped (see saturation_search.py)
+# to find the highest offered load the bottleneck carries within a loss threshold.
+
+def measure_udp_step( network , target : int , step : int ) -> dict:
+    """
+    Function runs one UDP test (h2 to h4) at the provided target bitrate and records it in the
+    result store under <code>RUN_ID</code>, as test case <code>step</code>.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>  : <code>Mininet()</code> instance<br>
+    - <strong>target</strong>   : <code>int</code> target bitrate (bits/s)<br>
+    - <strong>step</strong>     : <code>int</code> index of the step<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'goodput_bps' , 'lost_percent' , 'jitter_ms' } as seen by the receiver, None upon failure
+    """
+    global UDP_BANDWIDTH
+    
+    UDP_BANDWIDTH = target
+    result = run_iperf_client_server_test( 
+                            client_name     =   prefixed('h2') , 
+                            server_name     =   prefixed('h4') , 
+                            network         =   network , 
+                            service_port    =   5000, 
+                            tcp_udp         =   'udp' 
+                        )
+    if result is None:
+        return None
+    with TRACE.span( 'record results' , 'record' ):
+        store_flow_results( protocol = 'udp' , test_results = { step : result } , flow_names = { step : ('h2', 'h4') } )
+    received = result['server']['end']['sum']
+    return {
+        'goodput_bps'   : received['bits_per_second'],
+        'lost_percent'  : received['lost_percent'],
+        'jitter_ms'     : received['jitter_ms']
+    }
+
+
+def run_udp_saturation_search( constraints : list , strategy : str , loss_threshold : float ) -> dict:
+    """
+    Function searches the UDP capacity (see saturation_search.search_saturation) of every bottleneck
+    bandwidth on a single network. Every step is recorded under the run '<RUN_ID>-udp-search'; the
+    search of every bandwidth is written to 'output-udp-search-<bw_bottleneck>-<bw_other>.json'. A
+    failing search is recorded (and written) as None and the network rebuilt (see rebuild_network).<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>      : <code>list</code> bottleneck bandwidths (Mbps) to test<br>
+    - <strong>strategy</strong>         : <code>string</code> 'step' or 'binary'<br>
+    - <strong>loss_threshold</strong>   : <code>float</code> highest acceptable loss (percent)<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to its search, None for a failed search
+    """
+    global UDP_BANDWIDTH
+    
+    with TRACE.span( 'mn -c' , 'cleanup' , bw_bottleneck = None ):
+        subprocess.run( ["mn", "-c"] , stdout=subprocess.DEVNULL , stderr=subprocess.DEVNULL )
+    apply_sweep_point({ 'bw' : constraints[0] , 'run_id' : "{}-udp-search".format( RUN_ID ) })
+    with TRACE.span( 'build_network' , 'setup' , bw_bottleneck = None ):
+        network = build_network()
+    
+    searches = {}
+    for bw in constraints:
+        apply_sweep_point({ 'bw' : bw })
+        configuration_logger.log("Preparing UDP saturation search...")
+        try:
+            if network is None:
+                # lost with the rebuild of an earlier point... rebuilt below
+                raise RuntimeError("no search network")
+            with TRACE.span( 'reshape link' , 'setup' ):
+                reconfigure_links( network = network , point = { 'bw' : bw } )
+            steps = itertools.count( 1 )
+            searches[bw] = search_saturation( 
+                                    measure         = lambda target: measure_udp_step( network , target , next( steps ) ),
+                                    bw_bps          = bw * 1e6,
+                                    strategy        = strategy,
+                                    loss_threshold  = loss_threshold
+                                )
+            success_logger.log("UDP capacity {} bits/s in run_udp_saturation_search...".format(searches[bw]['capacity_bps']))
+        except Exception:
+            err_logger.log("[ ERROR ] UDP saturation search failed, falling back to mn -c and rebuild in run_udp_saturation_search")
+            searches[bw] = None
+            network = rebuild_network( network )
+        with open("{}output-udp-search-{}-{}.json".format( FINAL_RESULT_DIRECTORY, bw, BW_OTHER ), 'w') as f:
+            json.dump(searches[bw], f)
+    UDP_BANDWIDTH = None
+    
+    if network is not None:
+        try:
+            with TRACE.span( 'network.stop()' , 'teardown' , bw_bottleneck = None ):
+                stop_host_agents()
+                network.stop()
+        except Exception:
+            err_logger.log("[ ERROR ] failure to stop search network in run_udp_saturation_search")
+    return searches
+
+
+######################################################################################
+# CLIENT TUNING MODE
+# The socket buffer and block size of the iperf clients are searched (see client_tuning.py) for every
+# bottleneck profile (bandwidth, delay) on a single network, and the best settings are kept in the
+# result store... where sweeps run with -tuned look them up for every point.
+
+def find_client_settings( tcp_udp : str ) -> dict:
+    """
+    Function produces the client settings of the current point: those of a tuning trial
+    (<code>CLIENT_SETTINGS</code>), else with <code>USE_TUNED_SETTINGS</code> the tuned settings of the
+    point's bottleneck profile (bandwidth, delay) from the result store, else iperf's (empty).<br>
+    
+    Parameters:<br>
+    - <strong>tcp_udp</strong>      : <code>string</code> specify tcp or udp iperf test<br>
+    
+    Returns:<br>
+    - <code>dict</code> { 'blksize' , 'socket_buffer' }... only the settings which are set
+    """
+    if tcp_udp in CLIENT_SETTINGS:
+        settings = CLIENT_SETTINGS[tcp_udp]
+    elif USE_TUNED_SETTINGS:
+        profile = ( BW_BOTTLENECK , LINK_PARAMS.get( 'delay' , 0 ) , tcp_udp )
+        if profile not in TUNED_SETTINGS:
+            store = ResultStore( RESULT_DATABASE )
+            try:
+                TUNED_SETTINGS[profile] = store.find_tuning( *profile ) or {}
+            finally:
+                store.close()
+        settings = TUNED_SETTINGS[profile]
+    else:
+        settings = {}
+    return { x : settings[x] for x in ( 'blksize' , 'socket_buffer' ) if settings.get(x) is not None }
+
+
+def measure_client_settings( network , tcp_udp : str , settings : dict , trial : int ) -> float:
+    """
+    Function runs one test with the provided client settings (TCP h1 to h3, UDP h2 to h4 offered at the
+    bottleneck bandwidth) and records it in the result store under <code>RUN_ID</code>, as test case
+    <code>trial</code>.<br>
+    
+    Parameters:<br>
+    - <strong>network</strong>      : <code>Mininet()</code> instance<br>
+    - <strong>tcp_udp</strong>      : <code>string</code> specify tcp or udp iperf test<br>
+    - <strong>settings</strong>     : <code>dict</code> { 'blksize' , 'socket_buffer' }<br>
+    - <strong>trial</strong>        : <code>int</code> index of the trial<br>
+    
+    Returns:<br>
+    - <code>float</code> goodput (bits/s) as seen by the receiver, None upon failure
+    """
+    global UDP_BANDWIDTH
+    
+    CLIENT_SETTINGS[tcp_udp] = settings
+    UDP_BANDWIDTH = int( BW_BOTTLENECK * 1e6 )
+    pair = ( 'h1' , 'h3' ) if tcp_udp == 'tcp' else ( 'h2' , 'h4' )
     try:
-        bottleneck_testing_json_dump( 
-                                test_type       =   'tcp', 
-                                test_results    =   iperf_test_results_h1_h3
-                    )   
-        bottleneck_testing_json_dump( 
-                                test_type       =   'udp', 
-                                test_results    =   iperf_test_results_h2_h4
-                    )   
-    except:        
+        result = run_iperf_client_server_test( 
+                                client_name     =   prefixed(pair[0]) , 
+                                server_name     =   prefixed(pair[1]) , 
+                                network         =   network , 
+                                service_port    =   5000, 
+                                tcp_udp         =   tcp_udp 
+                            )
+    finally:
+        del CLIENT_SETTINGS[tcp_udp]
+    if result is None:
         return None
+    with TRACE.span( 'record results' , 'record' ):
+        store_flow_results( protocol = tcp_udp , test_results = { trial : result } , flow_names = { trial : pair } )
+    if tcp_udp == 'tcp':
+        return result['client']['end']['sum_received']['bits_per_second']
+    return result['server']['end']['sum']['bits_per_second']
+
+
+def run_client_tuning( constraints : list , delays : list ) -> dict:
+    """
+    Function searches the best client settings (see client_tuning.search_client_settings) of TCP and UDP
+    for every bottleneck profile, bandwidth by bottleneck delay, on a single network. Every trial is
+    recorded under the run '<RUN_ID>-tuning' and the best settings of every profile in the result store
+    (see ResultStore.record_tuning). The searches of every bandwidth are written to
+    'output-tuning-<bw_bottleneck>-<bw_other>.json', keyed by delay. A failing profile is recorded (and
+    written) as None and the network rebuilt (see rebuild_network).<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>  : <code>list</code> bottleneck bandwidths (Mbps) to tune<br>
+    - <strong>delays</strong>       : <code>list</code> bottleneck delays (ms) to tune<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to delay to protocol to its search... None for a failed profile
+    """
+    global UDP_BANDWIDTH
+    
+    with TRACE.span( 'mn -c' , 'cleanup' , bw_bottleneck = None ):
+        subprocess.run( ["mn", "-c"] , stdout=subprocess.DEVNULL , stderr=subprocess.DEVNULL )
+    apply_sweep_point({ 'bw' : constraints[0] , 'run_id' : "{}-tuning".format( RUN_ID ) })
+    with TRACE.span( 'build_network' , 'setup' , bw_bottleneck = None ):
+        network = build_network()
+    
+    trials      = itertools.count( 1 )
+    searches    = {}
+    for bw in constraints:
+        searches[bw] = {}
+        for delay in delays:
+            point = { 'bw' : bw , 'delay' : delay } if delay else { 'bw' : bw }
+            apply_sweep_point( point )
+            configuration_logger.log("Preparing client tuning profile...")
+            try:
+                if network is None:
+                    # lost with the rebuild of an earlier profile... rebuilt below
+                    raise RuntimeError("no tuning network")
+                with TRACE.span( 'reshape link' , 'setup' ):
+                    reconfigure_links( network = network , point = point )
+                searches[bw][delay] = {}
+                for tcp_udp in ( 'tcp' , 'udp' ):
+                    # netem delays both directions of the link
+                    search = search_client_settings( 
+                                    measure     = lambda settings: measure_client_settings( network , tcp_udp , settings , next( trials ) ),
+                                    protocol    = tcp_udp,
+                                    bw          = bw,
+                                    rtt_ms      = 2 * delay
+                                )
+                    searches[bw][delay][tcp_udp] = search
+                    if search['best'] is None:
+                        err_logger.log("[ ERROR ] every {} tuning trial failed in run_client_tuning".format(tcp_udp))
+                        continue
+                    store = ResultStore( RESULT_DATABASE )
+                    try:
+                        store.record_tuning( run_id = RUN_ID , bw_bottleneck = bw , delay = delay , protocol = tcp_udp , **search['best'] )
+                    finally:
+                        store.close()
+                    success_logger.log("{} tuned to {} in run_client_tuning...".format(tcp_udp, search['best']))
+            except Exception:
+                err_logger.log("[ ERROR ] client tuning profile failed, falling back to mn -c and rebuild in run_client_tuning")
+                searches[bw][delay] = None
+                network = rebuild_network( network )
+        with open("{}output-tuning-{}-{}.json".format( FINAL_RESULT_DIRECTORY, bw, BW_OTHER ), 'w') as f:
+            json.dump(searches[bw], f)
+    UDP_BANDWIDTH = None
+    
+    if network is not None:
+        try:
+            with TRACE.span( 'network.stop()' , 'teardown' , bw_bottleneck = None ):
+                stop_host_agents()
+                network.stop()
+        except Exception:
+            err_logger.log("[ ERROR ] failure to stop tuning network in run_client_tuning")
+    return searches
+
+
 if __name__ == "__main__" :
 
     # parsing command-line
@@ -619,17 +2145,126 @@ if __name__ == "__main__" :
     parser.add_argument("-bw_bottleneck",  help="The bandwidth (Mbps) constraint on a bottleneck link",type=int, default=10)
     parser.add_argument("-bw_other",       help="The bandwidth constraint on non-bottleneck  links",type=int, default=100)
     parser.add_argument("-time",           help="Duration of the traffic simulation (s)", type=int, default=10)
+    parser.add_argument("-sweep",          help="Bottleneck bandwidths (Mbps) to test on a single reshaped network. Separate by spaces (ex. '# # #')", type=str, default=None)
+    parser.add_argument("-grid_file",      help="JSON list of grid points (bw, run_id, delay, jitter, loss, max_queue_size and their edge_ counterparts) to sweep in this order on a single reconfigured network", type=str, default=None)
+    parser.add_argument("-qdiscs",         help="Compare these bottleneck queue disciplines ({}) under a saturating TCP workload, for -bw_bottleneck or every -sweep bandwidth. Separate by spaces".format(", ".join(QUEUE_DISCIPLINES)), type=str, default=None)
+    parser.add_argument("-qdisc_limit",    help="Queue limit (packets) of the compared disciplines", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("-rtt_interval",   help="Interval (s) of the pings sampling the RTT under load", type=float, default=0.05)
+    parser.add_argument("-congestion",     help="Test the TCP flows with each of these congestion control algorithms (ex. 'cubic reno bbr'), for -bw_bottleneck or every -sweep bandwidth, and every pair at once (requires -agents)", type=str, default=None)
+    parser.add_argument("-udp_bandwidth",  help="Target bitrate (bits/s) of the UDP flows, iperf3's default (1 Mbit/s) by default", type=int, default=None)
+    parser.add_argument("-streams",        help="Parallel streams of every iperf flow", type=int, default=1)
+    parser.add_argument("-zerocopy",       help="Send the TCP flows' data with iperf's zero-copy (sendfile) method", action="store_true")
+    parser.add_argument("-tune",           help="Search the best client block size and socket buffer of -bw_bottleneck or every -sweep bandwidth, for every -tune_delays delay, and keep them in the result store", action="store_true")
+    parser.add_argument("-tune_delays",    help="Tuning mode: bottleneck delays (ms) to tune. Separate by spaces", type=str, default="0")
+    parser.add_argument("-tuned",          help="Run the clients with the tuned settings of every point's bottleneck profile (bandwidth, delay), where tuned", action="store_true")
+    parser.add_argument("-udp_search",     help="Search the UDP capacity of -bw_bottleneck or every -sweep bandwidth by ramping the target bitrate: 'step' or 'binary'", choices=STRATEGIES, default=None)
+    parser.add_argument("-udp_loss",       help="UDP saturation search: highest acceptable loss (%%)", type=float, default=1.0)
+    parser.add_argument("-agents",         help="Run iperf tests through resident per-host agents instead of spawning server.py/client.py", action="store_true")
+    parser.add_argument("-concurrent",     help="Run the four iperf flows at the same time so they contend on the bottleneck (implies -agents)", action="store_true")
+    parser.add_argument("-parallel_probes", help="Send all ifconfig/ping probes at once and record structured ping summaries", action="store_true")
+    parser.add_argument("-ping_count",     help="Pings sent per host pair", type=int, default=3)
+    parser.add_argument("-ping_interval",  help="Interval between pings (s)", type=float, default=1.0)
+    parser.add_argument("-senders",        help="Generate a tiered topology with this many senders and run its pairing plan concurrently", type=int, default=None)
+    parser.add_argument("-receivers",      help="Receivers of the generated topology", type=int, default=2)
+    parser.add_argument("-tier_bw",        help="Bandwidth (Mbps) of each inter-tier link of the generated topology. Separate by spaces (ex. '# # #')", type=str, default=None)
+    parser.add_argument("-prefix",         help="Node name prefix isolating this network instance (parallel sweep workers)", type=str, default='')
+    parser.add_argument("-worker_index",   help="Index (1-255) selecting this instance's subnet, dpid block and controller port (parallel sweep workers)", type=int, default=0)
+    parser.add_argument("-run_id",         help="Run id the results are recorded under in the result store (generated by default)", type=str, default=None)
+    parser.add_argument("-database",       help="Result store (SQLite) path", type=str, default=RESULT_DATABASE)
+    parser.add_argument("-converge",       help="Stop iperf tests once the throughput 95%% confidence interval is within this fraction of the mean (requires the iperf3 3.17+ binary)", type=float, default=None)
+    parser.add_argument("-min_time",       help="Convergence mode: minimum test duration (s)", type=int, default=2)
+    parser.add_argument("-max_time",       help="Convergence mode: maximum test duration (s), -time by default", type=int, default=None)
+    parser.add_argument("-omit",           help="Convergence mode: warm-up (s) excluded from the convergence test", type=int, default=1)
+    parser.add_argument("-no_persist",     help="Do not write raw iperf results to the iperf result directory", action="store_true")
+    parser.add_argument("-telemetry",      help="Sample bottleneck qdisc stats, switch port counters and iperf/OVS CPU use while iperf clients run", action="store_true")
+    parser.add_argument("-telemetry_interval", help="Telemetry sampling interval (s)", type=float, default=0.25)
+    parser.add_argument("-trace",          help="Write timing spans of the orchestration phases to this Chrome trace-event file", type=str, default=None)
+    parser.add_argument("-profile",        help="Sample the stack of this process and write collapsed stacks to this file", type=str, default=None)
     args = parser.parse_args()
     assert(args.bw_bottleneck < args.bw_other)
     TIME            = args.time
+    CONVERGE_TOLERANCE = args.converge
+    MIN_TIME        = args.min_time
+    MAX_TIME        = args.max_time if args.max_time else args.time
+    OMIT_TIME       = args.omit
     BW_BOTTLENECK   = args.bw_bottleneck
     BW_OTHER        = args.bw_other
+    USE_AGENTS      = args.agents or args.concurrent
+    CONCURRENT_FLOWS = args.concurrent
+    PARALLEL_PROBES = args.parallel_probes
+    NODE_PREFIX     = args.prefix
+    RUN_ID          = args.run_id if args.run_id else RUN_ID
+    RESULT_DATABASE = args.database
+    WORKER_INDEX    = args.worker_index
+    PING_COUNT      = args.ping_count
+    PING_INTERVAL   = args.ping_interval
+    PERSIST_IPERF_RESULTS = not args.no_persist
+    TELEMETRY       = args.telemetry
+    TELEMETRY_INTERVAL = args.telemetry_interval
+    QUEUE_LIMIT     = args.qdisc_limit
+    UDP_BANDWIDTH   = args.udp_bandwidth
+    STREAMS         = args.streams
+    ZEROCOPY        = args.zerocopy
+    USE_TUNED_SETTINGS = args.tuned
+    RTT_PROBE_INTERVAL = args.rtt_interval
+    if args.trace:
+        TRACE.enable()
+    if args.profile:
+        SamplingProfiler( args.profile ).start()
     
-    configuration_logger.log(generate_instance_message("Preparing run_topology_tests..."))
     configuration_logger.log("Simulation (s) run duration is : {}.".format(TIME))
-    run_topology_tests()
-    configuration_logger.log(generate_instance_message("Preparing run_perf_tests..."))
-    run_perf_tests()
- 
-    
-    
+    if CONVERGE_TOLERANCE is not None:
+        configuration_logger.log("iperf tests stop at a {} relative confidence interval ({}-{}s, {}s omitted).".format(CONVERGE_TOLERANCE, MIN_TIME, MAX_TIME, OMIT_TIME))
+    try:
+        # the whole process... launch overhead is its launcher's span time outside of it (see spans.py)
+        with TRACE.span( 'network_bottleneck.py' , 'process' , **( { 'bw_bottleneck' : None } if args.sweep is not None or args.grid_file is not None or args.qdiscs is not None or args.congestion is not None or args.udp_search is not None or args.tune else {} ) ):
+            if args.tune:
+                constraints = [ int(x) for x in args.sweep.split() ] if args.sweep else [ BW_BOTTLENECK ]
+                assert(max(constraints) < BW_OTHER)
+                run_client_tuning( constraints = constraints , delays = [ float(x) for x in args.tune_delays.split() ] )
+            elif args.udp_search is not None:
+                constraints = [ int(x) for x in args.sweep.split() ] if args.sweep else [ BW_BOTTLENECK ]
+                assert(max(constraints) < BW_OTHER)
+                run_udp_saturation_search( constraints = constraints , strategy = args.udp_search , loss_threshold = args.udp_loss )
+            elif args.congestion is not None:
+                constraints = [ int(x) for x in args.sweep.split() ] if args.sweep else [ BW_BOTTLENECK ]
+                assert(max(constraints) < BW_OTHER)
+                run_congestion_matrix( constraints = constraints , algorithms = args.congestion.split() )
+            elif args.qdiscs is not None:
+                constraints = [ int(x) for x in args.sweep.split() ] if args.sweep else [ BW_BOTTLENECK ]
+                assert(max(constraints) < BW_OTHER)
+                assert(all( x in QUEUE_DISCIPLINES for x in args.qdiscs.split() ))
+                run_qdisc_comparison( constraints = constraints , disciplines = args.qdiscs.split() )
+            elif args.senders is not None:
+                tier_bw = [ int(x) for x in args.tier_bw.split() ] if args.tier_bw else [ BW_BOTTLENECK ]
+                run_plan_tests( senders = args.senders , receivers = args.receivers , tier_bw = tier_bw )
+            elif args.sweep is not None or args.grid_file is not None:
+                if args.grid_file is not None:
+                    with open( args.grid_file , 'r' ) as f:
+                        constraints = json.load( f )
+                    assert(all( x['bw'] < x.get( 'edge_bw' , BW_OTHER ) for x in constraints ))
+                else:
+                    constraints = [ int(x) for x in args.sweep.split() ]
+                    assert(max(constraints) < BW_OTHER)
+                report = run_bandwidth_sweep( constraints = constraints )
+                print("sweep setup overhead : {:.3f}s (legacy estimate {:.3f}s)... saved {:.3f}s, {} fallbacks".format(
+                    report['actual'],
+                    report['estimated_legacy'],
+                    report['saved'],
+                    report['fallbacks']
+                ))
+            else:
+                configuration_logger.log("Preparing run_topology_tests...")
+                run_topology_tests()
+                configuration_logger.log("Preparing run_perf_tests...")
+                run_perf_tests()
+    except KeyboardInterrupt:
+        # the running test was cancelled (see run_iperf_client_server_test)... the network goes with it
+        err_logger.log("interrupted by the user")
+        cleanup_network( None )
+        raise SystemExit(130)
+    finally:
+        if args.trace:
+            TRACE.write( args.trace )
+        # the buffered records reach the log before the interpreter exits
+        log_writer.close()
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# Parallel sweep executor.
+# Every sweep point runs as an independent network_bottleneck.py worker with its own node
+# name prefix, subnet, dpid block, controller port and output directory, pinned to its own
+# slice of CPUs. The number of simultaneous workers is capped by that CPU budget.
+import argparse
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from configure import init_file_system, SCRIPT_DIRECTORY, WORKER_DIRECTORY, FINAL_RESULT_DIRECTORY
+from spans import SpanRecorder
+
+# timing spans of the worker launches, recorded when -trace is given (see spans.py)
+TRACE = SpanRecorder()
+
+
+def allocate_cpu_sets( cpus_per_worker : int , reserved_cpus : int = 1 ) -> list:
+    """
+    Function splits the CPUs available to this process into disjoint worker slices. The
+    first <code>reserved_cpus</code> are left to the executor and the rest of the system.<br>
+    
+    Parameters:<br>
+    - <strong>cpus_per_worker</strong>  : <code>int</code> CPUs given to every worker<br>
+    - <strong>reserved_cpus</strong>    : <code>int</code> CPUs kept out of the budget (default 1)<br>
+    
+    Returns:<br>
+    - <code>list</code> of CPU sets... at least one, even when the budget is smaller than a slice
+    """
+    cpus = sorted( os.sched_getaffinity(0) )[reserved_cpus:]
+    cpu_sets = [ set( cpus[x:x + cpus_per_worker] ) for x in range( 0 , len(cpus) - cpus_per_worker + 1 , cpus_per_worker ) ]
+    return cpu_sets if cpu_sets else [ set( os.sched_getaffinity(0) ) ]
+
+
+def generate_worker_cmd( worker_index : int , bw_bottleneck : int , bw_other : int , time_seconds : int , flags : list ) -> list:
+    """
+    Function produces the network_bottleneck.py command line of a sweep worker.<br>
+    
+    Parameters:<br>
+    - <strong>worker_index</strong>     : <code>int</code> index (1-255) of the worker<br>
+    - <strong>bw_bottleneck</strong>    : <code>int</code> bottleneck bandwidth of the worker's sweep point (Mbps)<br>
+    - <strong>bw_other</strong>         : <code>int</code> bandwidth of the other links (Mbps)<br>
+    - <strong>time_seconds</strong>     : <code>int</code> duration of iperf testing<br>
+    - <strong>flags</strong>            : <code>list</code> additional network_bottleneck.py flags<br>
+    
+    Returns:<br>
+    - <code>list</code> the command arguments
+    """
+    return [ "python3", "{}/network_bottleneck.py".format(SCRIPT_DIRECTORY),
+             "-bw_bottleneck", str(bw_bottleneck),
+             "-bw_other", str(bw_other),
+             "-time", str(time_seconds),
+             "-prefix", "w{}".format(worker_index),
+             "-worker_index", str(worker_index) ] + flags
+
+
+def run_parallel_sweep( constraints : list , bw_other : int = 100 , time_seconds : int = 1 , 
+                        cpus_per_worker : int = 2 , reserved_cpus : int = 1 , flags : list = None ) -> dict:
+    """
+    Function runs every sweep point as an isolated network_bottleneck.py worker, as many at
+    once as the CPU budget allows. Each worker writes into 'service/workers/w<index>/'; its
+    final result files are then copied into the shared final result directory.<br>
+    
+    Parameters:<br>
+    - <strong>constraints</strong>      : <code>list</code> bottleneck bandwidths (Mbps) to test<br>
+    - <strong>bw_other</strong>         : <code>int</code> bandwidth of the other links (default 100 Mbps)<br>
+    - <strong>time_seconds</strong>     : <code>int</code> duration of iperf testing (default 1 second)<br>
+    - <strong>cpus_per_worker</strong>  : <code>int</code> CPUs pinned to every worker (default 2)<br>
+    - <strong>reserved_cpus</strong>    : <code>int</code> CPUs left outside the budget (default 1)<br>
+    - <strong>flags</strong>            : <code>list</code> additional network_bottleneck.py flags<br>
+    
+    Returns:<br>
+    - <code>dict</code> bottleneck bandwidth to worker exit code
+    """
+    if len(constraints) > 255:
+        raise ValueError("at most 255 sweep points may run as isolated workers")
+    
+    # one global cleanup up front... mn -c inside a worker would tear down its siblings
+    subprocess.run( ["mn", "-c"] , stdout=subprocess.DEVNULL , stderr=subprocess.DEVNULL )
+    
+    free_cpu_sets = queue.Queue()
+    for cpu_set in allocate_cpu_sets( cpus_per_worker , reserved_cpus ):
+        free_cpu_sets.put( cpu_set )
+    
+    pending = queue.Queue()
+    for worker_index, bw in enumerate( constraints , start = 1 ):
+        pending.put( ( worker_index , bw ) )
+    
+    exit_codes = {}
+    
+    def run_workers() -> None:
+        while True:
+            try:
+                worker_index, bw = pending.get_nowait()
+            except queue.Empty:
+                return
+            cpu_set = free_cpu_sets.get()
+            
+            worker_directory = "{}w{}/".format( WORKER_DIRECTORY , worker_index )
+            os.makedirs( worker_directory , exist_ok = True )
+            # every worker traces into its own directory... adopted into this process's trace
+            worker_trace = os.path.abspath( os.path.join( worker_directory , "trace.json" ) )
+            with TRACE.span( 'network_bottleneck.py' , 'launch' , bw_bottleneck = bw , worker = worker_index ) as launch:
+                # pinned by taskset... a preexec_fn is unsafe to fork with while the other launch threads run
+                process = subprocess.Popen( 
+                            [ "taskset", "-c", ",".join( map( str , sorted( cpu_set ) ) ) ] +
+                            generate_worker_cmd( worker_index , bw , bw_other , time_seconds , flags or [] ) +
+                            ( [ "-trace", worker_trace ] if TRACE.enabled else [] ),
+                            cwd         = worker_directory
+                        )
+                exit_codes[bw] = process.wait()
+            free_cpu_sets.put( cpu_set )
+            if TRACE.enabled:
+                TRACE.adopt( worker_trace , launch_id = launch.id )
+            
+            # worker output namespace -> shared final results (file names carry the bandwidths)
+            worker_final = os.path.join( worker_directory , FINAL_RESULT_DIRECTORY )
+            if os.path.exists( worker_final ):
+                for file_name in os.listdir( worker_final ):
+                    shutil.copy( os.path.join( worker_final , file_name ) , FINAL_RESULT_DIRECTORY )
+    
+    threads = [ threading.Thread( target = run_workers ) for _ in range( free_cpu_sets.qsize() ) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    return exit_codes
+
+
+if __name__ == "__main__" :
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-constraints",     help="Bottleneck bandwidths (Mbps) to test. Separate by spaces (ex. '# # #')", type=str, default="8 32 64")
+    parser.add_argument("-bw_other",        help="The bandwidth constraint on non-bottleneck links", type=int, default=100)
+    parser.add_argument("-time",            help="Duration of the iperf tests (s)", type=int, default=5)
+    parser.add_argument("-cpus_per_worker", help="CPUs pinned to each worker... caps the number of simultaneous workers", type=int, default=2)
+    parser.add_argument("-reserved_cpus",   help="CPUs kept out of the worker budget", type=int, default=1)
+    parser.add_argument("-trace",           help="Write timing spans of this executor and its workers to this Chrome trace-event file", type=str, default=None)
+    args, flags = parser.parse_known_args()
+    
+    init_file_system()
+    if args.trace:
+        TRACE.enable()
+    with TRACE.span( 'parallel_sweep.py' , 'process' ):
+        exit_codes = run_parallel_sweep(
+                        constraints     = [ int(x) for x in args.constraints.split() ],
+                        bw_other        = args.bw_other,
+                        time_seconds    = args.time,
+                        cpus_per_worker = args.cpus_per_worker,
+                        reserved_cpus   = args.reserved_cpus,
+                        flags           = flags
+                    )
+    if args.trace:
+        TRACE.write( args.trace )
+    for bw, code in exit_codes.items():
+        if code:
+            print("worker for bottleneck {} Mbps exited with {}".format(bw, code))
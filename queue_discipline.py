@@ -0,0 +1,82 @@
+# Queue disciplines of the bottleneck link.
+# Mininet shapes a TCLink with an HTB root (handle 5:) whose class 5:1 holds the link's queue...
+# the kernel's default qdisc, or netem (handle 10:) when the link has delay, jitter, loss or a
+# max_queue_size. A discipline replaces that queue: the child of class 5:1, or the child of netem
+# (parent 10:1) so the emulated delay stays in place and the standing queue forms behind it.
+
+QUEUE_DISCIPLINES   = ( 'taildrop' , 'red' , 'codel' , 'fq_codel' , 'pie' )
+# packets
+DEFAULT_LIMIT       = 1000
+# bytes... RED averages the queue in packets of this size
+AVERAGE_PACKET      = 1500
+
+
+def generate_qdisc_args( discipline : str , bw : float , limit : int = DEFAULT_LIMIT ) -> list:
+    """
+    Function produces the <code>tc qdisc</code> arguments of a discipline. RED thresholds are sized
+    for the link: marking starts at a 5 ms standing queue and is certain at 15 ms.<br>
+
+    Parameters:<br>
+    - <strong>discipline</strong>   : <code>string</code> one of <code>QUEUE_DISCIPLINES</code><br>
+    - <strong>bw</strong>           : <code>float</code> link bandwidth (Mbps)<br>
+    - <strong>limit</strong>        : <code>int</code> queue limit (packets)<br>
+
+    Returns:<br>
+    - <code>list</code> the qdisc kind and its parameters
+    """
+    if discipline == 'taildrop':
+        return [ 'pfifo' , 'limit' , str(limit) ]
+    if discipline == 'red':
+        minimum = max( int( bw * 1e6 / 8 * 0.005 ) , 2 * AVERAGE_PACKET )
+        maximum = 3 * minimum
+        return [ 'red' , 'limit' , str( max( limit * AVERAGE_PACKET , 4 * maximum ) ) , 'min' , str(minimum) , 'max' , str(maximum) ,
+                 'avpkt' , str(AVERAGE_PACKET) , 'burst' , str( ( 2 * minimum + maximum ) // ( 3 * AVERAGE_PACKET ) + 1 ) ,
+                 'bandwidth' , "{}mbit".format(bw) , 'probability' , '0.1' ]
+    if discipline in ( 'codel' , 'fq_codel' , 'pie' ):
+        return [ discipline , 'limit' , str(limit) ]
+    raise ValueError( "unknown queue discipline '{}' (expected one of {})".format( discipline , ", ".join( QUEUE_DISCIPLINES ) ) )
+
+
+def generate_qdisc_cmd( interface : str , discipline : str , bw : float , netem : bool = False , limit : int = DEFAULT_LIMIT ) -> list:
+    """
+    Function produces the <code>tc</code> command replacing the queue of a shaped interface.<br>
+
+    Parameters:<br>
+    - <strong>interface</strong>    : <code>string</code> interface name<br>
+    - <strong>discipline</strong>   : <code>string</code> one of <code>QUEUE_DISCIPLINES</code><br>
+    - <strong>bw</strong>           : <code>float</code> link bandwidth (Mbps)<br>
+    - <strong>netem</strong>        : <code>bool</code> the interface carries netem (see the module header)<br>
+    - <strong>limit</strong>        : <code>int</code> queue limit (packets)<br>
+
+    Returns:<br>
+    - <code>list</code> the command
+    """
+    return ( [ 'tc' , 'qdisc' , 'replace' , 'dev' , interface , 'parent' , '10:1' if netem else '5:1' , 'handle' , '20:' ] +
+             generate_qdisc_args( discipline , bw , limit ) )
+
+
+def calculate_percentile( values : list , percentile : float ) -> float:
+    # linear interpolation between the closest ranks (numpy's default)
+    ordered = sorted( values )
+    rank    = ( len(ordered) - 1 ) * percentile / 100
+    low     = int( rank )
+    high    = min( low + 1 , len(ordered) - 1 )
+    return ordered[low] + ( ordered[high] - ordered[low] ) * ( rank - low )
+
+
+def summarize_rtts( rtts : list ) -> dict:
+    """
+    Function summarizes round trip times sampled under load.<br>
+
+    Parameters:<br>
+    - <strong>rtts</strong> : <code>list</code> round trip times (ms)<br>
+
+    Returns:<br>
+    - <code>dict</code> { 'samples' , 'rtt_mean' , 'rtt_p50' , 'rtt_p90' , 'rtt_p99' , 'rtt_max' }... None values without samples
+    """
+    summary = { 'samples' : len(rtts) }
+    summary['rtt_mean'] = sum( rtts ) / len( rtts ) if rtts else None
+    for percentile in ( 50 , 90 , 99 ):
+        summary['rtt_p{}'.format(percentile)] = calculate_percentile( rtts , percentile ) if rtts else None
+    summary['rtt_max'] = max( rtts ) if rtts else None
+    return summary
@@ -0,0 +1,94 @@
+# Statistics over repeated sweep measurements.
+# Every repetition of every bottleneck bandwidth is one value of a flat column, grouped by
+# bandwidth. Outlier rejection, medians and bootstrap confidence intervals are computed for
+# all groups at once over those columns (see interval_analysis.grouped_percentiles).
+import numpy as np
+from interval_analysis import grouped_percentiles
+
+# modified z-score (0.6745 * deviation / MAD) beyond which a repetition is rejected (Iglewicz & Hoaglin)
+MAD_THRESHOLD       = 3.5
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE          = 0.95
+
+
+def reject_outliers( groups , values , threshold : float = MAD_THRESHOLD ):
+    """
+    Function flags the values whose modified z-score within their group exceeds the threshold.
+    Groups without spread (MAD of 0) keep all of their values.<br>
+
+    Parameters:<br>
+    - <strong>groups</strong>       : <code>ndarray</code> integer group id (0 .. G-1) of every value<br>
+    - <strong>values</strong>       : <code>ndarray</code> the values<br>
+    - <strong>threshold</strong>    : <code>float</code> modified z-score limit<br>
+
+    Returns:<br>
+    - <code>ndarray</code> boolean mask of the values kept
+    """
+    medians     = grouped_percentiles( groups , values , [50] )[:, 0]
+    deviations  = np.abs( values - medians[groups] )
+    mad         = grouped_percentiles( groups , deviations , [50] )[:, 0]
+    with np.errstate( divide = 'ignore' , invalid = 'ignore' ):
+        scores = 0.6745 * deviations / mad[groups]
+    return ( mad[groups] == 0 ) | ( scores <= threshold )
+
+
+def bootstrap_means( groups , values , resamples : int = BOOTSTRAP_RESAMPLES , seed : int = 0 ):
+    """
+    Function draws bootstrap resamples of every group at once... the groups are padded into a
+    G x N matrix and every resample picks N indices below each group's size.<br>
+
+    Parameters:<br>
+    - <strong>groups</strong>       : <code>ndarray</code> integer group id (0 .. G-1) of every value<br>
+    - <strong>values</strong>       : <code>ndarray</code> the values<br>
+    - <strong>resamples</strong>    : <code>int</code> number of bootstrap resamples<br>
+    - <strong>seed</strong>         : <code>int</code> random seed (summaries are reproducible)<br>
+
+    Returns:<br>
+    - <code>ndarray</code> resamples x G matrix of resample means
+    """
+    order   = np.argsort( groups , kind = 'stable' )
+    counts  = np.bincount( groups )
+    starts  = np.concatenate( ( [0] , np.cumsum(counts)[:-1] ) )
+    width   = counts.max()
+
+    # padded[g, i] is the i-th value of group g (positions past the group's size repeat its last value)
+    positions   = starts[:, None] + np.minimum( np.arange( width )[None, :] , counts[:, None] - 1 )
+    padded      = values[order][positions]
+
+    picks   = ( np.random.default_rng( seed ).random( ( resamples , len(counts) , width ) ) * counts[None, :, None] ).astype( np.int64 )
+    drawn   = np.take_along_axis( np.broadcast_to( padded , picks.shape ) , picks , axis = 2 )
+    used    = np.arange( width )[None, None, :] < counts[None, :, None]
+    return ( drawn * used ).sum( axis = 2 ) / counts[None, :]
+
+
+def summarize_repetitions( groups , values , confidence : float = CONFIDENCE ) -> dict:
+    """
+    Function summarizes repeated measurements per group after MAD outlier rejection.<br>
+
+    Parameters:<br>
+    - <strong>groups</strong>       : <code>ndarray</code> integer group id (0 .. G-1) of every value<br>
+    - <strong>values</strong>       : <code>ndarray</code> the values<br>
+    - <strong>confidence</strong>   : <code>float</code> confidence level of the bootstrap interval<br>
+
+    Returns:<br>
+    - <code>dict</code> of per group arrays { 'mean' , 'median' , 'ci_low' , 'ci_high' , 'n' , 'rejected' }
+    """
+    groups  = np.asarray( groups , dtype = np.int64 )
+    values  = np.asarray( values , dtype = np.float64 )
+    kept    = reject_outliers( groups , values )
+    counts  = np.bincount( groups )
+
+    kept_groups, kept_values = groups[kept], values[kept]
+    kept_counts = np.bincount( kept_groups , minlength = len(counts) )
+    means       = np.bincount( kept_groups , weights = kept_values , minlength = len(counts) ) / kept_counts
+    medians     = grouped_percentiles( kept_groups , kept_values , [50] )[:, 0]
+    tail        = ( 1 - confidence ) / 2 * 100
+    ci          = np.percentile( bootstrap_means( kept_groups , kept_values ) , [ tail , 100 - tail ] , axis = 0 )
+    return {
+        'mean'      : means,
+        'median'    : medians,
+        'ci_low'    : ci[0],
+        'ci_high'   : ci[1],
+        'n'         : kept_counts,
+        'rejected'  : counts - kept_counts
+    }
@@ -0,0 +1,215 @@
+# Batch report rendering.
+# Charts are collected as plain specifications while a sweep is analyzed, and rendered together
+# at its end by parallel worker processes. Workers import matplotlib themselves, with the
+# non-interactive Agg backend, and draw every chart on a Figure of its own (no pyplot state)
+# which is cleared once saved. Every chart is written as a PNG to the plot directory and as
+# SVG inlined into one self-contained HTML report per sweep.
+import html
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from time import strftime
+
+CHART_KINDS = ( 'line' , 'heatmap' )
+# inches
+FIGURE_SIZE = ( 9 , 6 )
+
+
+def draw_line_chart( axes , chart : dict ) -> None:
+    """
+    Procedure draws the data sets of a line chart, one line per data set (x-axis keys, y-axis values,
+    in the order of the dictionary), with error bars where the chart has them.<br>
+
+    Parameters:<br>
+    - <strong>axes</strong>     : <code>matplotlib.axes.Axes</code> the axes to draw on<br>
+    - <strong>chart</strong>    : <code>dict</code> the chart specification (see Report.add_line_chart)<br>
+
+    Returns:<br>
+    - None
+    """
+    error_bars = chart['error_bars'] or [ None ] * len( chart['data_sets'] )
+    for data_set, label, errors in zip( chart['data_sets'] , chart['labels'] , error_bars ):
+        if not data_set:
+            continue
+        x_axis, y_axis = zip( *data_set.items() )
+        if errors:
+            yerr = [ [ errors[x][0] for x in x_axis ] , [ errors[x][1] for x in x_axis ] ]
+            axes.errorbar( x_axis , y_axis , yerr = yerr , label = label , marker = 's' , capsize = 4 )
+        else:
+            axes.plot( x_axis , y_axis , label = label , marker = 's' )
+    axes.legend()
+
+
+def draw_heatmap( figure , axes , chart : dict ) -> None:
+    """
+    Procedure draws a heatmap of a response over two parameters, the value of every cell annotated.
+    Cells without a value are left blank.<br>
+
+    Parameters:<br>
+    - <strong>figure</strong>   : <code>matplotlib.figure.Figure</code> the figure (for the color bar)<br>
+    - <strong>axes</strong>     : <code>matplotlib.axes.Axes</code> the axes to draw on<br>
+    - <strong>chart</strong>    : <code>dict</code> the chart specification (see Report.add_heatmap)<br>
+
+    Returns:<br>
+    - None
+    """
+    values  = [ [ float('nan') if x is None else x for x in row ] for row in chart['values'] ]
+    image   = axes.imshow( values , origin = 'lower' , aspect = 'auto' , cmap = 'viridis' )
+    axes.set_xticks( range( len( chart['x_levels'] ) ) , labels = [ str(x) for x in chart['x_levels'] ] )
+    axes.set_yticks( range( len( chart['y_levels'] ) ) , labels = [ str(x) for x in chart['y_levels'] ] )
+    for row, cells in enumerate( chart['values'] ):
+        for column, value in enumerate( cells ):
+            if value is not None:
+                axes.text( column , row , "{:.3g}".format( value ) , ha = 'center' , va = 'center' , color = 'white' )
+    figure.colorbar( image , ax = axes , label = chart['value_label'] )
+
+
+def render_chart( chart : dict , plot_directory : str ) -> str:
+    """
+    Function renders one chart (in a worker process): the PNG is written to the plot directory
+    and the SVG returned.<br>
+
+    Parameters:<br>
+    - <strong>chart</strong>            : <code>dict</code> the chart specification (see Report)<br>
+    - <strong>plot_directory</strong>   : <code>string</code> directory of the PNG files<br>
+
+    Returns:<br>
+    - <code>string</code> the SVG document of the chart
+    """
+    # only paid by the workers... headless, and never touching pyplot's global figures
+    import matplotlib
+    matplotlib.use( 'Agg' )
+    from matplotlib.figure import Figure
+
+    figure  = Figure( figsize = FIGURE_SIZE )
+    axes    = figure.subplots()
+    if chart['kind'] == 'line':
+        draw_line_chart( axes , chart )
+    elif chart['kind'] == 'heatmap':
+        draw_heatmap( figure , axes , chart )
+    else:
+        raise ValueError( "unknown chart kind '{}' (expected one of {})".format( chart['kind'] , ", ".join( CHART_KINDS ) ) )
+    axes.set_title( chart['title'] )
+    axes.set_xlabel( chart['xlabel'] )
+    axes.set_ylabel( chart['ylabel'] )
+
+    figure.savefig( os.path.join( plot_directory , chart['file_name'] ) )
+    svg = io.StringIO()
+    figure.savefig( svg , format = 'svg' )
+    figure.clear()
+    return svg.getvalue()
+
+
+def generate_report_html( title : str , charts : list , svgs : list ) -> str:
+    """
+    Function assembles the HTML report: every chart's SVG inlined under its title, or the error
+    which kept it from rendering.<br>
+
+    Parameters:<br>
+    - <strong>title</strong>    : <code>string</code> title of the report<br>
+    - <strong>charts</strong>   : <code>list</code> the chart specifications<br>
+    - <strong>svgs</strong>     : <code>list</code> per chart, its SVG document or the exception raised rendering it<br>
+
+    Returns:<br>
+    - <code>string</code> the HTML document
+    """
+    sections = []
+    for chart, svg in zip( charts , svgs ):
+        if isinstance( svg , Exception ):
+            body = "<p class=\"error\">not rendered: {}</p>".format( html.escape( repr( svg ) ) )
+        else:
+            # the XML prolog of the SVG document has no place inside HTML
+            body = svg[ svg.find( "<svg" ): ]
+        sections.append( "<section>\n<h2>{}</h2>\n<p class=\"file\">{}</p>\n{}\n</section>".format(
+            html.escape( chart['title'] ) , html.escape( chart['file_name'] ) , body ) )
+    return "\n".join([
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        "<meta charset=\"utf-8\">",
+        "<title>{}</title>".format( html.escape( title ) ),
+        "<style>body { font-family: sans-serif; max-width: 960px; margin: auto; } section svg { width: 100%; height: auto; }"
+        " .file { color: #666; font-size: small; } .error { color: #b00; }</style>",
+        "</head>",
+        "<body>",
+        "<h1>{}</h1>".format( html.escape( title ) ),
+        "<p>Generated {} ({} charts).</p>".format( strftime( "%Y-%m-%d %H:%M:%S" ) , len( charts ) ),
+        *sections,
+        "</body>",
+        "</html>"
+    ]) + "\n"
+
+
+class Report() :
+    """
+    Collection of the charts of a sweep (see the module header)... charts are added as they are
+    computed and rendered at once by <code>render</code>.
+    """
+
+    def __init__( self, title : str ) -> None:
+
+        self.title      = title
+        self.__charts   = []
+
+    def add_line_chart( self, *, data_sets : list , title : str , xlabel : str , ylabel : str , labels : list , file_name : str ,
+                        error_bars : list = None ) -> None:
+
+        # data sets: dictionaries of x to y... error bars per data set, None or x to ( below , above )
+        self.__charts.append({
+            'kind'          : 'line',
+            'data_sets'     : [ dict( x ) for x in data_sets ],
+            'labels'        : list( labels ),
+            'error_bars'    : list( error_bars ) if error_bars else None,
+            'title'         : title,
+            'xlabel'        : xlabel,
+            'ylabel'        : ylabel,
+            'file_name'     : file_name
+        })
+
+    def add_heatmap( self, *, x_levels : list , y_levels : list , values : list , title : str , xlabel : str , ylabel : str ,
+                     value_label : str , file_name : str ) -> None:
+
+        # values: one row per y level, one column per x level... None for cells without a value
+        self.__charts.append({
+            'kind'          : 'heatmap',
+            'x_levels'      : list( x_levels ),
+            'y_levels'      : list( y_levels ),
+            'values'        : [ list( x ) for x in values ],
+            'value_label'   : value_label,
+            'title'         : title,
+            'xlabel'        : xlabel,
+            'ylabel'        : ylabel,
+            'file_name'     : file_name
+        })
+
+    def __len__( self ) -> int:
+
+        return len( self.__charts )
+
+    def render( self, plot_directory : str , report_file : str , workers : int = None ) -> int:
+        """
+        Function renders every chart, at most <code>workers</code> at once (default one per CPU), and
+        writes the HTML report. A chart which fails to render is reported in its place.<br>
+
+        Parameters:<br>
+        - <strong>plot_directory</strong>   : <code>string</code> directory of the PNG files<br>
+        - <strong>report_file</strong>      : <code>string</code> path of the HTML report<br>
+        - <strong>workers</strong>          : <code>int</code> worker processes<br>
+
+        Returns:<br>
+        - <code>int</code> number of charts rendered
+        """
+        os.makedirs( plot_directory , exist_ok = True )
+        svgs = []
+        if self.__charts:
+            with ProcessPoolExecutor( max_workers = min( workers or os.cpu_count() or 1 , len( self.__charts ) ) ) as executor:
+                futures = list( map( executor.submit , repeat( render_chart ) , self.__charts , repeat( plot_directory ) ) )
+                for future in futures:
+                    try:
+                        svgs.append( future.result() )
+                    except Exception as e:
+                        svgs.append( e )
+        with open( report_file , 'w' ) as f:
+            f.write( generate_report_html( self.title , self.__charts , svgs ) )
+        return sum( not isinstance( x , Exception ) for x in svgs )
@@ -0,0 +1,419 @@
+# Indexed, append-only result store.
+# Every iperf flow of every run is recorded as one row of an embedded SQLite database,
+# keyed by run id, bandwidths, protocol, flow pair and timestamp. Rows are never updated
+# or replaced. Interval data is kept as a compressed columnar blob and the raw client and
+# server documents as compressed JSON, so summaries can be queried without parsing them.
+import hashlib
+import json
+import sqlite3
+import zlib
+from array import array
+from time import time
+from configure import RESULT_DATABASE
+
+# interval columns stored per protocol... TCP rows come from the sender (client) intervals,
+# UDP rows from the receiver (server) intervals
+TCP_INTERVAL_COLUMNS = ( 'index', 'start', 'seconds', 'bytes', 'bits_per_second', 'retransmits', 'snd_cwnd', 'rtt_ms', 'omitted' )
+UDP_INTERVAL_COLUMNS = ( 'index', 'start', 'seconds', 'bytes', 'bits_per_second', 'jitter_ms', 'lost_percent', 'omitted' )
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flows (
+    id              INTEGER PRIMARY KEY,
+    run_id          TEXT    NOT NULL,
+    timestamp       REAL    NOT NULL,
+    bw_bottleneck   INTEGER NOT NULL,
+    bw_other        INTEGER NOT NULL,
+    protocol        TEXT    NOT NULL,
+    case_id         INTEGER NOT NULL,
+    client          TEXT    NOT NULL,
+    server          TEXT    NOT NULL,
+    bytes_sent      INTEGER,
+    bytes_received  INTEGER,
+    seconds         REAL,
+    intervals       BLOB,
+    raw             BLOB
+);
+CREATE INDEX IF NOT EXISTS flows_by_point ON flows ( bw_bottleneck, bw_other, protocol, timestamp );
+CREATE INDEX IF NOT EXISTS flows_by_run   ON flows ( run_id, bw_bottleneck );
+CREATE TABLE IF NOT EXISTS points (
+    id              INTEGER PRIMARY KEY,
+    config_hash     TEXT    NOT NULL,
+    run_id          TEXT    NOT NULL,
+    timestamp       REAL    NOT NULL,
+    bw_bottleneck   INTEGER NOT NULL,
+    bw_other        INTEGER NOT NULL,
+    config          TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS points_by_hash ON points ( config_hash, timestamp );
+CREATE TABLE IF NOT EXISTS telemetry (
+    id              INTEGER PRIMARY KEY,
+    flow_id         INTEGER NOT NULL,
+    run_id          TEXT    NOT NULL,
+    timestamp       REAL    NOT NULL,
+    interval        REAL    NOT NULL,
+    interfaces      TEXT    NOT NULL,
+    samples         BLOB    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS telemetry_by_flow ON telemetry ( flow_id );
+CREATE TABLE IF NOT EXISTS streams (
+    id              INTEGER PRIMARY KEY,
+    flow_id         INTEGER NOT NULL,
+    stream          INTEGER NOT NULL,
+    bytes_sent      INTEGER,
+    bytes_received  INTEGER,
+    seconds         REAL,
+    bits_per_second REAL,
+    retransmits     INTEGER,
+    lost_percent    REAL
+);
+CREATE INDEX IF NOT EXISTS streams_by_flow ON streams ( flow_id );
+CREATE TABLE IF NOT EXISTS tunings (
+    id              INTEGER PRIMARY KEY,
+    run_id          TEXT    NOT NULL,
+    timestamp       REAL    NOT NULL,
+    bw_bottleneck   INTEGER NOT NULL,
+    delay           REAL    NOT NULL,
+    protocol        TEXT    NOT NULL,
+    blksize         INTEGER NOT NULL,
+    socket_buffer   INTEGER,
+    goodput_bps     REAL
+);
+CREATE INDEX IF NOT EXISTS tunings_by_profile ON tunings ( bw_bottleneck, delay, protocol, timestamp );
+"""
+
+
+def extract_tcp_interval_rows( test_case : dict ) -> list:
+    """
+    Function extracts one row per sender interval of a TCP test case.<br>
+
+    Parameters:<br>
+    - <strong>test_case</strong>    : <code>dict</code> { 'client' , 'server' } iperf results of the test case<br>
+
+    Returns:<br>
+    - <code>list</code> of dictionaries holding <code>TCP_INTERVAL_COLUMNS</code>
+    """
+    rows = []
+    for index, interval in enumerate( test_case['client']['intervals'] ):
+        streams = interval['streams']
+        rows.append({
+            'index'             : index,
+            'start'             : interval['sum']['start'],
+            'seconds'           : interval['sum']['seconds'],
+            'bytes'             : interval['sum']['bytes'],
+            'bits_per_second'   : interval['sum']['bits_per_second'],
+            'retransmits'       : interval['sum'].get('retransmits', 0),
+            'snd_cwnd'          : sum( x.get('snd_cwnd', 0) for x in streams ),
+            # iperf reports rtt in microseconds per stream
+            'rtt_ms'            : sum( x.get('rtt', 0) for x in streams ) / max( len(streams) , 1 ) / 1000,
+            'omitted'           : interval['sum'].get('omitted', False)
+        })
+    return rows
+
+
+def extract_udp_interval_rows( test_case : dict ) -> list:
+    """
+    Function extracts one row per receiver interval of a UDP test case.<br>
+
+    Parameters:<br>
+    - <strong>test_case</strong>    : <code>dict</code> { 'client' , 'server' } iperf results of the test case<br>
+
+    Returns:<br>
+    - <code>list</code> of dictionaries holding <code>UDP_INTERVAL_COLUMNS</code>
+    """
+    rows = []
+    for index, interval in enumerate( test_case['server']['intervals'] ):
+        rows.append({
+            'index'             : index,
+            'start'             : interval['sum']['start'],
+            'seconds'           : interval['sum']['seconds'],
+            'bytes'             : interval['sum']['bytes'],
+            'bits_per_second'   : interval['sum']['bits_per_second'],
+            'jitter_ms'         : interval['sum'].get('jitter_ms', 0),
+            'lost_percent'      : interval['sum'].get('lost_percent', 0),
+            'omitted'           : interval['sum'].get('omitted', False)
+        })
+    return rows
+
+
+def extract_stream_rows( protocol : str , test_case : dict ) -> list:
+    """
+    Function extracts one row per parallel stream of a test case from the 'end' sections. Throughput
+    is the receiver's: the client's receiver view for TCP, the server's streams for UDP.<br>
+
+    Parameters:<br>
+    - <strong>protocol</strong>     : <code>string</code> 'tcp' or 'udp'<br>
+    - <strong>test_case</strong>    : <code>dict</code> { 'client' , 'server' } iperf results of the test case<br>
+
+    Returns:<br>
+    - <code>list</code> of { 'stream' , 'bytes_sent' , 'bytes_received' , 'seconds' , 'bits_per_second' , 'retransmits' , 'lost_percent' }
+    """
+    rows = []
+    if protocol == 'tcp':
+        for index, stream in enumerate( test_case['client']['end'].get('streams', []) ):
+            rows.append({
+                'stream'            : index,
+                'bytes_sent'        : stream['sender']['bytes'],
+                'bytes_received'    : stream['receiver']['bytes'],
+                'seconds'           : stream['sender']['seconds'],
+                'bits_per_second'   : stream['receiver']['bits_per_second'],
+                'retransmits'       : stream['sender'].get('retransmits', 0),
+                'lost_percent'      : None
+            })
+        return rows
+    sent        = test_case['client']['end'].get('streams', [])
+    received    = test_case['server']['end'].get('streams', [])
+    for index, ( sender , receiver ) in enumerate( zip( sent , received ) ):
+        rows.append({
+            'stream'            : index,
+            'bytes_sent'        : sender['udp']['bytes'],
+            'bytes_received'    : receiver['udp']['bytes'],
+            'seconds'           : receiver['udp']['seconds'],
+            'bits_per_second'   : receiver['udp']['bits_per_second'],
+            'retransmits'       : None,
+            'lost_percent'      : receiver['udp'].get('lost_percent', 0)
+        })
+    return rows
+
+
+def pack_interval_columns( rows : list , columns : tuple ) -> bytes:
+    """
+    Function packs interval rows column by column: a JSON header naming the columns and the
+    row count, followed by one float64 array per column, compressed as a whole.<br>
+
+    Parameters:<br>
+    - <strong>rows</strong>     : <code>list</code> interval rows<br>
+    - <strong>columns</strong>  : <code>tuple</code> the column names to pack<br>
+
+    Returns:<br>
+    - <code>bytes</code> the columnar blob
+    """
+    header = json.dumps({ 'columns' : columns , 'rows' : len(rows) }).encode()
+    body = b''.join( array( 'd' , [ float(row[name]) for row in rows ] ).tobytes() for name in columns )
+    return zlib.compress( len(header).to_bytes( 4 , 'little' ) + header + body )
+
+
+def unpack_interval_columns( blob : bytes ) -> dict:
+    """
+    Function restores the columns packed by <code>pack_interval_columns</code>.<br>
+
+    Parameters:<br>
+    - <strong>blob</strong>     : <code>bytes</code> the columnar blob<br>
+
+    Returns:<br>
+    - <code>dict</code> column name -> <code>array('d')</code>
+    """
+    data        = zlib.decompress( blob )
+    length      = int.from_bytes( data[:4] , 'little' )
+    header      = json.loads( data[4:4 + length] )
+    body        = memoryview( data )[4 + length:]
+    width       = header['rows'] * 8
+    columns     = {}
+    for position, name in enumerate( header['columns'] ):
+        columns[name] = array( 'd' )
+        columns[name].frombytes( body[position * width:(position + 1) * width] )
+    return columns
+
+
+def summarize_flow( protocol : str , test_case : dict ) -> tuple:
+    """
+    Function extracts the transfer totals of a test case from the client side 'end' section.<br>
+
+    Parameters:<br>
+    - <strong>protocol</strong>     : <code>string</code> 'tcp' or 'udp'<br>
+    - <strong>test_case</strong>    : <code>dict</code> { 'client' , 'server' } iperf results of the test case<br>
+
+    Returns:<br>
+    - <code>tuple</code> ( bytes sent , bytes received , seconds )
+    """
+    end = test_case['client']['end']
+    if protocol == 'tcp':
+        return end['sum_sent']['bytes'], end['sum_received']['bytes'], end['sum_sent']['seconds']
+    received = end['sum_received']['bytes'] if 'sum_received' in end else test_case['server']['end']['sum']['bytes']
+    return end['sum']['bytes'], received, end['sum']['seconds']
+
+
+def extract_cpu_utilization( test_case : dict ) -> dict:
+    """
+    Function extracts the CPU used by the sender (the client) and the receiver (the server)
+    of a test case, as iperf measures it for its own process over the test.<br>
+
+    Parameters:<br>
+    - <strong>test_case</strong>    : <code>dict</code> { 'client' , 'server' } iperf results of the test case<br>
+
+    Returns:<br>
+    - <code>dict</code> { 'sender_percent' , 'receiver_percent' } of one CPU, None when iperf did not report it
+    """
+    cpu = test_case['client'].get( 'end' , {} ).get( 'cpu_utilization_percent' , {} )
+    return { 'sender_percent' : cpu.get( 'host_total' ) , 'receiver_percent' : cpu.get( 'remote_total' ) }
+
+
+def generate_config_hash( config : dict ) -> str:
+    """
+    Function hashes a sweep point configuration... equal configurations (in any key order)
+    produce equal hashes.<br>
+
+    Parameters:<br>
+    - <strong>config</strong>   : <code>dict</code> JSON serializable description of the measurement<br>
+
+    Returns:<br>
+    - <code>string</code> hex sha256 digest
+    """
+    return hashlib.sha256( json.dumps( config , sort_keys = True ).encode() ).hexdigest()
+
+
+class ResultStore() :
+    """
+    Append-only SQLite store of iperf flow results (see the module header).
+    """
+
+    def __init__( self, database : str = RESULT_DATABASE ) -> None:
+
+        # parallel sweep workers share the database... wait on their write locks
+        self.__connection = sqlite3.connect( database , timeout = 30 )
+        self.__connection.row_factory = sqlite3.Row
+        self.__connection.executescript( SCHEMA )
+
+    def record_flow( self, *, run_id : str , bw_bottleneck : int , bw_other : int , protocol : str ,
+                     case_id : int , client : str , server : str , test_case : dict ) -> int:
+
+        bytes_sent, bytes_received, seconds = summarize_flow( protocol , test_case )
+        if protocol == 'tcp':
+            intervals = pack_interval_columns( extract_tcp_interval_rows( test_case ) , TCP_INTERVAL_COLUMNS )
+        else:
+            intervals = pack_interval_columns( extract_udp_interval_rows( test_case ) , UDP_INTERVAL_COLUMNS )
+
+        with self.__connection:
+            cursor = self.__connection.execute(
+                """INSERT INTO flows ( run_id, timestamp, bw_bottleneck, bw_other, protocol, case_id, client, server,
+                                       bytes_sent, bytes_received, seconds, intervals, raw )
+                   VALUES ( ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ? )""",
+                ( run_id, time(), bw_bottleneck, bw_other, protocol, case_id, client, server,
+                  bytes_sent, bytes_received, seconds, intervals, zlib.compress( json.dumps( test_case ).encode() ) )
+            )
+            # per parallel stream (see client.py -streams)
+            self.__connection.executemany(
+                """INSERT INTO streams ( flow_id, stream, bytes_sent, bytes_received, seconds, bits_per_second, retransmits, lost_percent )
+                   VALUES ( ?, ?, ?, ?, ?, ?, ?, ? )""",
+                [ ( cursor.lastrowid, x['stream'], x['bytes_sent'], x['bytes_received'], x['seconds'], x['bits_per_second'],
+                    x['retransmits'], x['lost_percent'] ) for x in extract_stream_rows( protocol , test_case ) ]
+            )
+        return cursor.lastrowid
+
+    def query_flows( self, *, run_id : str = None , bw_bottleneck : int = None , bw_other : int = None ,
+                     protocol : str = None , since : float = None ) -> list:
+
+        conditions, parameters = [], []
+        for column, value in ( ('run_id', run_id) , ('bw_bottleneck', bw_bottleneck) , ('bw_other', bw_other) , ('protocol', protocol) ):
+            if value is not None:
+                conditions.append( "{} = ?".format(column) )
+                parameters.append( value )
+        if since is not None:
+            conditions.append( "timestamp >= ?" )
+            parameters.append( since )
+
+        rows = self.__connection.execute(
+            """SELECT id, run_id, timestamp, bw_bottleneck, bw_other, protocol, case_id, client, server,
+                      bytes_sent, bytes_received, seconds
+               FROM flows {} ORDER BY timestamp, case_id""".format( "WHERE " + " AND ".join(conditions) if conditions else "" ),
+            parameters
+        ).fetchall()
+        return [ dict(x) for x in rows ]
+
+    def load_intervals( self, flow_id : int ) -> dict:
+
+        row = self.__connection.execute( "SELECT intervals FROM flows WHERE id = ?" , ( flow_id , ) ).fetchone()
+        return unpack_interval_columns( row['intervals'] )
+
+    def load_raw( self, flow_id : int ) -> dict:
+
+        row = self.__connection.execute( "SELECT raw FROM flows WHERE id = ?" , ( flow_id , ) ).fetchone()
+        return json.loads( zlib.decompress( row['raw'] ) )
+
+    def query_streams( self, flow_id : int ) -> list:
+
+        # the parallel streams of a flow, in order... empty for flows recorded without them
+        rows = self.__connection.execute(
+            """SELECT stream, bytes_sent, bytes_received, seconds, bits_per_second, retransmits, lost_percent
+               FROM streams WHERE flow_id = ? ORDER BY stream""", ( flow_id , )
+        ).fetchall()
+        return [ dict(x) for x in rows ]
+
+    def record_point( self, *, config_hash : str , run_id : str , bw_bottleneck : int , bw_other : int , config : dict ) -> int:
+
+        # marks a sweep point measured... its flows are the ones recorded under run_id
+        with self.__connection:
+            cursor = self.__connection.execute(
+                """INSERT INTO points ( config_hash, run_id, timestamp, bw_bottleneck, bw_other, config )
+                   VALUES ( ?, ?, ?, ?, ?, ? )""",
+                ( config_hash, run_id, time(), bw_bottleneck, bw_other, json.dumps( config , sort_keys = True ) )
+            )
+        return cursor.lastrowid
+
+    def find_point( self, config_hash : str , max_age : float = None ) -> dict:
+
+        # latest measurement of the configuration, None if there is none (younger than max_age seconds)
+        since = time() - max_age if max_age is not None else 0
+        row = self.__connection.execute(
+            """SELECT id, config_hash, run_id, timestamp, bw_bottleneck, bw_other, config
+               FROM points WHERE config_hash = ? AND timestamp >= ? ORDER BY timestamp DESC LIMIT 1""",
+            ( config_hash , since )
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def record_telemetry( self, *, flow_id : int , run_id : str , telemetry : dict ) -> int:
+
+        # bottleneck telemetry sampled during the flow (see telemetry.TelemetrySampler), packed like the intervals
+        with self.__connection:
+            cursor = self.__connection.execute(
+                """INSERT INTO telemetry ( flow_id, run_id, timestamp, interval, interfaces, samples )
+                   VALUES ( ?, ?, ?, ?, ?, ? )""",
+                ( flow_id, run_id, time(), telemetry['interval'],
+                  json.dumps({ 'link' : telemetry['link_interfaces'] , 'port' : telemetry['port_interfaces'] }),
+                  pack_interval_columns( telemetry['rows'] , tuple( telemetry['columns'] ) ) )
+            )
+        return cursor.lastrowid
+
+    def load_telemetry( self, flow_id : int ) -> dict:
+
+        # { 'interval' , 'link_interfaces' , 'port_interfaces' , 'columns' , 'rows' }, None if the flow was not sampled
+        row = self.__connection.execute(
+            "SELECT interval, interfaces, samples FROM telemetry WHERE flow_id = ? ORDER BY timestamp DESC LIMIT 1" , ( flow_id , )
+        ).fetchone()
+        if row is None:
+            return None
+        interfaces  = json.loads( row['interfaces'] )
+        columns     = unpack_interval_columns( row['samples'] )
+        count       = len( next( iter( columns.values() ) ) ) if columns else 0
+        return {
+            'interval'          : row['interval'],
+            'link_interfaces'   : interfaces['link'],
+            'port_interfaces'   : interfaces['port'],
+            'columns'           : list( columns ),
+            'rows'              : [ { x : columns[x][index] for x in columns } for index in range( count ) ]
+        }
+
+    def record_tuning( self, *, run_id : str , bw_bottleneck : int , delay : float , protocol : str ,
+                       blksize : int , socket_buffer : int , goodput_bps : float ) -> int:
+
+        # best client settings of a bottleneck profile (see client_tuning.py)... socket_buffer None for the kernel's autotuning
+        with self.__connection:
+            cursor = self.__connection.execute(
+                """INSERT INTO tunings ( run_id, timestamp, bw_bottleneck, delay, protocol, blksize, socket_buffer, goodput_bps )
+                   VALUES ( ?, ?, ?, ?, ?, ?, ?, ? )""",
+                ( run_id, time(), bw_bottleneck, delay, protocol, blksize, socket_buffer, goodput_bps )
+            )
+        return cursor.lastrowid
+
+    def find_tuning( self, bw_bottleneck : int , delay : float , protocol : str ) -> dict:
+
+        # latest tuning of the profile, None if it was never tuned
+        row = self.__connection.execute(
+            """SELECT run_id, timestamp, bw_bottleneck, delay, protocol, blksize, socket_buffer, goodput_bps
+               FROM tunings WHERE bw_bottleneck = ? AND delay = ? AND protocol = ? ORDER BY timestamp DESC LIMIT 1""",
+            ( bw_bottleneck , delay , protocol )
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def close( self ) -> None:
+
+        self.__connection.close()
@@ -0,0 +1,79 @@
+# UDP saturation search.
+# The offered load (iperf target bitrate) of a UDP flow is raised until the receiver loses more
+# than a threshold of it. The highest offered load within the threshold is the capacity... found
+# with a step ramp (relative to the bottleneck bandwidth) or a binary search between zero and a
+# lossy upper bound. Every step is measured by a caller supplied function.
+
+STRATEGIES = ( 'step' , 'binary' )
+
+
+def generate_step_targets( bw_bps : float , start : float = 0.5 , stop : float = 1.5 , step : float = 0.1 ) -> list:
+    """
+    Function produces the target bitrates of a step ramp, as fractions of the bottleneck bandwidth.<br>
+
+    Parameters:<br>
+    - <strong>bw_bps</strong>   : <code>float</code> bottleneck bandwidth (bits/s)<br>
+    - <strong>start</strong>    : <code>float</code> first fraction<br>
+    - <strong>stop</strong>     : <code>float</code> last fraction (inclusive)<br>
+    - <strong>step</strong>     : <code>float</code> fraction between steps<br>
+
+    Returns:<br>
+    - <code>list</code> target bitrates (bits/s), ascending
+    """
+    count = int( round( ( stop - start ) / step ) ) + 1
+    return [ int( bw_bps * ( start + step * x ) ) for x in range( count ) ]
+
+
+def search_saturation( measure , bw_bps : float , strategy : str = 'step' , loss_threshold : float = 1.0 ,
+                       resolution : float = 0.02 , max_steps : int = 12 ) -> dict:
+    """
+    Function searches the highest target bitrate whose loss stays within the threshold.<br>
+    'step' ramps the target from half to one and a half times the bottleneck bandwidth in tenths,
+    stopping at the first step over the threshold. 'binary' bisects between zero and twice the
+    bottleneck bandwidth until the interval is narrower than <code>resolution</code> of it.<br>
+
+    Parameters:<br>
+    - <strong>measure</strong>          : <code>function</code> target bitrate (bits/s) to { 'goodput_bps' , 'lost_percent' , 'jitter_ms' },
+    None for a failed step<br>
+    - <strong>bw_bps</strong>           : <code>float</code> bottleneck bandwidth (bits/s)<br>
+    - <strong>strategy</strong>         : <code>string</code> one of <code>STRATEGIES</code><br>
+    - <strong>loss_threshold</strong>   : <code>float</code> highest acceptable loss (percent)<br>
+    - <strong>resolution</strong>       : <code>float</code> binary search: width (fraction of the bottleneck bandwidth) to stop at<br>
+    - <strong>max_steps</strong>        : <code>int</code> most steps measured<br>
+
+    Returns:<br>
+    - <code>dict</code> { 'strategy' , 'loss_threshold' , 'steps' , 'capacity_bps' , 'goodput_bps' }... capacity is the highest
+    target within the threshold (None if there is none), goodput its measured goodput
+    """
+    steps = []
+
+    def run_step( target : int ) -> bool:
+        # True when the step stays within the threshold... failed steps count as lossy
+        result = measure( target )
+        steps.append({ 'target_bps' : target , **( result or { 'goodput_bps' : None , 'lost_percent' : None , 'jitter_ms' : None } ) })
+        return result is not None and result['lost_percent'] <= loss_threshold
+
+    if strategy == 'step':
+        for target in generate_step_targets( bw_bps )[:max_steps]:
+            if not run_step( target ):
+                break
+    elif strategy == 'binary':
+        low, high = 0 , int( 2 * bw_bps )
+        while high - low > resolution * bw_bps and len( steps ) < max_steps:
+            middle = ( low + high ) // 2
+            if run_step( middle ):
+                low = middle
+            else:
+                high = middle
+    else:
+        raise ValueError( "unknown strategy '{}' (expected one of {})".format( strategy , ", ".join( STRATEGIES ) ) )
+
+    within = [ x for x in steps if x['lost_percent'] is not None and x['lost_percent'] <= loss_threshold ]
+    best   = max( within , key = lambda x: x['target_bps'] ) if within else None
+    return {
+        'strategy'          : strategy,
+        'loss_threshold'    : loss_threshold,
+        'steps'             : steps,
+        'capacity_bps'      : best['target_bps'] if best else None,
+        'goodput_bps'       : best['goodput_bps'] if best else None
+    }
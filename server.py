@@ -6,24 +6,38 @@ import os
 import subprocess
 from configure import RESULTS_DIRECTORY , IPERF_DIRECTORY
 #Handles the server code for the Networking Assignment 3
-if __name__ == "__main__" :
-   
-    #Define the parser
-    parser = argparse.ArgumentParser()
-    #Set the IP and Port values
-    parser.add_argument("-ip", help="Server IP address", type=str, default="127.0.0.1")
-    parser.add_argument("-port", help="Server service address", type=int, default=5000)
-    #Apply values to the parser
-    args = parser.parse_args()
 
+
+def run_server( server_ip : str , service_port : int ):
+    """
+    Function runs an <code>iperf3</code> server which serves a single test.<br>
+    
+    Parameters:<br>
+    - <strong>server_ip</strong>        : <code>string</code> the ipv4 address designated for the server<br>
+    - <strong>service_port</strong>     : <code>int</code> the service port designated for the server<br>
+    
+    Returns:<br>
+    - <code>iperf3.TestResult</code> the server side test result
+    """
     server = iperf3.Server()
-    server.bind_address = str(args.ip)
-    server.port         = int(args.port)
+    server.bind_address = str(server_ip)
+    server.port         = int(service_port)
     server.verbose      = False
     
     #Start the server!
-    result = server.run()
+    return server.run()
+
+
+def dump_server_result( result ) -> str:
+    """
+    Procedure writes the server side test result to the iperf result directory.<br>
     
+    Parameters:<br>
+    - <strong>result</strong>   : <code>iperf3.TestResult</code> the server side test result<br>
+    
+    Returns:<br>
+    - <code>string</code> the name of the written file
+    """
     data = result.json
 
     if not os.path.exists(RESULTS_DIRECTORY):
@@ -42,5 +56,25 @@ if __name__ == "__main__" :
     
     with open(file_name, 'w') as f:
         json.dump(data, f)
+    
+    return file_name
+
+
+if __name__ == "__main__" :
+   
+    #Define the parser
+    parser = argparse.ArgumentParser()
+    #Set the IP and Port values
+    parser.add_argument("-ip", help="Server IP address", type=str, default="127.0.0.1")
+    parser.add_argument("-port", help="Server service address", type=int, default=5000)
+    parser.add_argument("-stdout", help="Print the JSON result to stdout instead of writing it to the iperf result directory", action="store_true")
+    #Apply values to the parser
+    args = parser.parse_args()
 
+    result = run_server( server_ip = args.ip , service_port = args.port )
     
+    if args.stdout:
+        # single line... the orchestrator reads the result straight from the process output
+        print( json.dumps( result.json ) )
+    else:
+        dump_server_result( result )
@@ -0,0 +1,49 @@
+# Asynchronous result persistence.
+# Test results are handed to the orchestrator in memory... writing them to disk is
+# delegated to a background writer so it stays off the critical path of a test.
+import atexit
+import json
+import queue
+import threading
+
+
+class AsyncResultSink() :
+    """
+    Background JSON file writer. Submitted documents are written in order by a single
+    worker thread; <code>close</code> (also registered at exit) drains the queue.
+    """
+
+    def __init__( self, max_pending : int = 256 ) -> None:
+        
+        self.__queue    = queue.Queue( maxsize = max_pending )
+        self.__worker   = threading.Thread( target = self.__drain , daemon = True )
+        self.__closed   = False
+        self.__worker.start()
+        atexit.register( self.close )
+    
+    def __drain( self ) -> None:
+        
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                return
+            file_name, data = item
+            try:
+                with open( file_name , 'w' ) as f:
+                    json.dump( data , f )
+            except OSError:
+                # persistence is best effort... the result already reached the orchestrator
+                pass
+    
+    def submit( self, file_name : str , data : dict ) -> None:
+        
+        # blocks only when max_pending writes are outstanding
+        self.__queue.put( ( file_name , data ) )
+    
+    def close( self ) -> None:
+        
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__queue.put( None )
+        self.__worker.join()
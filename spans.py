@@ -0,0 +1,350 @@
+# Timing spans.
+# Orchestration phases (cleanup, network setup, probes, iperf tests, result handling, teardown)
+# are timed as spans carrying the run context. Spans are exported as Chrome trace events
+# (chrome://tracing, ui.perfetto.dev); the trace files of child processes are adopted by the
+# process which launched them, and the merged trace is summarized per sweep point as overhead
+# versus measurement time. A sampling profiler can be attached to the orchestrating process.
+import atexit
+import itertools
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from time import time
+from uuid import uuid4
+
+# span categories... everything but MEASUREMENT_CATEGORIES counts as overhead
+SPAN_CATEGORIES         = ( 'launch' , 'process' , 'cleanup' , 'setup' , 'probe' , 'measurement' , 'record' , 'teardown' , 'analysis' )
+MEASUREMENT_CATEGORIES  = ( 'measurement' , )
+
+
+class _Span() :
+
+    def __init__( self, recorder , name : str , category : str , args : dict ) -> None:
+
+        self.__recorder = recorder
+        self.__event    = { 'name' : name , 'cat' : category , 'args' : args }
+
+    @property
+    def id( self ) -> str:
+        return self.__event['args']['span_id']
+
+    def __enter__( self ):
+
+        self.__event['ts'] = time()
+        return self
+
+    def __exit__( self, exc_type , exc_value , traceback ) -> bool:
+
+        self.__event['dur'] = time() - self.__event['ts']
+        if exc_type is not None:
+            self.__event['args']['error'] = exc_type.__name__
+        self.__recorder.record( self.__event )
+        return False
+
+
+class _NullSpan() :
+    # shared by disabled recorders... timing costs nothing when tracing is off
+
+    id = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, exc_type , exc_value , traceback ) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class SpanRecorder() :
+    """
+    Collects the spans of a process. Disabled until <code>enable</code> is called... spans of a
+    disabled recorder are not timed. Every span carries a process unique id, the fields returned by
+    <code>context</code> (evaluated per span) and its own arguments.
+    """
+
+    def __init__( self, context = None ) -> None:
+
+        self.__context  = context
+        self.__events   = []
+        self.__lock     = threading.Lock()
+        self.__ids      = itertools.count()
+        # span ids stay unique across merged traces, even when pids are reused
+        self.__token    = uuid4().hex[:8]
+        self.__enabled  = False
+
+    @property
+    def enabled( self ) -> bool:
+        return self.__enabled
+
+    def enable( self ) -> None:
+        self.__enabled = True
+
+    def span( self, name : str , category : str , **args ):
+        """
+        Function opens a span, to be used as a context manager.<br>
+
+        Parameters:<br>
+        - <strong>name</strong>     : <code>string</code> the phase timed<br>
+        - <strong>category</strong> : <code>string</code> one of <code>SPAN_CATEGORIES</code><br>
+        - <strong>args</strong>     : span arguments (override the context fields)<br>
+
+        Returns:<br>
+        - the span... its <code>id</code> is None when the recorder is disabled
+        """
+        if not self.__enabled:
+            return _NULL_SPAN
+        args = {
+            **( self.__context() if self.__context else {} ),
+            **args,
+            'span_id' : "{}-{}".format( self.__token , next( self.__ids ) )
+        }
+        return _Span( self , name , category , args )
+
+    def record( self, event : dict ) -> None:
+
+        # the main thread is thread 0... only its spans contain the spans of other threads (see calculate_self_times)
+        thread = 0 if threading.current_thread() is threading.main_thread() else threading.get_ident()
+        event = dict( event , ph = 'X' , pid = os.getpid() , tid = thread )
+        with self.__lock:
+            self.__events.append( event )
+
+    def adopt( self, trace_file : str , launch_id : str = None ) -> None:
+        """
+        Procedure merges the trace file written by a child process into this recorder. The
+        child's events are linked to the span which launched it (see summarize_spans).<br>
+
+        Parameters:<br>
+        - <strong>trace_file</strong>   : <code>string</code> trace written by the child (missing files are skipped)<br>
+        - <strong>launch_id</strong>    : <code>string</code> id of the launching span<br>
+
+        Returns:<br>
+        - None
+        """
+        if not os.path.exists( trace_file ):
+            return
+        events = [ to_seconds( x ) for x in load_chrome_trace( trace_file ) ]
+        for event in events:
+            # grandchildren stay linked to the span of their own launcher
+            if launch_id is not None and event['ph'] == 'X' and event['cat'] == 'process' and 'launch' not in event['args']:
+                event['args'] = dict( event['args'] , launch = launch_id )
+        with self.__lock:
+            self.__events.extend( events )
+
+    def events( self ) -> list:
+        with self.__lock:
+            return list( self.__events )
+
+    def write( self, trace_file : str , process_name : str = None ) -> None:
+        """
+        Procedure writes the recorded (and adopted) spans as a Chrome trace-event file.<br>
+
+        Parameters:<br>
+        - <strong>trace_file</strong>   : <code>string</code> destination (JSON object format)<br>
+        - <strong>process_name</strong> : <code>string</code> name shown for this process (default the script name)<br>
+
+        Returns:<br>
+        - None
+        """
+        events = self.events()
+        events.append({
+            'name' : 'process_name' , 'ph' : 'M' , 'pid' : os.getpid() , 'tid' : 0 , 'ts' : 0.0 ,
+            'args' : { 'name' : process_name or os.path.basename( sys.argv[0] ) }
+        })
+        with open( trace_file , 'w' ) as f:
+            json.dump({ 'traceEvents' : [ to_microseconds( x ) for x in events ] , 'displayTimeUnit' : 'ms' }, f)
+
+
+def to_microseconds( event : dict ) -> dict:
+    # trace-event timestamps and durations are in microseconds
+    event = dict( event , ts = event['ts'] * 1e6 )
+    if 'dur' in event:
+        event['dur'] = event['dur'] * 1e6
+    return event
+
+
+def to_seconds( event : dict ) -> dict:
+    event = dict( event , ts = event['ts'] / 1e6 )
+    if 'dur' in event:
+        event['dur'] = event['dur'] / 1e6
+    return event
+
+
+def load_chrome_trace( trace_file : str ) -> list:
+    """
+    Function reads the events of a Chrome trace-event file (object or array format).<br>
+
+    Parameters:<br>
+    - <strong>trace_file</strong>   : <code>string</code> the trace file<br>
+
+    Returns:<br>
+    - <code>list</code> trace events (microseconds)
+    """
+    with open( trace_file , 'r' ) as f:
+        trace = json.load( f )
+    return trace['traceEvents'] if isinstance( trace , dict ) else trace
+
+
+def calculate_self_times( events : list ) -> dict:
+    """
+    Function computes the time every span spent outside its child spans. The children of a span are
+    the spans of its thread nested directly in it, for a main thread span the outermost spans of other
+    threads of its process that it is the innermost container of, and, for a launch span, the process span of the child
+    process it launched (see SpanRecorder.adopt). Concurrent children are counted once.<br>
+
+    Parameters:<br>
+    - <strong>events</strong>   : <code>list</code> trace events, in seconds<br>
+
+    Returns:<br>
+    - <code>dict</code> span id to self time (seconds)
+    """
+    spans       = [ x for x in events if x.get('ph') == 'X' ]
+    children    = { x['args']['span_id'] : [] for x in spans }
+    end         = lambda x: x['ts'] + x['dur']
+
+    threads = {}
+    for event in spans:
+        threads.setdefault( ( event['pid'] , event['tid'] ) , [] ).append( event )
+    roots = []
+    for thread_events in threads.values():
+        # outer spans first when two start together
+        thread_events.sort( key = lambda x: ( x['ts'] , -x['dur'] ) )
+        stack = []
+        for event in thread_events:
+            while stack and end( stack[-1] ) <= event['ts']:
+                stack.pop()
+            if stack:
+                children[stack[-1]['args']['span_id']].append( event )
+            else:
+                roots.append( event )
+            stack.append( event )
+
+    for root in roots:
+        containers = [ x for x in spans if x['pid'] == root['pid'] and x['tid'] == 0 and root['tid'] != 0
+                       and x['ts'] <= root['ts'] and end( root ) <= end( x ) ]
+        if containers:
+            children[min( containers , key = lambda x: x['dur'] )['args']['span_id']].append( root )
+    for event in spans:
+        launch = event['args'].get('launch')
+        if event['cat'] == 'process' and launch in children:
+            children[launch].append( event )
+
+    self_times = {}
+    for event in spans:
+        # length of the union of the children's intervals within the span
+        covered, reach = 0.0, event['ts']
+        for child in sorted( children[event['args']['span_id']] , key = lambda x: x['ts'] ):
+            start, stop = max( child['ts'] , reach ) , min( end( child ) , end( event ) )
+            if stop > start:
+                covered += stop - start
+                reach = stop
+        self_times[event['args']['span_id']] = max( event['dur'] - covered , 0.0 )
+    return self_times
+
+
+def summarize_spans( events : list ) -> dict:
+    """
+    Function sums the self times of the spans per sweep point (their 'bw_bottleneck' argument)
+    and category. Spans without a sweep point (e.g. a sweep network shared by all points) are
+    summed under 'shared'.<br>
+
+    Parameters:<br>
+    - <strong>events</strong>   : <code>list</code> trace events, in seconds<br>
+
+    Returns:<br>
+    - <code>dict</code> sweep point to { ...categories , 'measurement' , 'overhead' , 'total' , 'overhead_ratio' }
+    """
+    self_times  = calculate_self_times( events )
+    summary     = {}
+    for event in events:
+        if event.get('ph') != 'X':
+            continue
+        point = event['args'].get( 'bw_bottleneck' , 'shared' )
+        point = 'shared' if point is None else point
+        row = summary.setdefault( point , Counter() )
+        row[event['cat']] += self_times[event['args']['span_id']]
+
+    for point, row in summary.items():
+        measurement = sum( row[x] for x in MEASUREMENT_CATEGORIES )
+        total       = sum( row.values() )
+        summary[point] = {
+            **{ x : row[x] for x in SPAN_CATEGORIES if x in row },
+            'measurement'       : measurement,
+            'overhead'          : total - measurement,
+            'total'             : total,
+            'overhead_ratio'    : ( total - measurement ) / total if total else 0.0
+        }
+    return summary
+
+
+def format_span_summary( summary : dict ) -> str:
+    """
+    Function renders a span summary (see summarize_spans) as a fixed width table, one row per
+    sweep point and one column (seconds) per category.<br>
+
+    Parameters:<br>
+    - <strong>summary</strong>  : <code>dict</code> the span summary<br>
+
+    Returns:<br>
+    - <code>string</code> the table
+    """
+    categories  = [ x for x in SPAN_CATEGORIES if x not in MEASUREMENT_CATEGORIES and any( x in row for row in summary.values() ) ]
+    columns     = [ 'point' ] + categories + [ 'measurement' , 'overhead' , 'overhead %' ]
+    rows        = []
+    # sweep points in order, the shared row last
+    for point in sorted( summary , key = lambda x: ( isinstance( x , str ) , str(x) if isinstance( x , str ) else x ) ):
+        row = summary[point]
+        rows.append( [ str(point) ] +
+                     [ "{:.3f}".format( row.get( x , 0.0 ) ) for x in categories + [ 'measurement' , 'overhead' ] ] +
+                     [ "{:.1f}".format( 100 * row['overhead_ratio'] ) ] )
+    widths = [ max( len(x) , *( len(row[index]) for row in rows ) ) if rows else len(x) for index, x in enumerate( columns ) ]
+    lines  = [ "  ".join( x.rjust(width) for x, width in zip( columns , widths ) ) ]
+    lines += [ "  ".join( x.rjust(width) for x, width in zip( row , widths ) ) for row in rows ]
+    return "\n".join( lines )
+
+
+class SamplingProfiler() :
+    """
+    Statistical profiler of one thread (the main thread by default). A background thread samples
+    the thread's stack every <code>interval</code> seconds; <code>write</code> (also registered at
+    exit) stores the samples as collapsed stacks ('outer;...;inner count' lines), the input of
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__( self, profile_file : str , interval : float = 0.005 , thread_id : int = None ) -> None:
+
+        self.__profile_file = profile_file
+        self.__interval     = interval
+        self.__thread_id    = thread_id if thread_id is not None else threading.main_thread().ident
+        self.__samples      = Counter()
+        self.__stopped      = threading.Event()
+        self.__worker       = threading.Thread( target = self.__sample , daemon = True )
+
+    def __sample( self ) -> None:
+
+        while not self.__stopped.wait( self.__interval ):
+            frame = sys._current_frames().get( self.__thread_id )
+            stack = []
+            while frame is not None:
+                stack.append( "{} ({}:{})".format( frame.f_code.co_name , os.path.basename( frame.f_code.co_filename ) , frame.f_code.co_firstlineno ) )
+                frame = frame.f_back
+            if stack:
+                self.__samples[ ";".join( reversed( stack ) ) ] += 1
+
+    def start( self ) -> None:
+
+        self.__worker.start()
+        atexit.register( self.write )
+
+    def write( self ) -> None:
+
+        if self.__stopped.is_set():
+            return
+        self.__stopped.set()
+        self.__worker.join()
+        with open( self.__profile_file , 'w' ) as f:
+            for stack, count in self.__samples.most_common():
+                f.write( "{} {}\n".format( stack , count ) )
@@ -0,0 +1,110 @@
+# Structured, buffered logging.
+# Records are JSON lines carrying the run context (run id, bandwidths) and the phase that
+# logged them. Loggers only enqueue... formatting and writing is delegated to a background
+# writer which appends records in batches, so logging stays off the critical path of a test.
+import atexit
+import itertools
+import json
+import queue
+import sys
+import threading
+from time import time
+
+
+class LogWriter() :
+    """
+    Background JSON-lines writer. Records are appended in order by a single worker thread,
+    up to <code>batch_size</code> per write; the file is flushed after every batch. When
+    <code>max_pending</code> records are outstanding new records are dropped (and counted)
+    instead of blocking the caller. <code>close</code> (also registered at exit, which covers
+    KeyboardInterrupt) drains the queue.
+    """
+
+    def __init__( self, log_file : str , max_pending : int = 4096 , batch_size : int = 256 ) -> None:
+
+        self.__log_file     = log_file
+        self.__batch_size   = batch_size
+        self.__queue        = queue.Queue( maxsize = max_pending )
+        self.__dropped      = 0
+        # submitting threads count drops... the writer takes and resets the count
+        self.__dropped_lock = threading.Lock()
+        self.__worker       = threading.Thread( target = self.__drain , daemon = True )
+        self.__closed       = False
+        self.__worker.start()
+        atexit.register( self.close )
+
+    def __drain( self ) -> None:
+
+        with open( self.__log_file , 'a' ) as f:
+            while True:
+                batch = [ self.__queue.get() ]
+                # take whatever else is already pending, without waiting for it
+                while batch[-1] is not None and len(batch) < self.__batch_size:
+                    try:
+                        batch.append( self.__queue.get_nowait() )
+                    except queue.Empty:
+                        break
+
+                lines = [ json.dumps( x , default = str ) for x in batch if x is not None ]
+                with self.__dropped_lock:
+                    dropped, self.__dropped = self.__dropped , 0
+                if dropped:
+                    lines.append( json.dumps({ 'ts' : time() , 'level' : 'error' , 'message' : 'log records dropped' , 'dropped' : dropped }) )
+                try:
+                    f.write( "".join( x + "\n" for x in lines ) )
+                    f.flush()
+                except OSError:
+                    # logging is best effort
+                    pass
+                if batch[-1] is None:
+                    return
+
+    def submit( self, record : dict ) -> None:
+
+        if self.__closed:
+            return
+        try:
+            self.__queue.put_nowait( record )
+        except queue.Full:
+            with self.__dropped_lock:
+                self.__dropped += 1
+
+    def close( self ) -> None:
+
+        if self.__closed:
+            return
+        self.__closed = True
+        # the sentinel must get through, even when the queue is full
+        self.__queue.put( None )
+        self.__worker.join()
+
+
+class StructuredLogger() :
+    """
+    Logger front end bound to a writer and a level. Every record carries a sequence number, the
+    fields returned by <code>context</code> (evaluated per record, the run context may change
+    while a process runs) and its phase... the name of the logging function unless given.
+    """
+
+    __sequence = itertools.count()
+
+    def __init__( self, writer : LogWriter , level : str = 'info' , context = None ) -> None:
+
+        self.__writer   = writer
+        self.__level    = level
+        self.__context  = context
+
+    def log( self, message : str , phase : str = None , **fields ) -> None:
+
+        if phase is None:
+            phase = sys._getframe(1).f_code.co_name
+            phase = 'main' if phase == '<module>' else phase
+        self.__writer.submit({
+            'ts'        : time(),
+            'seq'       : next( StructuredLogger.__sequence ),
+            'level'     : self.__level,
+            'phase'     : phase,
+            'message'   : message,
+            **( self.__context() if self.__context else {} ),
+            **fields
+        })
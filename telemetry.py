@@ -0,0 +1,285 @@
+# Bottleneck-link telemetry.
+# While iperf tests run, a background sampler records the root qdisc statistics (tc -s qdisc)
+# of the inter-switch links, the /proc/net/dev counters of every switch port and the CPU used
+# by the iperf processes and Open vSwitch. Samples are kept in a fixed-capacity columnar ring
+# buffer; their time column is relative to the start of the sampler (the start of the test),
+# the same origin as the iperf 'start' of every interval (see align_telemetry).
+import os
+import re
+import subprocess
+import threading
+from array import array
+from bisect import bisect_right
+from time import perf_counter
+
+# per link interface (tc root qdisc) and per switch port (/proc/net/dev)
+QDISC_COLUMNS   = ( 'drops' , 'overlimits' , 'backlog_bytes' , 'backlog_packets' , 'sent_bytes' )
+PORT_COLUMNS    = ( 'rx_bytes' , 'rx_drops' , 'tx_bytes' , 'tx_drops' )
+# CPU columns are CPUs used (1.0 = one CPU busy) since the previous sample
+CPU_COLUMNS     = ( 'cpu_total' , 'cpu_iperf' , 'cpu_ovs' )
+# counters are aligned as the difference over an interval... everything else is averaged
+GAUGE_SUFFIXES  = ( 'backlog_bytes' , 'backlog_packets' ) + CPU_COLUMNS
+# command line fragments of the processes accounted as iperf and OVS
+IPERF_PROCESSES = ( 'iperf3' , 'client.py' , 'server.py' , 'agent.py' )
+OVS_PROCESSES   = ( 'ovs-vswitchd' , 'ovsdb-server' )
+
+CLOCK_TICKS     = os.sysconf( 'SC_CLK_TCK' )
+QDISC_HEADER    = re.compile( r"^qdisc (\S+) (\S+) dev (\S+) (root|parent)" )
+QDISC_SENT      = re.compile( r"Sent (\d+) bytes (\d+) pkt \(dropped (\d+), overlimits (\d+)" )
+QDISC_BACKLOG   = re.compile( r"backlog (\d+)b (\d+)p" )
+
+
+class RingBuffer() :
+    """
+    Fixed-capacity column store... one preallocated <code>array('d')</code> per column. Once
+    full, every append overwrites the oldest row.
+    """
+
+    def __init__( self, columns : tuple , capacity : int ) -> None:
+
+        self.columns    = columns
+        self.capacity   = capacity
+        self.__buffers  = { x : array( 'd' , bytes( 8 * capacity ) ) for x in columns }
+        self.__written  = 0
+
+    def append( self, row : dict ) -> None:
+
+        position = self.__written % self.capacity
+        for name in self.columns:
+            self.__buffers[name][position] = row.get( name , 0.0 )
+        self.__written += 1
+
+    def rows( self ) -> list:
+
+        # oldest first
+        first = max( self.__written - self.capacity , 0 )
+        return [ { x : self.__buffers[x][index % self.capacity] for x in self.columns } for index in range( first , self.__written ) ]
+
+    def __len__( self ) -> int:
+
+        return min( self.__written , self.capacity )
+
+
+def read_qdisc_stats( interfaces : list ) -> dict:
+    """
+    Function reads the root qdisc statistics of the provided interfaces with a single
+    <code>tc -s qdisc show</code>. The root qdisc (the HTB shaper of a <code>TCLink</code>)
+    also counts the drops of its children.<br>
+
+    Parameters:<br>
+    - <strong>interfaces</strong>   : <code>list</code> interface names<br>
+
+    Returns:<br>
+    - <code>dict</code> interface to { ...<code>QDISC_COLUMNS</code> }
+    """
+    output  = subprocess.run( [ "tc" , "-s" , "qdisc" , "show" ] , stdout = subprocess.PIPE , stderr = subprocess.DEVNULL ).stdout.decode()
+    stats   = {}
+    current = None
+    for line in output.splitlines():
+        header = QDISC_HEADER.match( line )
+        if header:
+            current = header.group(3) if header.group(4) == 'root' and header.group(3) in interfaces else None
+            if current is not None:
+                stats[current] = { x : 0.0 for x in QDISC_COLUMNS }
+            continue
+        if current is None:
+            continue
+        sent = QDISC_SENT.search( line )
+        if sent:
+            stats[current].update( sent_bytes = float( sent.group(1) ) , drops = float( sent.group(3) ) , overlimits = float( sent.group(4) ) )
+        backlog = QDISC_BACKLOG.search( line )
+        if backlog:
+            stats[current].update( backlog_bytes = float( backlog.group(1) ) , backlog_packets = float( backlog.group(2) ) )
+    return stats
+
+
+def read_port_counters( interfaces : list ) -> dict:
+    """
+    Function reads the <code>/proc/net/dev</code> counters of the provided interfaces (of the
+    root network namespace, where the switch ports live).<br>
+
+    Parameters:<br>
+    - <strong>interfaces</strong>   : <code>list</code> interface names<br>
+
+    Returns:<br>
+    - <code>dict</code> interface to { ...<code>PORT_COLUMNS</code> }
+    """
+    counters = {}
+    with open( "/proc/net/dev" , 'r' ) as f:
+        for line in f.readlines()[2:]:
+            name, fields = line.split( ':' , 1 )
+            name = name.strip()
+            if name in interfaces:
+                fields = fields.split()
+                counters[name] = {
+                    'rx_bytes'  : float( fields[0] ),
+                    'rx_drops'  : float( fields[3] ),
+                    'tx_bytes'  : float( fields[8] ),
+                    'tx_drops'  : float( fields[11] )
+                }
+    return counters
+
+
+def read_process_cpu_times() -> dict:
+    """
+    Function reads the CPU time (user + system, seconds) of the iperf and OVS processes.<br>
+
+    Returns:<br>
+    - <code>dict</code> pid to ( 'iperf' or 'ovs' , cpu seconds )
+    """
+    times = {}
+    for pid in os.listdir( "/proc" ):
+        if not pid.isdigit():
+            continue
+        try:
+            with open( "/proc/{}/cmdline".format(pid) , 'rb' ) as f:
+                cmdline = f.read().decode( errors = 'replace' )
+            group = 'iperf' if any( x in cmdline for x in IPERF_PROCESSES ) else 'ovs' if any( x in cmdline for x in OVS_PROCESSES ) else None
+            if group is None:
+                continue
+            with open( "/proc/{}/stat".format(pid) , 'r' ) as f:
+                # fields after the (parenthesized) command name... utime and stime are the 12th and 13th
+                fields = f.read().rsplit( ')' , 1 )[1].split()
+            times[int(pid)] = ( group , ( int( fields[11] ) + int( fields[12] ) ) / CLOCK_TICKS )
+        except ( OSError , IndexError , ValueError ):
+            # the process exited while it was read
+            continue
+    return times
+
+
+def read_total_cpu_time() -> float:
+    # busy CPU seconds of the host (all but idle and iowait)
+    with open( "/proc/stat" , 'r' ) as f:
+        fields = [ int(x) for x in f.readline().split()[1:] ]
+    return ( sum( fields[:8] ) - fields[3] - fields[4] ) / CLOCK_TICKS
+
+
+def generate_telemetry_columns( link_interfaces : list , port_interfaces : list ) -> tuple:
+    """
+    Function names the sample columns: time, CPU, then '<interface>.<column>' for the qdisc of every
+    link interface and the counters of every switch port.<br>
+
+    Parameters:<br>
+    - <strong>link_interfaces</strong>  : <code>list</code> interfaces of the bottleneck link(s)<br>
+    - <strong>port_interfaces</strong>  : <code>list</code> switch ports<br>
+
+    Returns:<br>
+    - <code>tuple</code> column names
+    """
+    return ( ( 't' , ) + CPU_COLUMNS +
+             tuple( "{}.{}".format( x , y ) for x in link_interfaces for y in QDISC_COLUMNS ) +
+             tuple( "{}.{}".format( x , y ) for x in port_interfaces for y in PORT_COLUMNS ) )
+
+
+class TelemetrySampler() :
+    """
+    Background sampler of the bottleneck telemetry (see the module header). <code>start</code>
+    takes the baseline sample; <code>stop</code> takes a final sample and returns the samples.
+    Usable as a context manager.
+    """
+
+    def __init__( self, link_interfaces : list , port_interfaces : list , interval : float = 0.25 , capacity : int = 4096 ) -> None:
+
+        self.link_interfaces    = list( link_interfaces )
+        self.port_interfaces    = list( port_interfaces )
+        self.__interval         = interval
+        self.__buffer           = RingBuffer( generate_telemetry_columns( self.link_interfaces , self.port_interfaces ) , capacity )
+        self.__stopped          = threading.Event()
+        self.__worker           = threading.Thread( target = self.__run , daemon = True )
+        self.__previous         = None
+
+    def __sample( self ) -> None:
+
+        now         = perf_counter()
+        processes   = read_process_cpu_times()
+        total       = read_total_cpu_time()
+        row         = { 't' : now - self.__started }
+        # CPUs used since the previous sample... processes started in between count from zero
+        if self.__previous is not None:
+            elapsed = max( now - self.__previous['now'] , 1e-9 )
+            for group in ( 'iperf' , 'ovs' ):
+                used = sum( cpu - self.__previous['processes'].get( pid , ( group , 0.0 ) )[1]
+                            for pid, ( owner , cpu ) in processes.items() if owner == group )
+                row['cpu_' + group] = used / elapsed
+            row['cpu_total'] = ( total - self.__previous['total'] ) / elapsed
+        self.__previous = { 'now' : now , 'processes' : processes , 'total' : total }
+
+        for interface, stats in read_qdisc_stats( self.link_interfaces ).items():
+            row.update( { "{}.{}".format( interface , x ) : y for x, y in stats.items() } )
+        for interface, counters in read_port_counters( self.port_interfaces ).items():
+            row.update( { "{}.{}".format( interface , x ) : y for x, y in counters.items() } )
+        self.__buffer.append( row )
+
+    def __run( self ) -> None:
+
+        while not self.__stopped.wait( self.__interval ):
+            self.__sample()
+
+    def start( self ) -> None:
+
+        self.__started = perf_counter()
+        self.__sample()
+        self.__worker.start()
+
+    def stop( self ) -> dict:
+        """
+        Function stops the sampler.<br>
+
+        Returns:<br>
+        - <code>dict</code> { 'interval' , 'link_interfaces' , 'port_interfaces' , 'columns' , 'rows' }
+        """
+        if not self.__stopped.is_set():
+            self.__stopped.set()
+            self.__worker.join()
+            self.__sample()
+        return {
+            'interval'          : self.__interval,
+            'link_interfaces'   : self.link_interfaces,
+            'port_interfaces'   : self.port_interfaces,
+            'columns'           : self.__buffer.columns,
+            'rows'              : self.__buffer.rows()
+        }
+
+    def __enter__( self ):
+
+        self.start()
+        return self
+
+    def __exit__( self, exc_type , exc_value , traceback ) -> bool:
+
+        self.stop()
+        return False
+
+
+def align_telemetry( samples : dict , intervals : dict ) -> list:
+    """
+    Function aligns telemetry samples with the intervals of an iperf flow. Counters (drops,
+    overlimits, bytes) become their increase over the interval, between the last samples at or
+    before its start and its end; gauges (backlog, CPU) the mean of the samples within it.<br>
+
+    Parameters:<br>
+    - <strong>samples</strong>      : <code>dict</code> { 'columns' , 'rows' } as returned by TelemetrySampler.stop (or the result store)<br>
+    - <strong>intervals</strong>    : <code>dict</code> interval columns of the flow (see result_store.unpack_interval_columns)<br>
+
+    Returns:<br>
+    - <code>list</code> one dictionary per interval: its index, start and the aligned telemetry columns
+    """
+    rows    = samples['rows']
+    times   = [ x['t'] for x in rows ]
+    aligned = []
+    if not rows:
+        return aligned
+    for index, start, seconds in zip( intervals['index'] , intervals['start'] , intervals['seconds'] ):
+        first   = rows[ max( bisect_right( times , start ) - 1 , 0 ) ]
+        last    = rows[ max( bisect_right( times , start + seconds ) - 1 , 0 ) ]
+        within  = [ x for x in rows if start < x['t'] <= start + seconds ] or [ last ]
+        entry   = { 'index' : int(index) , 'start' : start }
+        for column in samples['columns']:
+            if column == 't':
+                continue
+            if column.endswith( GAUGE_SUFFIXES ):
+                entry[column] = sum( x[column] for x in within ) / len( within )
+            else:
+                entry[column] = last[column] - first[column]
+        aligned.append( entry )
+    return aligned
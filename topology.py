@@ -0,0 +1,96 @@
+# Parameterized bottleneck topologies.
+# Senders attach to the first switch tier, receivers to the last, and consecutive tiers are
+# joined by a single link... every inter-tier link is a potential bottleneck.
+#
+#   h1..hN  ->  s1 --bw[0]--> s2 --bw[1]--> ... sK  ->  h(N+1)..h(N+M)
+from mininet.topo import Topo
+from mininet.link import TCLink
+
+
+def generate_sender_names( senders : int , prefix : str = '' ) -> list:
+    """
+    Function produces the host names of the senders ( h1 .. hN ).<br>
+    
+    Parameters:<br>
+    - <strong>senders</strong>  : <code>int</code> number of senders<br>
+    - <strong>prefix</strong>   : <code>string</code> node name prefix of the network instance (default none)<br>
+    
+    Returns:<br>
+    - <code>list</code> sender host names
+    """
+    return [ "{}h{}".format(prefix, x + 1) for x in range(senders) ]
+
+
+def generate_receiver_names( senders : int , receivers : int , prefix : str = '' ) -> list:
+    """
+    Function produces the host names of the receivers ( h(N+1) .. h(N+M) ).<br>
+    
+    Parameters:<br>
+    - <strong>senders</strong>      : <code>int</code> number of senders<br>
+    - <strong>receivers</strong>    : <code>int</code> number of receivers<br>
+    - <strong>prefix</strong>       : <code>string</code> node name prefix of the network instance (default none)<br>
+    
+    Returns:<br>
+    - <code>list</code> receiver host names
+    """
+    return [ "{}h{}".format(prefix, senders + x + 1) for x in range(receivers) ]
+
+
+def generate_pairing_plan( senders : int , receivers : int , protocol : str = 'tcp' , prefix : str = '' ) -> list:
+    """
+    Function pairs every sender with a receiver, round robin, producing flows in the
+    format accepted by <code>network_bottleneck.run_concurrent_flows</code>.<br>
+    
+    Parameters:<br>
+    - <strong>senders</strong>      : <code>int</code> number of senders<br>
+    - <strong>receivers</strong>    : <code>int</code> number of receivers<br>
+    - <strong>protocol</strong>     : <code>string</code> 'tcp' or 'udp' (default 'tcp')<br>
+    - <strong>prefix</strong>       : <code>string</code> node name prefix of the network instance (default none)<br>
+    
+    Returns:<br>
+    - <code>list</code> of (client name, server name, protocol) tuples
+    """
+    receiver_names = generate_receiver_names( senders , receivers , prefix )
+    return [ 
+        ( sender , receiver_names[index % receivers] , protocol ) 
+        for index, sender in enumerate( generate_sender_names( senders , prefix ) ) 
+    ]
+
+
+def generate_dpid( dpid_base : int , switch_index : int ) -> str:
+    """
+    Function produces an explicit datapath id for a switch of a network instance. Mininet
+    derives default dpids from the first number in a switch name, which collides once
+    names carry an instance prefix (e.g. w3s1 and w3s2).<br>
+    
+    Parameters:<br>
+    - <strong>dpid_base</strong>    : <code>int</code> the network instance's dpid block<br>
+    - <strong>switch_index</strong> : <code>int</code> 1 based index of the switch in the instance<br>
+    
+    Returns:<br>
+    - <code>string</code> 16 hex digit dpid
+    """
+    return "{:016x}".format( ( dpid_base << 16 ) | switch_index )
+
+
+class TieredBottleneckTopo( Topo ):
+    "Network topology of N senders fanning into M receivers across K switch tiers"
+
+    def build( self, senders : int = 2 , receivers : int = 2 , tier_bw : list = None , bw_other : int = 100 , prefix : str = '' , dpid_base : int = 0 ) :
+        # one bandwidth per inter-tier link... K tiers are joined by K - 1 links
+        tier_bw     = tier_bw if tier_bw is not None else [ 10 ]
+        # isolated instances (prefix / dpid block) carry explicit dpids
+        switches    = [ 
+            self.addSwitch( "{}s{}".format(prefix, x + 1) ) if not dpid_base else
+            self.addSwitch( "{}s{}".format(prefix, x + 1) , dpid = generate_dpid( dpid_base , x + 1 ) )
+            for x in range( len(tier_bw) + 1 ) 
+        ]
+        #senders -to- first tier
+        for sender in generate_sender_names( senders , prefix ):
+            self.addLink( self.addHost( sender ) , switches[0] , cls=TCLink , bw=bw_other )
+        #~~~bottleneck links : tier -to- next tier
+        for index, bw in enumerate( tier_bw ):
+            self.addLink( switches[index] , switches[index + 1] , cls=TCLink , bw=bw )
+        #last tier -to- receivers
+        for receiver in generate_receiver_names( senders , receivers , prefix ):
+            self.addLink( switches[-1] , self.addHost( receiver ) , cls=TCLink , bw=bw_other )